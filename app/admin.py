@@ -1,34 +1,63 @@
 import csv
 import json
+import logging
 import re
 import uuid
-from io import TextIOWrapper
+from collections.abc import Iterator
 from typing import ClassVar
 
+from django.conf import settings
 from django.contrib import admin, messages
-from django.db import connection
-from django.db.models import QuerySet
-from django.forms import ModelForm
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Left
+from django.forms import BaseInlineFormSet, ModelForm
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from app import metrics
+from app.bulk import bulk_load
+from app.cache import invalidate
+from app.csv_ingest import CSVFormatError, RowError, iter_chunks, iter_question_chunks
+from app.db_routers import mark_written, use_replica
+from app.dedup import dedup_mode, find_original, sha256_field_file
+from app.json_ingest import iter_json_chunks
 from app.models import (
     Evaluation,
     ExamPaperQuestion,
+    ExperimentPolicy,
+    ScoringJob,
     StandardAnswer,
     TestQuestion,
     UploadedEvaluationBatch,
     UploadedTestPaper,
 )
-from app.openai_eval import score_response
+from app.openai_eval import score_many, score_route
+from app.pagination import EstimatedCountPaginator
+from app.reuse import find_reusable, response_fingerprint, reused_scores
+from app.routing import routing_for
+from app.scoring_queue import enqueue, scoring_mode
+from app.search import filter_matching
+from app.usage import usage_fields
 
+logger = logging.getLogger(__name__)
+
+MAX_ROW_ERROR_MESSAGES = 20
+
+ZERO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "latency_ms": 0, "cost_usd": 0}
+
+PLACEHOLDER_SCORE_FIELDS = ("accuracy", "relevance", "logic", "conciseness", "language_quality", "total_score")
+
+# Evaluation 列表不載入的大型文字欄位
+LARGE_TEXT_FIELDS = ("test_question", "bot_response", "question_source", "standard_answer", "overall_comment")
+QUESTION_PREVIEW_LENGTH = 80
 
-def enable_wal():
-    with connection.cursor() as cursor:
-        cursor.execute("PRAGMA journal_mode=WAL;")
 
 def format_json_as_plain_text(json_data: list[dict]) -> str:
     r"""將 JSON 格式的 list of dict 轉換為以換行和縮排區分的純文本，並移除特殊符號。.
@@ -60,11 +89,39 @@ def generate_unique_uuid_question_id():
         if not TestQuestion.objects.filter(question_id=question_id).exists():
             return question_id
 
+
+def generate_unique_uuid_question_ids(count: int) -> list[str]:
+    """Generate ``count`` question IDs unused by TestQuestion and ExamPaperQuestion.
+
+    Each round checks the whole batch of candidates with one query per table instead of
+    one query per ID.
+
+    Parameters
+    ----------
+    count : int
+        The number of IDs to generate.
+
+    Returns:
+    -------
+    list[str]
+        ``count`` distinct 8-character hex IDs.
+    """
+    question_ids: set[str] = set()
+    while len(question_ids) < count:
+        candidates = {uuid.uuid4().hex[:8] for _ in range(count - len(question_ids))} - question_ids
+        taken = set(
+            TestQuestion.objects.filter(question_id__in=candidates).values_list("question_id", flat=True)
+        ) | set(
+            ExamPaperQuestion.objects.filter(question_id__in=candidates).values_list("question_id", flat=True)
+        )
+        question_ids |= candidates - taken
+    return list(question_ids)
+
 # Utility Functions
 
-def save_evaluation(evaluation_data: dict):
-    """Save evaluation results."""
-    Evaluation.objects.create(
+def build_evaluation(evaluation_data: dict) -> Evaluation:
+    """Build an unsaved Evaluation from evaluation results."""
+    return Evaluation(
         exp_id=evaluation_data["exp_id"],
         test_paper_id=evaluation_data["test_paper_id"],
         question_id=evaluation_data["question_id"],
@@ -72,17 +129,99 @@ def save_evaluation(evaluation_data: dict):
         bot_response=evaluation_data["response"],
         question_source=evaluation_data["question_source"],
         standard_answer=evaluation_data["standard_answer"],
-        difficulty=3,
+        difficulty=evaluation_data.get("difficulty", 3),
         accuracy=evaluation_data["scores"].get("accuracy"),
         relevance=evaluation_data["scores"].get("relevance"),
         logic=evaluation_data["scores"].get("logic"),
         conciseness=evaluation_data["scores"].get("conciseness"),
         language_quality=evaluation_data["scores"].get("language_quality"),
         total_score=evaluation_data["scores"].get("total_score"),
-        overall_comment=evaluation_data["scores"].get("overall_comment"),
+        overall_comment=evaluation_data["scores"].get("overall_comment") or "",
+        routing_reason=evaluation_data["scores"].get("routing_reason") or "",
+        response_fingerprint=response_fingerprint(
+            evaluation_data["question_id"], evaluation_data["response"], evaluation_data["standard_answer"]
+        ),
+        **usage_fields(evaluation_data["scores"]),
     )
 
 
+def save_evaluation(evaluation_data: dict):
+    """Save evaluation results."""
+    build_evaluation(evaluation_data).save()
+
+
+def write_question_chunk(paper: UploadedTestPaper, rows: list[dict]) -> int:
+    """Bulk-write one block of validated CSV rows as questions of ``paper``.
+
+    Each question gets a generated question_id and a zero-score placeholder evaluation
+    (blank response), to be scored once responses are uploaded.
+
+    Parameters
+    ----------
+    paper : UploadedTestPaper
+        The saved test paper the questions belong to.
+    rows : list[dict]
+        Rows produced by :func:`app.csv_ingest.iter_question_chunks`.
+
+    Returns:
+    -------
+    int
+        The number of questions written.
+    """
+    question_ids = generate_unique_uuid_question_ids(len(rows))
+    questions = []
+    evaluations = []
+    for question_id, row in zip(question_ids, rows, strict=True):
+        questions.append(ExamPaperQuestion(test_paper=paper, question_id=question_id, **row))
+        evaluations.append(build_evaluation({
+            "exp_id": paper.name,
+            "test_paper_id": paper.id,
+            "question_id": question_id,
+            "question": row["question"],
+            "response": "",
+            "question_source": row["source"],
+            "standard_answer": row["standard_answer"],
+            "difficulty": row["difficulty"],
+            "scores": dict.fromkeys(PLACEHOLDER_SCORE_FIELDS, 0),
+        }))
+    bulk_load(ExamPaperQuestion, questions)
+    bulk_load(Evaluation, evaluations)
+    return len(questions)
+
+
+def detect_duplicate(obj: UploadedTestPaper | UploadedEvaluationBatch, field_file: FieldFile):
+    """Hash the uploaded file onto ``obj.content_sha256`` and return the earlier record with the same content.
+
+    Returns None when no such record exists or ``UPLOAD_DEDUP_MODE`` is ``off``.
+    """
+    obj.content_sha256 = sha256_field_file(field_file)
+    if dedup_mode() == "off":
+        return None
+    return find_original(obj, obj.content_sha256)
+
+
+def copy_evaluations(original: UploadedEvaluationBatch, batch: UploadedEvaluationBatch) -> int:
+    """Copy the evaluations of ``original`` to ``batch`` without re-scoring.
+
+    Usage columns are zeroed on the copies since no LLM call was made for them.
+    """
+    copies = (
+        Evaluation(**{
+            **{
+                field.attname: getattr(evaluation, field.attname)
+                for field in Evaluation._meta.concrete_fields
+                if field.attname not in ("id", "created_at", "reused_from_id") and not field.generated
+            },
+            "exp_id": batch.name,
+            "test_paper_id": batch.id,
+            "reused_from_id": evaluation.reused_from_id or evaluation.id,
+            **ZERO_USAGE,
+        })
+        for evaluation in Evaluation.objects.filter(exp_id=original.name).iterator()
+    )
+    return bulk_load(Evaluation, copies)
+
+
 def download_exam_paper_question(request: HttpRequest):  # noqa: ARG001
     """Download a CSV template for exam paper questions."""
     response = HttpResponse(content_type="text/csv")
@@ -117,16 +256,103 @@ def download_test_paper(request: HttpRequest, paper_id:str):
 
 
 # Admin Classes
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only builds forms for one page of the related objects.
+
+    Attributes:
+    ----------
+    per_page : int
+        Related objects per page.
+    page_number : str | int
+        The requested page (out-of-range values fall back to the last page).
+    page_param : str
+        Query-string parameter carrying the page number.
+    changelist_url : str
+        Link to the full, filtered changelist of the related objects.
+    """
+
+    per_page = 50
+    page_number: str | int = 1
+    page_param = "page"
+    changelist_url = ""
+
+    def get_queryset(self) -> QuerySet:
+        """Return the current page of the inline queryset."""
+        if not hasattr(self, "page"):
+            self.page = Paginator(super().get_queryset(), self.per_page).get_page(self.page_number)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+
 class ExamPaperQuestionInline(admin.TabularInline):
     """Inline admin interface for managing test paper questions.
 
     This class allows adding, editing, and viewing questions associated with a test paper
-    directly within the admin interface for the test paper model.
+    directly within the admin interface for the test paper model. Questions are shown
+    ``per_page`` at a time (``?questions_page=N``) so large papers open as fast as small ones.
     """
     model = ExamPaperQuestion
-    extra = 1
+    extra = 0
+    per_page = 50
+    page_param = "questions_page"
+    formset = PaginatedInlineFormSet
+    template = "admin/edit_inline/paginated_tabular.html"
     readonly_fields = ("question_id", "question", "standard_answer", "difficulty", "source", "tags")
 
+    def get_formset(self, request: HttpRequest, obj: UploadedTestPaper | None = None, **kwargs) -> type[BaseInlineFormSet]:
+        """Return the formset class bound to the requested page."""
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = self.page_param
+        formset.page_number = request.GET.get(self.page_param, 1)
+        if obj is not None and obj.pk:
+            changelist = reverse("admin:app_exampaperquestion_changelist")
+            formset.changelist_url = f"{changelist}?test_paper__id__exact={obj.pk}"
+        return formset
+
+
+class LightChangeList(ChangeList):
+    """Changelist that defers the admin's ``list_defer_fields`` and annotates ``list_previews``.
+
+    ``list_previews`` maps an annotation name to ``(field, length)``; the annotation holds the first
+    ``length`` characters of ``field`` so the list can show it without loading the whole text.
+    """
+
+    def get_queryset(self, request: HttpRequest, exclude_parameters: list[str] | None = None) -> QuerySet:
+        """Return the filtered list queryset without the large text columns."""
+        previews = {
+            name: Left(field, length) for name, (field, length) in self.model_admin.list_previews.items()
+        }
+        return (
+            super().get_queryset(request, exclude_parameters)
+            .defer(*self.model_admin.list_defer_fields)
+            .annotate(**previews)
+        )
+
+
+@admin.register(ExamPaperQuestion)
+class ExamPaperQuestionAdmin(admin.ModelAdmin):
+    """Paginated list of test paper questions, filterable by paper (linked from the paper's inline)."""
+
+    list_display = ("question_id", "test_paper", "question_preview", "difficulty", "source")
+    list_filter = ("test_paper", "difficulty")
+    list_select_related = ("test_paper",)
+    search_fields = ("question_id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_defer_fields = ("question", "standard_answer")
+    list_previews: ClassVar[dict] = {"question_preview": ("question", QUESTION_PREVIEW_LENGTH)}
+
+    def get_changelist(self, request: HttpRequest, **kwargs) -> type[ChangeList]:
+        """Use :class:`LightChangeList`."""
+        _ = request, kwargs
+        return LightChangeList
+
+    @admin.display(description="Question")
+    def question_preview(self, obj: ExamPaperQuestion) -> str:
+        """Return the first characters of the question."""
+        return obj.question_preview
+
 
 @admin.register(Evaluation)
 class EvaluationAdmin(admin.ModelAdmin):
@@ -152,17 +378,50 @@ class EvaluationAdmin(admin.ModelAdmin):
     list_display = (
         "exp_id",
         "question_id",
-        "test_question",
-        "question_source",
+        "question_preview",
+        "source_label",
         "total_score",
         "created_at",
     )
-    list_filter = ("exp_id", "question_source", "created_at")
+    # 以索引過的 source_label 篩選，避免對整段 question_source 做 DISTINCT
+    list_filter = ("exp_id", "source_label", "created_at")
     search_fields = ("question_id", "exp_id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_defer_fields = LARGE_TEXT_FIELDS
+    list_previews: ClassVar[dict] = {"question_preview": ("test_question", QUESTION_PREVIEW_LENGTH)}
     from typing import ClassVar
 
     actions: ClassVar[list[str]] = ["export_selected_to_csv"]
 
+    def get_changelist(self, request: HttpRequest, **kwargs) -> type[ChangeList]:
+        """Use :class:`LightChangeList`, which leaves the large text columns out of the list query."""
+        _ = request, kwargs
+        return LightChangeList
+
+    @admin.display(description="Test question")
+    def question_preview(self, obj: Evaluation) -> str:
+        """Return the first characters of the test question (annotated by the changelist query)."""
+        return obj.question_preview
+
+    def get_search_results(self, request: HttpRequest, queryset: QuerySet, search_term: str) -> tuple[QuerySet, bool]:
+        """Match ``search_fields`` exactly as before, plus full-text matches in the question or bot response."""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip():
+            results |= filter_matching(queryset, search_term)
+        return results, may_have_duplicates
+
+    def changelist_view(self, request: HttpRequest, extra_context: dict | None = None) -> HttpResponse:
+        """Render the changelist from the read replica; actions (POST) still run on the primary."""
+        if request.method != "GET":
+            return super().changelist_view(request, extra_context)
+        with use_replica():
+            response = super().changelist_view(request, extra_context)
+            # TemplateResponse 延後 render，需在 replica 區塊內執行查詢
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
     @admin.action(description="Export selected evaluations to CSV")
     def export_selected_to_csv(self, request: HttpRequest, queryset: QuerySet):
         """Export the selected Evaluation objects to a CSV file.
@@ -203,7 +462,8 @@ class EvaluationAdmin(admin.ModelAdmin):
             ]
         )
 
-        for evaluation in queryset:
+        # changelist 的 queryset 延後載入了大型文字欄位，匯出時需一次讀回
+        for evaluation in queryset.defer(None).iterator(chunk_size=2000):
             writer.writerow(
                 [
                     evaluation.question_id,
@@ -260,6 +520,37 @@ class StandardAnswerAdmin(admin.ModelAdmin):
         _ = request
         return False
 
+@admin.register(ExperimentPolicy)
+class ExperimentPolicyAdmin(admin.ModelAdmin):
+    """Admin interface for the scheduling policies of queued experiments.
+
+    The changelist also shows how many of each experiment's jobs are pending and claimed.
+    """
+    list_display = ("exp_id", "priority", "weight", "max_concurrency", "pending_jobs", "claimed_jobs")
+    list_editable = ("priority", "weight", "max_concurrency")
+    search_fields = ("exp_id",)
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        """Annotate each policy with its experiment's pending and claimed job counts."""
+        def count(status: str) -> Subquery:
+            jobs = ScoringJob.objects.filter(exp_id=OuterRef("exp_id"), status=status).order_by()
+            return Subquery(jobs.values("exp_id").annotate(n=Count("id")).values("n"))
+
+        return super().get_queryset(request).annotate(
+            pending_jobs=count(ScoringJob.PENDING), claimed_jobs=count(ScoringJob.CLAIMED)
+        )
+
+    @admin.display(description="Pending", ordering="pending_jobs")
+    def pending_jobs(self, obj: ExperimentPolicy) -> int:
+        """Return the number of pending jobs of the experiment."""
+        return obj.pending_jobs or 0
+
+    @admin.display(description="Claimed", ordering="claimed_jobs")
+    def claimed_jobs(self, obj: ExperimentPolicy) -> int:
+        """Return the number of claimed jobs of the experiment."""
+        return obj.claimed_jobs or 0
+
+
 # @admin.register(UploadedEvaluationBatch)
 # class UploadedEvaluationBatchAdmin(admin.ModelAdmin):
 #     """Admin interface for managing uploaded evaluation batches.
@@ -360,8 +651,8 @@ class UploadedEvaluationBatchAdmin(admin.ModelAdmin):
     """
 
     change_form_template = "admin/uploaded_evaluation_batch_change_form.html"  # 自定義模板
-    list_display = ("name", "uploaded_at", "json_file_link")
-    readonly_fields = ("json_file_link",)
+    list_display = ("name", "uploaded_at", "json_file_link", "duplicate_of")
+    readonly_fields = ("json_file_link", "metrics", "content_sha256", "duplicate_of")
 
     def json_file_link(self, obj):
         """Provide a link to download the uploaded file."""
@@ -392,14 +683,58 @@ class UploadedEvaluationBatchAdmin(admin.ModelAdmin):
             )
             return
 
+        original = None if change else detect_duplicate(obj, obj.json_file)
+        if original and dedup_mode() == "reject":
+            self.message_user(
+                request,
+                f"The uploaded file is identical to batch '{original.name}'. Upload rejected.",
+                level=messages.ERROR,
+            )
+            return
+        if original:
+            # 內容相同：不另存檔案，直接複製原批次的評分結果 (不再呼叫 LLM)
+            obj.duplicate_of = original
+            obj.json_file = original.json_file.name
+
         super().save_model(request, obj, form, change)
 
-        # 打開文件並自動識別格式
-        raw = obj.json_file.open("rb").read().decode("utf-8")
+        with metrics.collect() as batch_metrics:
+            if original:
+                count = copy_evaluations(original, obj)
+                self.message_user(
+                    request,
+                    f"The uploaded file is identical to batch '{original.name}': copied {count} evaluations "
+                    "without re-scoring.",
+                    level=messages.INFO,
+                )
+            else:
+                self.process_batch(request, obj)
+
+        obj.metrics = batch_metrics.as_dict()
+        obj.save(update_fields=["metrics"])
+        mark_written(obj.name)
+        invalidate(obj.name)
+        logger.info("Processed evaluation batch %s: %s", obj.name, obj.metrics)
+
+    def process_batch(self, request: HttpRequest, obj: UploadedEvaluationBatch):
+        """Parse, look up, score and persist every item of the uploaded batch file.
+
+        The file (CSV rows or the items of a JSON array) is read in blocks; each block's
+        standard answers are fetched with one query and its items are streamed into the
+        scoring pool, so memory stays bounded by the block size rather than the file size.
+
+        Parameters
+        ----------
+        request : HttpRequest
+            The HTTP request object.
+        obj : UploadedEvaluationBatch
+            The saved batch whose file is processed.
+        """
+        # 依副檔名識別格式
         if obj.json_file.name.endswith(".json"):
-            data = json.loads(raw)  # 處理 JSON 文件
+            chunks = self.parse_json(obj)  # 處理 JSON 文件
         elif obj.json_file.name.endswith(".csv"):
-            data = self.parse_csv(raw)  # 處理 CSV 文件
+            chunks = self.parse_csv(obj)  # 處理 CSV 文件
         else:
             self.message_user(
                 request,
@@ -408,68 +743,209 @@ class UploadedEvaluationBatchAdmin(admin.ModelAdmin):
             )
             return
 
-        # 處理數據
-        for idx, item in enumerate(data, start=1):
-            print(f"Processing item {idx}...")  # noqa: T201
+        rows = {}
+        jobs = self.collect_jobs(request, obj, chunks, rows)
 
-            question_id = item.get("question_id")
-            question = item.get("question")
-            response = item.get("response", "")
-            question_source = item.get("sources", "")  # 獲取 source 資料
+        if scoring_mode() == "queue":
+            # 只寫入佇列，由 run_scoring_workers 評分
+            with metrics.span("persist"):
+                queued = enqueue(obj, (rows.pop(idx) for idx, _ in jobs))
+            metrics.incr("queued", queued)
+            self.message_user(request, f"Queued {queued} items for scoring.")
+            return
 
-            # 根據 question_id 從資料庫篩選出對應的 standard_answer
-            try:
-                exam_question = ExamPaperQuestion.objects.get(question_id=question_id)
-                standard_answer = exam_question.standard_answer
-            except ExamPaperQuestion.DoesNotExist:
-                self.message_user(
-                    request,
-                    f"Skipping item {idx}: Question ID '{question_id}' not found in ExamPaperQuestion.",
-                    level=messages.WARNING,
-                )
-                continue
+        # 使用 source 傳遞給 score_response；多筆同時評分 (共用連線池)，結果緩衝後每 BULK_BATCH_SIZE 筆批次寫入
+        pending: list[Evaluation] = []
+        for idx, scores in score_many(jobs):
+            pending.append(build_evaluation({
+                "exp_id": obj.name,
+                "test_paper_id": obj.id,
+                **rows.pop(idx),
+                "scores": scores,
+            }))
+            if len(pending) >= settings.BULK_BATCH_SIZE:
+                bulk_load(Evaluation, pending)
+                pending = []
+        if pending:
+            bulk_load(Evaluation, pending)
+
+    def collect_jobs(
+        self,
+        request: HttpRequest,
+        obj: UploadedEvaluationBatch,
+        chunks: Iterator[list[dict]],
+        rows: dict[int, dict],
+    ) -> Iterator[tuple[int, dict]]:
+        """Look up standard answers block by block and yield the scoring jobs of valid items.
+
+        With ``obj.reuse_results``, items whose answer was already scored are copied
+        instead (see :meth:`reuse_scores`) and yield no job.
 
-            if not all([question_id, question, standard_answer]):
-                self.message_user(
-                    request,
-                    f"Skipping item {idx}: Missing required fields.",
-                    level=messages.WARNING,
+        Parameters
+        ----------
+        request : HttpRequest
+            The HTTP request object, used to report skipped items.
+        obj : UploadedEvaluationBatch
+            The batch being processed.
+        chunks : Iterator[list[dict]]
+            Blocks of uploaded items.
+        rows : dict[int, dict]
+            Filled with the evaluation fields of every yielded job, keyed by item number.
+
+        Yields:
+        ------
+        tuple[int, dict]
+            ``(item number, score_response kwargs)`` pairs for :func:`score_many`.
+        """
+        routing = routing_for(obj.name)
+        idx = 0
+        while True:
+            with metrics.span("parse"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+
+            # 根據 question_id 從資料庫篩選出對應的 standard_answer 與難度 (每塊一次查詢)
+            with metrics.span("lookup"):
+                questions = {
+                    question_id: (standard_answer, difficulty)
+                    for question_id, standard_answer, difficulty in ExamPaperQuestion.objects.filter(
+                        question_id__in={item.get("question_id") for item in chunk},
+                    ).values_list("question_id", "standard_answer", "difficulty")
+                }
+
+            chunk_rows = {}
+            for item in chunk:
+                idx += 1
+                metrics.incr("items")
+
+                question_id = item.get("question_id")
+                question = item.get("question")
+                response = item.get("response", "")
+                question_source = item.get("sources", "")  # 獲取 source 資料
+
+                if question_id not in questions:
+                    metrics.incr("skipped")
+                    self.message_user(
+                        request,
+                        f"Skipping item {idx}: Question ID '{question_id}' not found in ExamPaperQuestion.",
+                        level=messages.WARNING,
+                    )
+                    continue
+                standard_answer, difficulty = questions[question_id]
+
+                if not all([question_id, question, standard_answer]):
+                    metrics.incr("skipped")
+                    self.message_user(
+                        request,
+                        f"Skipping item {idx}: Missing required fields.",
+                        level=messages.WARNING,
+                    )
+                    continue
+
+                chunk_rows[idx] = {
+                    "question_id": question_id,
+                    "question": question,
+                    "response": response,
+                    "standard_answer": standard_answer,
+                    "question_source": question_source,
+                    "difficulty": difficulty,
+                }
+
+            if obj.reuse_results:
+                self.reuse_scores(obj, chunk_rows, routing)
+
+            for number, row in chunk_rows.items():
+                rows[number] = row
+                yield number, {
+                    "question": row["question"],
+                    "response": row["response"],
+                    "standard_answer": row["standard_answer"],
+                    "source": row["question_source"],
+                    "difficulty": row["difficulty"],
+                    "routing": routing,
+                }
+
+    def reuse_scores(self, obj: UploadedEvaluationBatch, chunk_rows: dict[int, dict], routing: dict) -> None:
+        """Copy earlier scores of identical answers in bulk and drop those items from ``chunk_rows``.
+
+        Only scores made by the model each item routes to are copied.
+
+        Parameters
+        ----------
+        obj : UploadedEvaluationBatch
+            The batch being processed.
+        chunk_rows : dict[int, dict]
+            The valid items of one block, keyed by item number; reused items are removed.
+        routing : dict
+            The experiment's model routing (see :func:`app.routing.routing_for`).
+        """
+        with metrics.span("reuse"):
+            routes = {
+                idx: score_route(
+                    row["question"], row["standard_answer"], row["question_source"], row["difficulty"], routing
                 )
-                continue
+                for idx, row in chunk_rows.items()
+            }
+            keys = {
+                idx: (
+                    response_fingerprint(row["question_id"], row["response"], row["standard_answer"]),
+                    routes[idx].model,
+                )
+                for idx, row in chunk_rows.items()
+            }
+            reusable = find_reusable(keys.values())
+            copies = []
+            for idx, key in keys.items():
+                if key in reusable:
+                    evaluation = build_evaluation({
+                        "exp_id": obj.name,
+                        "test_paper_id": obj.id,
+                        **chunk_rows.pop(idx),
+                        "scores": {},
+                    })
+                    for field, value in reused_scores(reusable[key]).items():
+                        setattr(evaluation, field, value)
+                    evaluation.routing_reason = routes[idx].reason
+                    copies.append(evaluation)
+        if copies:
+            bulk_load(Evaluation, copies)
+            metrics.incr("reused", len(copies))
+
+    def parse_json(self, obj: UploadedEvaluationBatch) -> Iterator[list[dict]]:
+        """Stream the items of a JSON batch file in blocks of ``settings.CSV_CHUNK_ROWS``.
 
-            # 使用 source 傳遞給 score_response
-            scores = score_response(question, response, standard_answer, question_source)
+        Parameters
+        ----------
+        obj : UploadedEvaluationBatch
+            The batch whose JSON file (a list of items) is read.
 
-            save_evaluation({
-                "exp_id": obj.name,
-                "test_paper_id": obj.id,
-                "question_id": question_id,
-                "question": question,
-                "response": response,
-                "standard_answer": standard_answer,
-                "question_source": question_source,
-                "scores": scores,
-            })
+        Yields:
+        ------
+        list[dict]
+            Blocks of items.
+        """
+        with obj.json_file.open("rb") as file:
+            yield from iter_json_chunks(file)
 
-    def parse_csv(self, raw: str) -> list[dict]:
-        """Parse CSV content into a list of dictionaries.
+    def parse_csv(self, obj: UploadedEvaluationBatch) -> Iterator[list[dict]]:
+        """Stream the rows of a CSV batch file in blocks of ``settings.CSV_CHUNK_ROWS``.
 
         Parameters
         ----------
-        raw : str
-            The raw CSV content as a string.
+        obj : UploadedEvaluationBatch
+            The batch whose CSV file is read.
 
-        Returns
-        -------
+        Yields:
+        ------
         list[dict]
-            A list of dictionaries representing the CSV rows.
+            Blocks of rows keyed by the CSV header.
         """
-        import csv
-        from io import StringIO
+        with obj.json_file.open("rb") as file:
+            for chunk in iter_chunks(file):
+                yield [row for _, row in chunk]
+
 
-        csv_data = StringIO(raw)
-        reader = csv.DictReader(csv_data)
-        return [row for row in reader]
 @admin.register(UploadedTestPaper)
 class UploadedTestPaperAdmin(admin.ModelAdmin):
     """Admin interface for managing UploadedTestPaper objects.
@@ -482,7 +958,8 @@ class UploadedTestPaperAdmin(admin.ModelAdmin):
     - Generating a download button for test papers in the admin interface.
     """
 
-    list_display = ("name", "uploaded_at", "download_button")
+    list_display = ("name", "uploaded_at", "download_button", "duplicate_of")
+    readonly_fields = ("content_sha256", "duplicate_of")
     search_fields = ("name",)
     actions: ClassVar[list[str]] = ["download_selected_papers", "export_as_csv", "export_as_json"]
     inlines: ClassVar[list] = [ExamPaperQuestionInline]
@@ -527,41 +1004,49 @@ class UploadedTestPaperAdmin(admin.ModelAdmin):
 
     def save_model(self, request: HttpRequest, obj: UploadedTestPaper, form: ModelForm, change: bool):
         """Save the UploadedTestPaper object and process its associated CSV file."""
+        original = None if change else detect_duplicate(obj, obj.csv_file)
+        if original and dedup_mode() == "reject":
+            self.message_user(
+                request,
+                f"The uploaded file is identical to test paper '{original.name}'. Upload rejected.",
+                level=messages.ERROR,
+            )
+            return
+        if original:
+            # 內容相同：不另存檔案也不重新匯入題目，連結到原試卷
+            obj.duplicate_of = original
+            obj.csv_file = original.csv_file.name
+            super().save_model(request, obj, form, change)
+            self.message_user(
+                request,
+                f"The uploaded file is identical to test paper '{original.name}': linked instead of re-imported.",
+                level=messages.INFO,
+            )
+            return
+
         super().save_model(request, obj, form, change)
 
-        with obj.csv_file.open("rb") as file:
-            csv_file = TextIOWrapper(file, encoding="utf-8")
-            reader = csv.DictReader(csv_file)
-
-            for idx, row in enumerate(reader, start=1):
-                # 1. 自動產生 question_id
-                question_id = generate_unique_uuid_question_id()
-
-                # 2. 建立題目
-                ExamPaperQuestion.objects.create(
-                    test_paper=obj,
-                    question_id=question_id,
-                    question=row["question"],
-                    standard_answer=row["standard_answer"],
-                    difficulty=int(row["difficulty"]),
-                    source=row["source"],
-                    tags=row["tags"],
-                )
+        # 串流逐塊讀取、驗證，每塊批次寫入題目與佔位評估紀錄
+        errors: list[RowError] = []
+        count = 0
+        try:
+            with obj.csv_file.open("rb") as file, transaction.atomic():
+                for rows in iter_question_chunks(file, errors):
+                    count += write_question_chunk(obj, rows)
+        except CSVFormatError as e:
+            self.message_user(request, f"Cannot import '{obj.csv_file.name}': {e}", level=messages.ERROR)
+            return
+        mark_written(obj.name)
+        invalidate(obj.name)
 
-                # 3. 空白回應自動評分
-                response = ""
-                reference = row["standard_answer"]
-                scores = ""
-                # 4. 儲存評估紀錄
-                save_evaluation({
-                    "exp_id": obj.name,
-                    "test_paper_id": obj.id,
-                    "question_id": question_id,
-                    "question": row["question"],
-                    "response": response,
-                    "reference": reference,
-                    "scores": scores,
-                })
+        for error in errors[:MAX_ROW_ERROR_MESSAGES]:
+            self.message_user(request, f"Skipping line {error.line}: {error.message}", level=messages.WARNING)
+        if len(errors) > MAX_ROW_ERROR_MESSAGES:
+            self.message_user(
+                request, f"... {len(errors) - MAX_ROW_ERROR_MESSAGES} more rows skipped.", level=messages.WARNING
+            )
+        if count:
+            self.message_user(request, f"Imported {count} questions.", level=messages.INFO)
 
     def download_button(self, obj: UploadedTestPaper):
         """Generate a download button for the test paper.
@@ -1,17 +1,38 @@
 import csv
 import hashlib
 import json
+import time
 import uuid
+from collections.abc import Iterator
 from typing import Any
 
-from django.http import Http404, HttpResponse
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import File, NinjaAPI, Schema
+from ninja.errors import HttpError
 from ninja.files import UploadedFile
+from pydantic import Field, ValidationError
 
+from app import cache, metrics
+from app.bulk import bulk_upsert
+from app.cache import cached_response
+from app.db_routers import mark_written, use_replica
+from app.idempotency import coalesce, derive_question_id, request_key
 from app.models import Evaluation, StandardAnswer
+from app.renderers import FastJSONRenderer
+from app.search import search_ids
+from app.streaming import Event, event_stream, iter_ndjson_batches, request_stream
+from app.usage import experiment_usage, usage_by_experiment
 
-api = NinjaAPI()
+api = NinjaAPI(renderer=FastJSONRenderer())
+
+# 重新上傳同一 (exp_id, question_id) 時覆寫的欄位
+UPLOAD_UPDATE_FIELDS = [
+    "test_question", "bot_response", "question_source", "standard_answer", "difficulty",
+    "accuracy", "relevance", "logic", "conciseness", "language_quality", "total_score",
+]
 
 
 class EvaluationRequest(Schema):
@@ -68,6 +89,14 @@ class EvaluationResponse(Schema):
         The language quality score of the bot's response.
     total_score : int
         The total score of the bot's response.
+    model : str
+        The LLM used to score the response (blank for non-LLM scoring).
+    prompt_tokens : int
+        Prompt tokens consumed by the scoring call.
+    completion_tokens : int
+        Completion tokens consumed by the scoring call.
+    latency_ms : int
+        Latency of the scoring call in milliseconds.
     """
     question_id: str
     exp_id: str
@@ -82,6 +111,98 @@ class EvaluationResponse(Schema):
     conciseness: int
     language_quality: int
     total_score: int
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: int = 0
+
+
+# 讀取端點直接以 .values() 取出這些欄位：資料庫內容可信，不再逐筆建立模型與 pydantic 驗證
+EVALUATION_RESPONSE_FIELDS = tuple(EvaluationResponse.model_fields)
+
+# 重試時須與已儲存的評分相同的請求欄位
+IDEMPOTENT_FIELDS = ("test_question", "question_source", "bot_response")
+
+
+class QuestionUsage(Schema):
+    """Token usage of a single scored question.
+
+    Attributes:
+    ----------
+    question_id : str
+        The ID of the question.
+    prompt_tokens : int
+        Prompt tokens consumed by the scoring call.
+    completion_tokens : int
+        Completion tokens consumed by the scoring call.
+    """
+    question_id: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class RouteUsage(Schema):
+    """Usage of the evaluations scored along one model route.
+
+    Attributes:
+    ----------
+    model : str
+        The scoring model.
+    routing_reason : str
+        The routing rule that chose the model.
+    evaluations : int
+        The number of evaluations scored along the route.
+    cost_usd : float
+        Total estimated cost in USD.
+    avg_latency_ms : float
+        Average scoring latency in milliseconds.
+    """
+    model: str
+    routing_reason: str
+    evaluations: int
+    cost_usd: float
+    avg_latency_ms: float
+
+
+class ExperimentUsage(Schema):
+    """Token, latency and cost rollup of an experiment.
+
+    Attributes:
+    ----------
+    exp_id : str
+        The ID of the test project.
+    evaluations : int
+        The number of evaluations in the experiment.
+    prompt_tokens : int
+        Total prompt tokens.
+    completion_tokens : int
+        Total completion tokens.
+    cost_usd : float
+        Total estimated cost in USD.
+    avg_latency_ms : float
+        Average scoring latency in milliseconds.
+    max_latency_ms : int
+        Slowest scoring latency in milliseconds.
+    top_prompt_questions : list[QuestionUsage]
+        The most prompt-heavy questions of the experiment.
+    routes : list[RouteUsage]
+        Usage per scoring model and routing rule.
+    """
+    exp_id: str
+    evaluations: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+    avg_latency_ms: float
+    max_latency_ms: int
+    top_prompt_questions: list[QuestionUsage] = Field(default_factory=list)
+    routes: list[RouteUsage] = Field(default_factory=list)
+
+
+def item_key(request: HttpResponse, index: int) -> str | None:
+    """Return the idempotency key of the ``index``-th item of a batch request."""
+    key = request_key(request)
+    return f"{key}:{index}" if key else None
 
 
 def generate_question_id() -> str:
@@ -118,42 +239,72 @@ def evaluate_response(bot_response: str, standard_answer: str) -> dict[str, int]
     }
 
 
-@api.post("/evaluate", response=EvaluationResponse)
-def evaluate(request: HttpResponse, data: EvaluationRequest) -> EvaluationResponse:
-    """Evaluate a single test question.
+def stored_evaluation(data: EvaluationRequest, question_id: str) -> EvaluationResponse | None:
+    """Return the stored evaluation of ``(data.exp_id, question_id)``, or None if it has not been scored.
 
-    Parameters
-    ----------
-    request : Any
-        The HTTP request object.
-    data : EvaluationRequest
-        The evaluation request data.
+    Raises:
+    ------
+    HttpError
+        409 if the stored evaluation was made for a different question, source or response.
+    """
+    row = (
+        Evaluation.objects.filter(exp_id=data.exp_id, question_id=question_id)
+        .values(*EVALUATION_RESPONSE_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    result = EvaluationResponse(**row)
+    ensure_same_request(data, result)
+    metrics.incr("idempotent_replayed")
+    return result
 
-    Returns:
-    -------
-    EvaluationResponse
-        The evaluation result.
+
+def ensure_same_request(data: EvaluationRequest, result: EvaluationResponse) -> None:
+    """Raise 409 if ``result`` was scored for a request with different content than ``data``."""
+    if any(getattr(result, field) != getattr(data, field) for field in IDEMPOTENT_FIELDS):
+        raise HttpError(409, conflict_detail(data.exp_id, result.question_id))
+
+
+def conflict_detail(exp_id: str, question_id: str) -> str:
+    """Return the error reported for a request conflicting with the stored ``(exp_id, question_id)``."""
+    return f"Evaluation {exp_id}/{question_id} already exists with a different request."
+
+
+def score_request(data: EvaluationRequest, question_id: str) -> EvaluationResponse:
+    """Score ``data`` and store it as ``(data.exp_id, question_id)``.
+
+    If another request stores the same evaluation first, its result is returned instead.
     """
-    _ = request
-    question_id = data.question_id or generate_question_id()
     try:
-        standard_answer_obj = StandardAnswer.objects.get(source=data.question_source)
+        with metrics.span("lookup"):
+            standard_answer_obj = StandardAnswer.objects.get(source=data.question_source)
     except StandardAnswer.DoesNotExist:
         raise Http404(f"No standard answer : {data.question_source}")
 
-    result = evaluate_response(data.bot_response, standard_answer_obj.content)
+    with metrics.span("score"):
+        result = evaluate_response(data.bot_response, standard_answer_obj.content)
     difficulty = 3
 
-    Evaluation.objects.create(
-        question_id=question_id,
-        exp_id=data.exp_id,
-        test_question=data.test_question,
-        bot_response=data.bot_response,
-        question_source=data.question_source,
-        standard_answer=standard_answer_obj.content,
-        difficulty=difficulty,
-        **result,
-    )
+    with metrics.span("persist"):
+        try:
+            with transaction.atomic():
+                Evaluation.objects.create(
+                    question_id=question_id,
+                    exp_id=data.exp_id,
+                    test_question=data.test_question,
+                    bot_response=data.bot_response,
+                    question_source=data.question_source,
+                    standard_answer=standard_answer_obj.content,
+                    difficulty=difficulty,
+                    **result,
+                )
+        except IntegrityError:
+            # 其他行程的重試已先寫入
+            stored = stored_evaluation(data, question_id)
+            if stored is None:
+                raise
+            return stored
 
     return EvaluationResponse(
         question_id=question_id,
@@ -167,10 +318,55 @@ def evaluate(request: HttpResponse, data: EvaluationRequest) -> EvaluationRespon
     )
 
 
+def evaluate_once(data: EvaluationRequest, idempotency_key: str | None) -> EvaluationResponse:
+    """Evaluate ``data`` at most once per ``(exp_id, question_id)``.
+
+    The question ID is ``data.question_id``, else derived from ``idempotency_key``; stored
+    results are returned without rescoring and concurrent identical requests share one scoring
+    call. Requests with neither get a random question ID and are always scored.
+    """
+    if data.question_id is None and idempotency_key is None:
+        return score_request(data, generate_question_id())
+
+    question_id = data.question_id or derive_question_id(idempotency_key)
+    result = coalesce(
+        (data.exp_id, question_id),
+        lambda: stored_evaluation(data, question_id) or score_request(data, question_id),
+    )
+    ensure_same_request(data, result)
+    return result
+
+
+@api.post("/evaluate", response=EvaluationResponse)
+def evaluate(request: HttpResponse, data: EvaluationRequest) -> EvaluationResponse:
+    """Evaluate a single test question.
+
+    Retries are safe: a request with the same ``exp_id`` and ``question_id`` (or, without a
+    ``question_id``, the same ``Idempotency-Key`` header) returns the stored result instead of
+    scoring again, and answers 409 if the question, source or response differ.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+    data : EvaluationRequest
+        The evaluation request data.
+
+    Returns:
+    -------
+    EvaluationResponse
+        The evaluation result.
+    """
+    return evaluate_once(data, request_key(request))
+
+
 @api.post("/evaluate/batch", response=list[EvaluationResponse])
 def batch_evaluate(request: HttpResponse, data: list[EvaluationRequest]) -> list[EvaluationResponse]:
     """Evaluate a batch of test questions.
 
+    Items are idempotent as in ``/evaluate``; the ``Idempotency-Key`` header of the batch
+    stands for ``<key>:<index>`` on each item without a ``question_id``.
+
     Parameters
     ----------
     request : Any
@@ -183,7 +379,199 @@ def batch_evaluate(request: HttpResponse, data: list[EvaluationRequest]) -> list
     list[EvaluationResponse]
         A list of evaluation results.
     """
-    return [evaluate(request, item) for item in data]
+    return [evaluate_once(item, item_key(request, index)) for index, item in enumerate(data)]
+
+
+@api.post("/evaluate/batch/stream")
+def batch_evaluate_stream(request: HttpResponse, data: list[EvaluationRequest]) -> StreamingHttpResponse:
+    """Evaluate a batch of test questions, streaming each result as soon as it is scored.
+
+    Emits one ``result`` event (an :class:`EvaluationResponse`) per scored item, an ``error``
+    event for an item without a standard answer, and a final ``summary`` event. The format is
+    SSE for ``Accept: text/event-stream`` and NDJSON otherwise.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+    data : list[EvaluationRequest]
+        A list of evaluation request data.
+
+    Returns:
+    -------
+    StreamingHttpResponse
+        The event stream.
+    """
+    def events() -> Iterator[Event]:
+        batch = metrics.BatchMetrics()
+        started = time.perf_counter()
+        scored = failed = total_score = 0
+        for index, item in enumerate(data):
+            try:
+                with metrics.collect(batch):
+                    result = evaluate_once(item, item_key(request, index))
+            except (Http404, HttpError) as e:
+                failed += 1
+                yield "error", {"index": index, "question_id": item.question_id, "detail": str(e)}
+                continue
+            scored += 1
+            total_score += result.total_score
+            yield "result", result.model_dump()
+
+        yield "summary", {
+            "items": len(data),
+            "scored": scored,
+            "failed": failed,
+            "avg_total_score": round(total_score / scored, 3) if scored else 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "metrics": batch.as_dict(),
+        }
+
+    return event_stream(request, events())
+
+
+def parse_stream_lines(batch: list[tuple[int, Any]]) -> tuple[list[tuple[int, EvaluationRequest]], list[dict]]:
+    """Validate a batch of ``/evaluate/stream`` lines into ``(line, request)`` pairs and line errors."""
+    items, errors = [], []
+    for line_num, value in batch:
+        if isinstance(value, ValueError):
+            errors.append({"line": line_num, "error": f"Invalid JSON: {value}"})
+            continue
+        try:
+            items.append((line_num, EvaluationRequest.model_validate(value)))
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append({"line": line_num, "error": detail})
+    return items, errors
+
+
+def stream_question_id(request: HttpResponse, item: EvaluationRequest, line_num: int) -> str:
+    """Return the question ID of a stream line, derived from ``<Idempotency-Key>:<line>`` when not given."""
+    if item.question_id:
+        return item.question_id
+    key = item_key(request, line_num)
+    return derive_question_id(key) if key else generate_question_id()
+
+
+def stored_requests(keys: set[tuple[str, str]]) -> dict[tuple[str, str], dict[str, Any]]:
+    """Return the request fields and ``total_score`` of the stored evaluations among ``keys``."""
+    if not keys:
+        return {}
+    rows = Evaluation.objects.filter(
+        exp_id__in={exp_id for exp_id, _ in keys}, question_id__in={question_id for _, question_id in keys}
+    ).values("exp_id", "question_id", "total_score", *IDEMPOTENT_FIELDS)
+    return {(row["exp_id"], row["question_id"]): row for row in rows if (row["exp_id"], row["question_id"]) in keys}
+
+
+def score_stream_items(
+    request: HttpResponse, items: list[tuple[int, EvaluationRequest]], errors: list[dict]
+) -> list[dict]:
+    """Score and store the valid lines of one ``/evaluate/stream`` batch.
+
+    As in ``/evaluate``, a line whose ``(exp_id, question_id)`` is already stored (or appears
+    earlier in the stream batch) is acknowledged with the stored score without rescoring, or
+    rejected if its question, source or response differ. Existing rows are never overwritten.
+
+    Returns:
+    -------
+    list[dict]
+        The accepted ``line`` / ``question_id`` / ``total_score`` entries; rejected lines are
+        appended to ``errors``.
+    """
+    keyed = [((item.exp_id, stream_question_id(request, item, line_num)), line_num, item) for line_num, item in items]
+    with metrics.span("lookup"):
+        stored = stored_requests({key for key, _, _ in keyed})
+        sources = {item.question_source for _, _, item in keyed}
+        standard_answers = StandardAnswer.objects.in_bulk(sources, field_name="source")
+
+    evaluations, results = [], []
+    with metrics.span("score"):
+        for key, line_num, item in keyed:
+            exp_id, question_id = key
+            if key in stored:
+                if any(stored[key][field] != getattr(item, field) for field in IDEMPOTENT_FIELDS):
+                    errors.append({"line": line_num, "error": conflict_detail(exp_id, question_id)})
+                    continue
+                metrics.incr("idempotent_replayed")
+                total_score = stored[key]["total_score"]
+                results.append({"line": line_num, "question_id": question_id, "total_score": total_score})
+                continue
+            standard_answer_obj = standard_answers.get(item.question_source)
+            if standard_answer_obj is None:
+                errors.append({"line": line_num, "error": f"No standard answer : {item.question_source}"})
+                continue
+            score = evaluate_response(item.bot_response, standard_answer_obj.content)
+            evaluations.append(Evaluation(
+                exp_id=exp_id,
+                question_id=question_id,
+                test_question=item.test_question,
+                bot_response=item.bot_response,
+                question_source=item.question_source,
+                standard_answer=standard_answer_obj.content,
+                difficulty=3,
+                **score,
+            ))
+            stored[key] = {**{field: getattr(item, field) for field in IDEMPOTENT_FIELDS}, **score}
+            results.append({"line": line_num, "question_id": question_id, "total_score": score["total_score"]})
+
+    if evaluations:
+        with metrics.span("persist"):
+            # 與並行寫入相撞時保留已寫入的列
+            Evaluation.objects.bulk_create(evaluations, batch_size=settings.BULK_BATCH_SIZE, ignore_conflicts=True)
+        exp_ids = {evaluation.exp_id for evaluation in evaluations}
+        for exp_id in exp_ids:
+            mark_written(exp_id)
+        cache.invalidate(*exp_ids)
+    return results
+
+
+@api.post("/evaluate/stream")
+def evaluate_stream(request: HttpResponse) -> StreamingHttpResponse:
+    """Evaluate newline-delimited ``EvaluationRequest`` objects read incrementally from the request body.
+
+    Lines are read through a bounded queue (``settings.NDJSON_MAX_PENDING_LINES``), so neither
+    side has to hold the whole payload; chunked bodies without a Content-Length are supported.
+    Each batch of lines is scored and stored, then acknowledged with an ``ack`` event listing the
+    accepted ``question_id`` / ``total_score`` pairs and the rejected line numbers. A final
+    ``summary`` event closes the stream.
+
+    Lines are idempotent as in ``/evaluate``: the ``Idempotency-Key`` header stands for
+    ``<key>:<line number>`` on each line without a ``question_id``, stored results are
+    acknowledged without rescoring, and lines conflicting with a stored evaluation are rejected.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object; its body is NDJSON, one evaluation request per line.
+
+    Returns:
+    -------
+    StreamingHttpResponse
+        The acknowledgement stream (SSE or NDJSON, see :func:`app.streaming.event_stream`).
+    """
+    def events() -> Iterator[Event]:
+        started = time.perf_counter()
+        lines = accepted = rejected = 0
+        batches = iter_ndjson_batches(
+            request_stream(request), settings.NDJSON_MAX_PENDING_LINES, settings.BULK_BATCH_SIZE
+        )
+        for batch in batches:
+            lines += len(batch)
+            with metrics.span("parse"):
+                items, errors = parse_stream_lines(batch)
+            results = score_stream_items(request, items, errors)
+            accepted += len(results)
+            rejected += len(errors)
+            yield "ack", {"line": batch[-1][0], "accepted": results, "rejected": errors}
+
+        yield "summary", {
+            "lines": lines,
+            "accepted": accepted,
+            "rejected": rejected,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    return event_stream(request, events())
 
 
 @api.get("/evaluations", response=dict[str, EvaluationResponse])
@@ -200,9 +588,12 @@ def get_all_evaluations(request: HttpResponse) -> dict[str, EvaluationResponse]:
     dict[str, EvaluationResponse]
         A dictionary of all evaluations keyed by question ID.
     """
-    _ = request
-    evaluations = Evaluation.objects.all()
-    return {evaluation.question_id: EvaluationResponse(**evaluation.__dict__) for evaluation in evaluations}
+    def build() -> HttpResponse:
+        with use_replica():
+            rows = Evaluation.objects.values(*EVALUATION_RESPONSE_FIELDS)
+            return api.create_response(request, {row["question_id"]: row for row in rows}, status=200)
+
+    return cached_response(request, "all_evaluations", cache.ALL_SCOPE, build)
 
 
 @api.get("/evaluation/{question_id}", response=EvaluationResponse)
@@ -221,9 +612,12 @@ def get_evaluation(request: HttpResponse, question_id: str) -> EvaluationRespons
     EvaluationResponse
         The evaluation result.
     """
-    _ = request
-    evaluation = get_object_or_404(Evaluation, question_id=question_id)
-    return EvaluationResponse(**evaluation.__dict__)
+    def build() -> HttpResponse:
+        with use_replica():
+            row = get_object_or_404(Evaluation.objects.values(*EVALUATION_RESPONSE_FIELDS), question_id=question_id)
+        return api.create_response(request, row, status=200)
+
+    return cached_response(request, f"evaluation:{question_id}", cache.ALL_SCOPE, build)
 
 
 @api.get("/project/{project_id}/evaluations", response=list[EvaluationResponse])
@@ -242,14 +636,45 @@ def get_project_evaluations(request: HttpResponse, project_id: str) -> list[Eval
     list[EvaluationResponse]
         A list of evaluation results for the project.
     """
-    _ = request
-    evaluations = Evaluation.objects.filter(exp_id=project_id)
-    return [EvaluationResponse(**evaluation.__dict__) for evaluation in evaluations]
+    def build() -> HttpResponse:
+        with use_replica(project_id):
+            rows = list(Evaluation.objects.filter(exp_id=project_id).values(*EVALUATION_RESPONSE_FIELDS))
+        return api.create_response(request, rows, status=200)
 
+    return cached_response(request, f"project_evaluations:{project_id}", project_id, build)
 
-@api.get("/project/{project_id}/export_csv")
-def export_project_csv(request: HttpResponse, project_id: str) -> HttpResponse:
-    """Export evaluations for a project as a CSV file.
+
+@api.get("/search", response=list[EvaluationResponse])
+def search(request: HttpResponse, q: str, exp_id: str | None = None, limit: int = 50) -> list[EvaluationResponse]:
+    """Full-text search over test questions and bot responses.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+    q : str
+        Words to look for (Chinese text is matched as a phrase of character bigrams).
+    exp_id : str | None
+        Only search this project (optional).
+    limit : int
+        Maximum number of results, at most 500.
+
+    Returns:
+    -------
+    list[EvaluationResponse]
+        The matching evaluations, best matches first.
+    """
+    with use_replica(exp_id), metrics.span("search"):
+        using = router.db_for_read(Evaluation)
+        ids = search_ids(q, exp_id=exp_id, limit=max(1, min(limit, 500)), using=using)
+        rows = Evaluation.objects.using(using).filter(id__in=ids).values("id", *EVALUATION_RESPONSE_FIELDS)
+        found = {row.pop("id"): row for row in rows}
+    return api.create_response(request, [found[pk] for pk in ids if pk in found], status=200)
+
+
+@api.get("/project/{project_id}/usage", response=ExperimentUsage)
+def get_project_usage(request: HttpResponse, project_id: str) -> ExperimentUsage:
+    """Retrieve token, latency and cost usage for a specific project.
 
     Parameters
     ----------
@@ -260,43 +685,86 @@ def export_project_csv(request: HttpResponse, project_id: str) -> HttpResponse:
 
     Returns:
     -------
-    HttpResponse
-        A response containing the CSV file.
+    ExperimentUsage
+        The usage rollup, including the most prompt-heavy questions and the usage per model route.
     """
     _ = request
-    evaluations = Evaluation.objects.filter(exp_id=project_id)
-    if not evaluations.exists():
+    usage = experiment_usage(project_id)
+    if not usage["evaluations"]:
         raise Http404(f"未找到測試項目 {project_id} 的資料")
+    return ExperimentUsage(**usage)
+
+
+@api.get("/usage", response=list[ExperimentUsage])
+def get_usage(request: HttpResponse) -> list[ExperimentUsage]:
+    """Retrieve token, latency and cost usage rolled up per project.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+
+    Returns:
+    -------
+    list[ExperimentUsage]
+        One usage rollup per project.
+    """
+    _ = request
+    return [ExperimentUsage(**usage) for usage in usage_by_experiment()]
 
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="project_{project_id}_evaluations.csv"'
 
-    writer = csv.writer(response)
-    writer.writerow([
-        "question_id", "exp_id", "test_question", "bot_response",
-        "question_source", "standard_answer", "difficulty",
-        "accuracy", "relevance", "logic", "conciseness", "language_quality",
-        "total_score", "created_at",
-    ])
-
-    for evaluation in evaluations:
-        writer.writerow([
-            evaluation.question_id,
-            evaluation.exp_id,
-            evaluation.test_question,
-            evaluation.bot_response,
-            evaluation.question_source,
-            evaluation.standard_answer,
-            evaluation.difficulty,
-            evaluation.accuracy,
-            evaluation.relevance,
-            evaluation.logic,
-            evaluation.conciseness,
-            evaluation.language_quality,
-            evaluation.total_score,
-            evaluation.created_at.isoformat(),
-        ])
+class CSVLineBuffer:
+    """A write-only file object whose ``write`` returns the line, so ``csv.writer`` output can be streamed."""
+
+    def write(self, line: str) -> str:
+        """Return ``line`` instead of storing it."""
+        return line
+
+
+EXPORT_CSV_COLUMNS = [
+    "question_id", "exp_id", "test_question", "bot_response",
+    "question_source", "standard_answer", "difficulty",
+    "accuracy", "relevance", "logic", "conciseness", "language_quality",
+    "total_score", "created_at",
+]
+
+
+@api.get("/project/{project_id}/export_csv")
+def export_project_csv(request: HttpResponse, project_id: str) -> StreamingHttpResponse:
+    """Export evaluations for a project as a CSV file.
+
+    The rows are streamed as they are read, so the export never holds the whole file in
+    memory; it is not cached for the same reason.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+    project_id : str
+        The ID of the project.
 
+    Returns:
+    -------
+    StreamingHttpResponse
+        A response streaming the CSV file.
+    """
+    _ = request
+    with use_replica(project_id):
+        evaluations = Evaluation.objects.filter(exp_id=project_id)
+        if not evaluations.exists():
+            raise Http404(f"未找到測試項目 {project_id} 的資料")
+        # 回應在 view 返回後才逐行產生，先固定讀取的資料庫 (replica 或 primary)
+        evaluations = evaluations.using(evaluations.db).values_list(*EXPORT_CSV_COLUMNS)
+
+    def rows() -> Iterator[str]:
+        writer = csv.writer(CSVLineBuffer())
+        yield writer.writerow(EXPORT_CSV_COLUMNS)
+        # 以 iterator() 分段讀取，長時間匯出不會佔住 primary
+        for *values, created_at in evaluations.iterator(chunk_size=2000):
+            yield writer.writerow([*values, created_at.isoformat()])
+
+    response = StreamingHttpResponse(rows(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="project_{project_id}_evaluations.csv"'
     return response
 
 
@@ -325,6 +793,12 @@ def upload_json(request: HttpResponse, file: UploadedFile = File(...), project_i
     except Exception as e:
         raise Http404(f"無法解析 JSON 檔案:{e}")
 
+    # 一次查出所有用到的標準答案，避免每筆一次查詢
+    titles = {item["sources"][0].get("title", "") for item in data if item.get("sources")}
+    standard_answers = StandardAnswer.objects.in_bulk(titles, field_name="source")
+
+    exp_id = project_id or "uploaded_project"
+    evaluations = {}
     results = []
     for item in data:
         question_id = item.get("question_id") or generate_question_id()
@@ -338,25 +812,21 @@ def upload_json(request: HttpResponse, file: UploadedFile = File(...), project_i
         source_title = sources[0].get("title", "")
         reference = sources[0].get("content", "")
 
-        try:
-            standard_answer_obj = StandardAnswer.objects.get(source=source_title)
-            standard_answer = standard_answer_obj.content
-        except StandardAnswer.DoesNotExist:
-            standard_answer = reference  # Fallback to provided content
+        standard_answer_obj = standard_answers.get(source_title)
+        standard_answer = standard_answer_obj.content if standard_answer_obj else reference  # Fallback to provided content
 
         score = evaluate_response(response, standard_answer)
 
-        Evaluation.objects.update_or_create(
+        # 同一檔案內重複的 question_id 以最後一筆為準
+        evaluations[question_id] = Evaluation(
+            exp_id=exp_id,
             question_id=question_id,
-            defaults={
-                "exp_id": project_id or "uploaded_project",
-                "test_question": question,
-                "bot_response": response,
-                "question_source": source_title,
-                "standard_answer": standard_answer,
-                "difficulty": 3,
-                **score,
-            },
+            test_question=question,
+            bot_response=response,
+            question_source=source_title,
+            standard_answer=standard_answer,
+            difficulty=3,
+            **score,
         )
 
         results.append({
@@ -364,4 +834,30 @@ def upload_json(request: HttpResponse, file: UploadedFile = File(...), project_i
             "total_score": str(score["total_score"]),
         })
 
+    bulk_upsert(
+        Evaluation,
+        evaluations.values(),
+        unique_fields=["exp_id", "question_id"],
+        update_fields=UPLOAD_UPDATE_FIELDS,
+    )
+    mark_written(exp_id)
+    cache.invalidate(exp_id)
     return results
+
+
+@api.get("/metrics")
+def prometheus_metrics(request: HttpResponse) -> HttpResponse:
+    """Expose pipeline stage timings and counters in the Prometheus text format.
+
+    Parameters
+    ----------
+    request : Any
+        The HTTP request object.
+
+    Returns:
+    -------
+    HttpResponse
+        A ``text/plain`` response in the Prometheus exposition format.
+    """
+    _ = request
+    return HttpResponse(metrics.REGISTRY.render_prometheus(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,23 @@
+from django.apps import AppConfig
+
+
+class BenchmarkConfig(AppConfig):
+    """Configuration of the benchmark app."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'app'
+
+    def ready(self) -> None:
+        """Apply the SQLite connection profile, keep the search triggers and hook cache invalidation into writes."""
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_migrate, post_save
+
+        from app.cache import invalidate_evaluation
+        from app.db import configure_sqlite
+        from app.models import Evaluation
+        from app.search import ensure_triggers
+
+        connection_created.connect(configure_sqlite, dispatch_uid="app.db.configure_sqlite")
+        post_migrate.connect(ensure_triggers, sender=self, dispatch_uid="app.search.ensure_triggers")
+        post_save.connect(invalidate_evaluation, sender=Evaluation, dispatch_uid="app.cache.invalidate_evaluation")
+        post_delete.connect(invalidate_evaluation, sender=Evaluation, dispatch_uid="app.cache.invalidate_evaluation")
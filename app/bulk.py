@@ -0,0 +1,167 @@
+"""Bulk-ingest fast path.
+
+- PostgreSQL (psycopg 3)：``COPY ... FROM STDIN`` 串流寫入
+- 其他資料庫：預先組好的 INSERT 分批 ``executemany``
+- Upsert：``INSERT ... ON CONFLICT (...) DO UPDATE`` (``bulk_create(update_conflicts=True)``)
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, models, transaction
+
+from app import metrics
+
+
+def _batches(objs: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(objs)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def copy_supported(using: str = "default") -> bool:
+    """Return True when ``using`` is PostgreSQL on psycopg 3, which exposes ``COPY FROM STDIN``."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    return is_psycopg3
+
+
+def _insert_fields(model: type[models.Model]) -> list[models.Field]:
+    # 資料庫產生的欄位 (GeneratedField) 不可寫入
+    return [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, models.AutoField) and not field.generated
+    ]
+
+
+def _rows(fields: list[models.Field], objs: Iterable[models.Model], connection: Any) -> Iterator[list[Any]]:
+    """Yield the database values of ``objs``, prepared the same way ``bulk_create`` prepares them."""
+    for obj in objs:
+        # pre_save 處理 auto_now_add 等欄位
+        yield [field.get_db_prep_save(field.pre_save(obj, add=True), connection=connection) for field in fields]
+
+
+def _copy(model: type[models.Model], objs: Iterable[models.Model], using: str) -> int:
+    """Stream unsaved ``objs`` into the model's table with ``COPY FROM STDIN``."""
+    connection = connections[using]
+    fields = _insert_fields(model)
+    quote = connection.ops.quote_name
+    statement = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+    )
+    count = 0
+    with transaction.atomic(using=using), connection.cursor() as cursor, cursor.cursor.copy(statement) as copy:
+        for row in _rows(fields, objs, connection):
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def _executemany(model: type[models.Model], objs: Iterable[models.Model], batch_size: int, using: str) -> int:
+    """Insert unsaved ``objs`` with one prepared INSERT run through ``executemany`` per batch.
+
+    Unlike ``bulk_create``, the statement is built once instead of once per batch, and the
+    batch size is not capped by the backend's query-parameter limit.
+    """
+    connection = connections[using]
+    fields = _insert_fields(model)
+    quote = connection.ops.quote_name
+    statement = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    count = 0
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for batch in _batches(_rows(fields, objs, connection), batch_size):
+            cursor.executemany(statement, batch)
+            count += len(batch)
+    return count
+
+
+def bulk_load(
+    model: type[models.Model],
+    objs: Iterable[models.Model],
+    batch_size: int | None = None,
+    using: str = "default",
+) -> int:
+    """Insert unsaved instances as fast as the backend allows.
+
+    Parameters
+    ----------
+    model : type[models.Model]
+        The model of ``objs``.
+    objs : Iterable[models.Model]
+        Unsaved instances; consumed lazily so large imports stay in bounded memory.
+    batch_size : int | None
+        Rows per ``executemany`` call on non-PostgreSQL backends; defaults to
+        ``settings.BULK_BATCH_SIZE``.
+    using : str
+        The database alias.
+
+    Returns:
+    -------
+    int
+        The number of rows inserted.
+
+    Note:
+        Instances are not refreshed with their primary keys, and no signals are sent.
+    """
+    with metrics.span("persist"):
+        if copy_supported(using):
+            count = _copy(model, objs, using)
+        else:
+            count = _executemany(model, objs, batch_size or settings.BULK_BATCH_SIZE, using)
+    metrics.incr("rows_written", count)
+    return count
+
+
+def bulk_upsert(
+    model: type[models.Model],
+    objs: Iterable[models.Model],
+    unique_fields: list[str],
+    update_fields: list[str],
+    batch_size: int | None = None,
+    using: str = "default",
+) -> int:
+    """Insert ``objs`` or update the rows that collide on ``unique_fields``.
+
+    Parameters
+    ----------
+    model : type[models.Model]
+        The model of ``objs``.
+    objs : Iterable[models.Model]
+        Unsaved instances.
+    unique_fields : list[str]
+        Fields of the unique constraint used as the ``ON CONFLICT`` target.
+    update_fields : list[str]
+        Fields overwritten when a row already exists.
+    batch_size : int | None
+        Rows per statement; defaults to ``settings.BULK_BATCH_SIZE``.
+    using : str
+        The database alias.
+
+    Returns:
+    -------
+    int
+        The number of rows inserted or updated.
+    """
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    count = 0
+    with metrics.span("persist"), transaction.atomic(using=using):
+        for batch in _batches(objs, batch_size):
+            model.objects.using(using).bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+            count += len(batch)
+    metrics.incr("rows_written", count)
+    return count
@@ -0,0 +1,147 @@
+"""Versioned response cache for the read-only evaluation endpoints.
+
+每個實驗 (exp_id) 有一個版本號，寫入時遞增；回應以「範圍 + 版本」為 key 快取，
+舊版本的快取自然失效，不需逐一刪除。ETag 也由版本號推得，If-None-Match 命中時
+只需讀取快取中的版本號即可回傳 304，不會碰到資料庫。
+
+版本號必須由所有程序共用，否則其他程序看不到寫入而持續回傳舊內容，因此啟用快取
+(``settings.EVALUATION_CACHE_TIMEOUT`` > 0) 時須使用共用的快取後端 (見 :func:`require_shared_cache`)。
+"""
+
+import hashlib
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from app import metrics
+
+VERSION_KEY = "evaluations:version:{}"
+RESPONSE_KEY = "evaluations:response:{}:{}"
+ALL_SCOPE = "*"  # 任何實驗寫入都會遞增，用於跨實驗的端點
+
+# 快取回應時一併保存的標頭
+CACHED_HEADERS = ("Content-Type", "Content-Disposition")
+
+# 每個程序各自一份的快取後端
+PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def require_shared_cache(feature: str) -> None:
+    """Raise ImproperlyConfigured unless the default cache is shared between processes.
+
+    Parameters
+    ----------
+    feature : str
+        The setting that needs the shared cache, named in the error message.
+
+    Raises:
+    ------
+    ImproperlyConfigured
+        If the default cache is per process (see :data:`PROCESS_LOCAL_CACHES`).
+    """
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"{feature} needs a cache shared by every process (e.g. CACHE_BACKEND=file); "
+            "the locmem cache is per process."
+        )
+
+
+def enabled() -> bool:
+    """Return True when responses are cached, i.e. ``settings.EVALUATION_CACHE_TIMEOUT`` is positive.
+
+    Raises:
+    ------
+    ImproperlyConfigured
+        If caching is enabled on a per-process cache.
+    """
+    if settings.EVALUATION_CACHE_TIMEOUT <= 0:
+        return False
+    require_shared_cache("EVALUATION_CACHE_TIMEOUT")
+    return True
+
+
+def version(scope: str) -> int:
+    """Return the current version of ``scope`` (an exp_id or :data:`ALL_SCOPE`)."""
+    key = VERSION_KEY.format(scope)
+    # 以時間為初始值，快取被清除後不會重複使用舊版本號 (避免誤判 ETag 相符)
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+
+def _bump(scope: str) -> None:
+    key = VERSION_KEY.format(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*exp_ids: str) -> None:
+    """Invalidate cached responses of ``exp_ids`` and of the cross-experiment endpoints."""
+    for exp_id in exp_ids:
+        _bump(exp_id)
+    _bump(ALL_SCOPE)
+
+
+def invalidate_evaluation(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """Invalidate the experiment of a saved or deleted Evaluation (``post_save`` / ``post_delete`` receiver)."""
+    _ = sender, kwargs
+    invalidate(instance.exp_id)
+
+
+def etag_for(view: str, scope: str) -> str:
+    """Return the ETag of ``view`` at the current version of ``scope``."""
+    digest = hashlib.sha1(f"{view}:{version(scope)}".encode()).hexdigest()  # noqa: S324
+    return f'"{digest}"'
+
+
+def cached_response(request: HttpRequest, view: str, scope: str, build: Callable[[], HttpResponse]) -> HttpResponse:
+    """Serve ``view`` from the cache, answering ``If-None-Match`` with 304 when the ETag still matches.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The HTTP request object.
+    view : str
+        Identifies the endpoint and its arguments, e.g. ``project_evaluations:exp001``.
+    scope : str
+        The exp_id whose writes invalidate the response, or :data:`ALL_SCOPE`.
+    build : Callable[[], HttpResponse]
+        Builds the response on a cache miss; only 200 responses are cached.
+
+    Returns:
+    -------
+    HttpResponse
+        A 304, the cached response, or the freshly built one, carrying an ``ETag`` header;
+        just the built response when caching is disabled.
+    """
+    if not enabled():
+        return build()
+    etag = etag_for(view, scope)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        metrics.incr("cache_not_modified")
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    key = RESPONSE_KEY.format(view, etag)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.incr("cache_hits")
+        content, headers = cached
+        response = HttpResponse(content)
+        for name, value in headers.items():
+            response[name] = value
+    else:
+        metrics.incr("cache_misses")
+        response = build()
+        if response.status_code == 200:  # noqa: PLR2004
+            headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+            cache.set(key, (response.content, headers), timeout=settings.EVALUATION_CACHE_TIMEOUT)
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,149 @@
+"""Source-context budgeting for scoring prompts.
+
+把參考資料切成小段，依與題目 / 標準答案的詞彙相關度 (BM25) 排序，
+只保留 token 預算內最相關的段落，避免整份文件被塞進 prompt。
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any
+
+from django.conf import settings
+
+_CJK = r"\u3400-\u9fff\uf900-\ufaff"
+_CJK_RE = re.compile(f"[{_CJK}]")
+_TERM_RE = re.compile(f"[{_CJK}]+|[^\\W{_CJK}]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the token count of ``text`` (one token per CJK char, ~4 chars otherwise)."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def terms(text: str) -> list[str]:
+    """Split ``text`` into lexical terms: lower-cased words and CJK character bigrams."""
+    result = []
+    for run in _TERM_RE.findall(text.lower()):
+        if _CJK_RE.match(run):
+            result.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+        else:
+            result.append(run)
+    return result
+
+
+def _lines(text: str, chunk_tokens: int) -> list[str]:
+    """Return the non-empty lines of ``text``, cutting lines longer than ``chunk_tokens`` (when positive)."""
+    lines = []
+    for line in (line.strip() for line in text.splitlines()):
+        if not line:
+            continue
+        parts = math.ceil(count_tokens(line) / chunk_tokens) if chunk_tokens > 0 else 1
+        step = math.ceil(len(line) / parts)
+        lines.extend(line[i:i + step] for i in range(0, len(line), step))
+    return lines
+
+
+def split_chunks(source: Any, chunk_tokens: int) -> list[str]:
+    """Flatten ``source`` into text chunks of at most ``chunk_tokens`` tokens.
+
+    Parameters
+    ----------
+    source : Any
+        A string, a list of strings, or a list of ``{"title", "content"}`` dicts
+        (the ``sources`` of an uploaded batch item).
+    chunk_tokens : int
+        Maximum size of a chunk; ``0`` keeps every document as a single chunk.
+
+    Returns:
+    -------
+    list[str]
+        The chunks in document order; chunks from a titled source are prefixed with ``[title]``.
+    """
+    if not source:
+        return []
+    documents = source if isinstance(source, list) else [source]
+
+    chunks = []
+    for document in documents:
+        if isinstance(document, dict):
+            title = document.get("title", "")
+            text = str(document.get("content", ""))
+        else:
+            title, text = "", str(document)
+        prefix = f"[{title}] " if title else ""
+
+        current: list[str] = []
+        size = 0
+        for line in _lines(text, chunk_tokens):
+            line_tokens = count_tokens(line)
+            if current and 0 < chunk_tokens < size + line_tokens:
+                chunks.append(prefix + " ".join(current))
+                current, size = [], 0
+            current.append(line)
+            size += line_tokens
+        if current:
+            chunks.append(prefix + " ".join(current))
+    return chunks
+
+
+def rank_chunks(chunks: list[str], query: str) -> list[float]:
+    """Score every chunk against ``query`` with BM25 over :func:`terms`."""
+    query_terms = set(terms(query))
+    chunk_terms = [Counter(terms(chunk)) for chunk in chunks]
+    if not chunks or not query_terms:
+        return [0.0] * len(chunks)
+
+    avg_length = sum(sum(tf.values()) for tf in chunk_terms) / len(chunks) or 1
+    document_frequency = Counter(term for tf in chunk_terms for term in query_terms if term in tf)
+    scores = []
+    for tf in chunk_terms:
+        length = sum(tf.values())
+        score = 0.0
+        for term in query_terms:
+            if term not in tf:
+                continue
+            idf = math.log(1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            norm = tf[term] + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            score += idf * tf[term] * (BM25_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def select_context(source: Any, question: str, standard_answer: str, budget: int | None = None) -> str:
+    """Keep only the source chunks most relevant to the question within a token budget.
+
+    Parameters
+    ----------
+    source : Any
+        The raw source (string, list of strings or list of ``{"title", "content"}`` dicts).
+    question : str
+        The question text.
+    standard_answer : str
+        The reference answer.
+    budget : int | None
+        Token budget; defaults to ``settings.SOURCE_TOKEN_BUDGET``. ``0`` disables budgeting.
+
+    Returns:
+    -------
+    str
+        The selected chunks in their original order, separated by blank lines.
+    """
+    budget = settings.SOURCE_TOKEN_BUDGET if budget is None else budget
+    chunks = split_chunks(source, settings.SOURCE_CHUNK_TOKENS)
+    if budget <= 0:
+        return "\n\n".join(chunks)
+
+    scores = rank_chunks(chunks, f"{question}\n{standard_answer}")
+    selected, used = set(), 0
+    for index in sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True):
+        size = count_tokens(chunks[index])
+        if used + size > budget:
+            continue
+        selected.add(index)
+        used += size
+    return "\n\n".join(chunk for index, chunk in enumerate(chunks) if index in selected)
@@ -0,0 +1,139 @@
+"""Streaming, chunked CSV reading for uploaded test papers and evaluation batches.
+
+檔案以串流方式逐塊 (``settings.CSV_CHUNK_ROWS`` 列) 讀取、驗證與轉型，每一塊交給
+bulk 寫入；記憶體用量只與 chunk 大小有關，與檔案大小無關。
+"""
+
+import csv
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from io import TextIOWrapper
+from typing import IO, Any
+
+from django.conf import settings
+
+DEFAULT_DIFFICULTY = 3
+
+QUESTION_REQUIRED_COLUMNS = ("question", "standard_answer")
+QUESTION_OPTIONAL_COLUMNS = ("source", "tags")
+
+
+class CSVFormatError(ValueError):
+    """Raised when a CSV file lacks the columns required to ingest it."""
+
+
+@dataclass
+class RowError:
+    """A CSV row rejected by validation.
+
+    Attributes:
+    ----------
+    line : int
+        The line number of the row in the file (the header is line 1).
+    message : str
+        Why the row was rejected.
+    """
+    line: int
+    message: str
+
+
+def coerce_difficulty(value: str | None) -> int:
+    """Convert a difficulty cell to int; blank cells default to 3.
+
+    Raises:
+    ------
+    ValueError
+        If the cell is not a whole number.
+    """
+    value = (value or "").strip()
+    if not value:
+        return DEFAULT_DIFFICULTY
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"difficulty must be a whole number, got {value!r}")
+    return int(number)
+
+
+def iter_chunks(
+    file: IO[bytes],
+    chunk_rows: int | None = None,
+    required: Iterable[str] = (),
+) -> Iterator[list[tuple[int, dict[str, str]]]]:
+    """Yield the rows of a CSV file in blocks of at most ``chunk_rows``.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        A binary file object, read sequentially.
+    chunk_rows : int | None
+        Rows per block; defaults to ``settings.CSV_CHUNK_ROWS``.
+    required : Iterable[str]
+        Columns the header must contain.
+
+    Yields:
+    ------
+    list[tuple[int, dict[str, str]]]
+        ``(line number, row)`` pairs.
+
+    Raises:
+    ------
+    CSVFormatError
+        If the header lacks a required column.
+    """
+    chunk_rows = chunk_rows or settings.CSV_CHUNK_ROWS
+    # utf-8-sig：Excel 匯出的 CSV 常帶 BOM
+    reader = csv.DictReader(TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    missing = [column for column in required if column not in (reader.fieldnames or [])]
+    if missing:
+        raise CSVFormatError(f"Missing required column(s): {', '.join(missing)}")
+
+    chunk: list[tuple[int, dict[str, str]]] = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_question_chunks(
+    file: IO[bytes],
+    errors: list[RowError],
+    chunk_rows: int | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield validated test-paper question rows in blocks.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        A test-paper CSV (``question, standard_answer, difficulty, source, tags``).
+    errors : list[RowError]
+        Rejected rows are appended here instead of aborting the import.
+    chunk_rows : int | None
+        Rows per block; defaults to ``settings.CSV_CHUNK_ROWS``.
+
+    Yields:
+    ------
+    list[dict[str, Any]]
+        Rows with stripped text, ``difficulty`` as int and optional columns defaulted to ``""``.
+    """
+    for chunk in iter_chunks(file, chunk_rows, required=QUESTION_REQUIRED_COLUMNS):
+        rows = []
+        for line, row in chunk:
+            blank = [column for column in QUESTION_REQUIRED_COLUMNS if not (row.get(column) or "").strip()]
+            if blank:
+                errors.append(RowError(line, f"empty {', '.join(blank)}"))
+                continue
+            try:
+                difficulty = coerce_difficulty(row.get("difficulty"))
+            except ValueError as e:
+                errors.append(RowError(line, str(e)))
+                continue
+            rows.append({
+                **{column: row[column].strip() for column in QUESTION_REQUIRED_COLUMNS},
+                **{column: (row.get(column) or "").strip() for column in QUESTION_OPTIONAL_COLUMNS},
+                "difficulty": difficulty,
+            })
+        if rows:
+            yield rows
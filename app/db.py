@@ -0,0 +1,28 @@
+"""SQLite connection profile.
+
+每個新的 SQLite 連線都會套用 ``settings.SQLITE_PRAGMAS``：WAL、synchronous=NORMAL、
+busy_timeout、mmap 與 cache 大小，讓批次寫入與 API 寫入可以並行而不會 "database is locked"；
+並註冊全文檢索 trigger 需要的 ``search_terms()`` 函式 (見 :mod:`app.search`)。
+"""
+
+from typing import Any
+
+from django.conf import settings
+
+
+def apply_pragmas(cursor: Any, pragmas: dict[str, Any]) -> None:
+    """Execute ``PRAGMA name=value`` for every entry of ``pragmas`` on ``cursor``."""
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+
+
+def configure_sqlite(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """``connection_created`` handler applying ``settings.SQLITE_PRAGMAS`` to SQLite connections."""
+    from app.search import register_functions
+
+    _ = sender, kwargs
+    if connection.vendor != "sqlite":
+        return
+    register_functions(connection.connection)
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
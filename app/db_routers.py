@@ -0,0 +1,93 @@
+"""Primary / read-replica database routing.
+
+寫入一律走 primary；只有在 :func:`use_replica` 區塊內的讀取 (API 列表、匯出、admin 列表)
+才會送到 ``settings.DB_REPLICA_ALIAS``。批次寫入完成後可開啟 read-your-writes 視窗，
+期間該實驗的讀取仍走 primary，避免讀到 replica 尚未同步的資料。視窗記在快取中，
+寫入與之後的讀取可能由不同程序處理，因此須使用共用的快取後端。
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from app.cache import require_shared_cache
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+RECENT_WRITE_KEY = "db_routers:recent_write:{}"
+
+
+def replica_alias() -> str | None:
+    """Return the configured replica alias, or None when no replica database is defined."""
+    alias = settings.DB_REPLICA_ALIAS
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def read_your_writes() -> bool:
+    """Return True when a replica is configured and ``settings.READ_YOUR_WRITES_SECONDS`` is positive.
+
+    Raises:
+    ------
+    ImproperlyConfigured
+        If the windows would be kept in a per-process cache, where other processes cannot see them.
+    """
+    if settings.READ_YOUR_WRITES_SECONDS <= 0 or replica_alias() is None:
+        return False
+    require_shared_cache("READ_YOUR_WRITES_SECONDS")
+    return True
+
+
+def mark_written(exp_id: str) -> None:
+    """Open the read-your-writes window for ``exp_id`` after a write to the primary.
+
+    Does nothing unless :func:`read_your_writes` is enabled.
+    """
+    if read_your_writes():
+        cache.set(RECENT_WRITE_KEY.format(exp_id), True, timeout=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def recently_written(exp_id: str) -> bool:
+    """Return True while ``exp_id`` is inside its read-your-writes window."""
+    return read_your_writes() and bool(cache.get(RECENT_WRITE_KEY.format(exp_id)))
+
+
+@contextmanager
+def use_replica(exp_id: str | None = None) -> Iterator[None]:
+    """Route the reads made inside the block to the replica.
+
+    Parameters
+    ----------
+    exp_id : str | None
+        The experiment being read. Reads stay on the primary while it is inside its
+        read-your-writes window.
+    """
+    enabled = replica_alias() is not None and not (exp_id and recently_written(exp_id))
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside :func:`use_replica` and everything else to the primary."""
+
+    def db_for_read(self, model: Any, **hints: Any) -> str | None:
+        """Return the replica alias when replica reads are enabled for the current context."""
+        _ = model, hints
+        return replica_alias() if _use_replica.get() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        """Always write to the primary."""
+        _ = model, hints
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        """Allow relations between objects read from either database; they hold the same data."""
+        _ = obj1, obj2, hints
+        return True
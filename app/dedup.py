@@ -0,0 +1,63 @@
+"""Content-hash deduplication of uploaded test papers and evaluation batches.
+
+上傳檔案以串流方式計算 SHA-256；內容與既有紀錄相同時，依 ``settings.UPLOAD_DEDUP_MODE``：
+
+- ``link``：不重複存檔與匯入，新紀錄以 ``duplicate_of`` 指向原始紀錄
+- ``reject``：拒絕上傳
+- ``off``：照常匯入 (仍會記錄雜湊值)
+"""
+
+import hashlib
+from typing import IO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import Model
+from django.db.models.fields.files import FieldFile
+
+DEDUP_MODES = ("link", "reject", "off")
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def dedup_mode() -> str:
+    """Return the configured ``UPLOAD_DEDUP_MODE``."""
+    mode = settings.UPLOAD_DEDUP_MODE
+    if mode not in DEDUP_MODES:
+        raise ImproperlyConfigured(f"UPLOAD_DEDUP_MODE must be one of {', '.join(DEDUP_MODES)}, got {mode!r}")
+    return mode
+
+
+def sha256_stream(file: IO[bytes]) -> str:
+    """Return the hex SHA-256 of a binary file object, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    while block := file.read(HASH_CHUNK_BYTES):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def sha256_field_file(field_file: FieldFile) -> str:
+    """Return the hex SHA-256 of an uploaded (not yet stored) or stored file field.
+
+    An uploaded file is rewound afterwards so it can still be saved; a stored file is closed.
+    """
+    field_file.open("rb")
+    try:
+        field_file.seek(0)
+        return sha256_stream(field_file)
+    finally:
+        if isinstance(field_file.file, UploadedFile):
+            field_file.seek(0)
+        else:
+            field_file.close()
+
+
+def find_original(obj: Model, digest: str) -> Model | None:
+    """Return the first non-duplicate record of ``obj``'s model with the same content hash."""
+    return (
+        type(obj).objects.filter(content_sha256=digest, duplicate_of__isnull=True)
+        .exclude(pk=obj.pk)
+        .order_by("pk")
+        .first()
+    )
@@ -0,0 +1,279 @@
+"""Deterministic OpenAI-compatible chat-completions stand-in.
+
+用於離線壓測與延遲重現：回傳符合評分 rubric 的 JSON，並可設定延遲分佈、
+錯誤 / 429 注入以及速率限制。
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from app.context_budget import count_tokens
+
+RUBRIC_FIELDS = ("accuracy", "relevance", "logic", "conciseness", "language_quality")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behaviour of the fake chat-completions server.
+
+    Attributes:
+    ----------
+    latency : str
+        Latency distribution, one of ``fixed``, ``uniform``, ``normal`` or ``lognormal``.
+    latency_ms : float
+        Fixed latency, or the mean / median of the distribution, in milliseconds.
+    jitter_ms : float
+        Spread of the distribution (half-width for ``uniform``, sigma otherwise).
+    error_rate : float
+        Probability of answering with a 500 server error.
+    rate_limit_error_rate : float
+        Probability of answering with a 429 regardless of the rate limit.
+    invalid_output_rate : float
+        Probability that a successful completion carries truncated (invalid) JSON.
+    requests_per_second : float
+        Token-bucket refill rate; ``0`` disables rate limiting.
+    burst : int
+        Token-bucket capacity.
+    seed : int
+        Seed for the latency / error random sequence.
+    """
+    latency: str = "fixed"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_error_rate: float = 0.0
+    invalid_output_rate: float = 0.0
+    requests_per_second: float = 0.0
+    burst: int = 1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        """Validate the latency distribution name."""
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+
+
+@dataclass
+class FakeLLMStats:
+    """Counters describing what the fake server has answered so far."""
+    requests: int = 0
+    completions: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    invalid_outputs: int = 0
+    models: dict[str, int] = field(default_factory=dict)
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a JSON-serializable dictionary."""
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "completions": self.completions,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "invalid_outputs": self.invalid_outputs,
+            "models": dict(self.models),
+            "latency_p50_ms": _percentile(latencies, 0.50),
+            "latency_p99_ms": _percentile(latencies, 0.99),
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def rubric_scores(prompt: str) -> dict[str, Any]:
+    """Derive deterministic rubric scores (1-5) from the prompt content."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    scores: dict[str, Any] = {name: digest[i] % 5 + 1 for i, name in enumerate(RUBRIC_FIELDS)}
+    scores["total_score"] = sum(scores[name] for name in RUBRIC_FIELDS)
+    scores["overall_comment"] = f"fake-llm 評分 {digest[:4].hex()}"
+    return scores
+
+
+class FakeLLMState:
+    """Thread-safe random sequence, token bucket and stats shared by all handler threads."""
+
+    def __init__(self, config: FakeLLMConfig) -> None:
+        """Initialize the state from ``config``."""
+        self.config = config
+        self.stats = FakeLLMStats()
+        self._random = random.Random(config.seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._tokens = float(config.burst)
+        self._refilled_at = time.monotonic()
+
+    def _sample_latency_ms(self) -> float:
+        cfg = self.config
+        if cfg.latency == "uniform":
+            value = self._random.uniform(cfg.latency_ms - cfg.jitter_ms, cfg.latency_ms + cfg.jitter_ms)
+        elif cfg.latency == "normal":
+            value = self._random.gauss(cfg.latency_ms, cfg.jitter_ms)
+        elif cfg.latency == "lognormal":
+            sigma = cfg.jitter_ms / cfg.latency_ms if cfg.latency_ms else 0.0
+            value = cfg.latency_ms * self._random.lognormvariate(0.0, sigma)
+        else:
+            value = cfg.latency_ms
+        return max(0.0, value)
+
+    def _take_token(self) -> float:
+        """Consume a rate-limit token; return 0 on success or the seconds to wait."""
+        cfg = self.config
+        if cfg.requests_per_second <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(float(cfg.burst), self._tokens + (now - self._refilled_at) * cfg.requests_per_second)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / cfg.requests_per_second
+
+    def decide(self, model: str = "") -> tuple[int, float, float]:
+        """Return ``(status, latency_ms, retry_after_s)`` for the next request, made for ``model``."""
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.models[model] = self.stats.models.get(model, 0) + 1
+            latency_ms = self._sample_latency_ms()
+            roll = self._random.random()
+            # 注入的 429 不消耗令牌，以免壓低真正的請求速率
+            if roll < self.config.rate_limit_error_rate:
+                self.stats.rate_limited += 1
+                return 429, 0.0, 0.05
+            wait = self._take_token()
+            if wait > 0:
+                self.stats.rate_limited += 1
+                return 429, 0.0, wait
+            if roll < self.config.rate_limit_error_rate + self.config.error_rate:
+                self.stats.errors += 1
+                return 500, latency_ms, 0.0
+            self.stats.completions += 1
+            self.stats.latencies_ms.append(latency_ms)
+            return 200, latency_ms, 0.0
+
+    def invalid_output(self) -> bool:
+        """Return True when the next completion should carry invalid JSON."""
+        if self.config.invalid_output_rate <= 0:
+            return False
+        with self._lock:
+            if self._random.random() < self.config.invalid_output_rate:
+                self.stats.invalid_outputs += 1
+                return True
+            return False
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Request handler implementing ``POST /v1/chat/completions`` and ``GET /stats``."""
+
+    server: "FakeLLMServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Silence the default per-request stderr logging."""
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        """Expose the server counters at ``/stats``."""
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.state.stats.as_dict())
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self) -> None:
+        """Answer a chat-completions request with rubric-shaped JSON."""
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": {"message": str(e), "type": "invalid_request_error"}})
+            return
+
+        status, latency_ms, retry_after = self.server.state.decide(body.get("model", ""))
+        if status == 429:  # noqa: PLR2004
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                {"Retry-After": f"{retry_after:.3f}", "retry-after-ms": str(int(retry_after * 1000))},
+            )
+            return
+        time.sleep(latency_ms / 1000)
+        if status != 200:  # noqa: PLR2004
+            self._send_json(status, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        scores = rubric_scores(prompt)
+        # 指定 json_schema (structured outputs) 時只回傳 schema 中的欄位
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            properties = response_format.get("json_schema", {}).get("schema", {}).get("properties", {})
+            scores = {key: value for key, value in scores.items() if key in properties}
+        content = json.dumps(scores, ensure_ascii=False)
+        if self.server.state.invalid_output():
+            content = content[: len(content) // 2]
+        prompt_tokens = count_tokens(prompt)
+        completion_tokens = count_tokens(content)
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{hashlib.sha256(raw).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-llm"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to a :class:`FakeLLMState`."""
+
+    daemon_threads = True
+    request_queue_size = 256  # 預設 backlog 只有 5，大量並行連線時會被丟 SYN 造成秒級長尾
+
+    def __init__(self, address: tuple[str, int], config: FakeLLMConfig | None = None) -> None:
+        """Bind the server to ``address`` with the given behaviour ``config``."""
+        super().__init__(address, FakeLLMHandler)
+        self.state = FakeLLMState(config or FakeLLMConfig())
+
+    @property
+    def base_url(self) -> str:
+        """Return the OpenAI-style base URL (``http://host:port/v1``) of this server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start_in_thread(self) -> threading.Thread:
+        """Serve requests from a daemon thread and return that thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
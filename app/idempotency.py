@@ -0,0 +1,75 @@
+"""Idempotent ``/evaluate`` requests.
+
+每個評分請求以 (exp_id, question_id) 識別；未帶 question_id 時，若有 ``Idempotency-Key`` 標頭，
+question_id 由 key 推得 (同一 key 重試會得到同一題號)，否則隨機產生 (不具冪等性)。
+
+- 已完成：資料庫已有同一 (exp_id, question_id) 的評分時直接回傳，不再評分。
+- 進行中：同一行程內相同 key 的並行請求以 :func:`coalesce` 合併成一次評分，其餘請求等待同一結果。
+  跨行程的並行重試仍可能各自評分，但只有一筆能寫入 (``unique_together``)，其餘改回傳已寫入的結果。
+"""
+
+import hashlib
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from app import metrics
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 保留 SHA-256 的前 16 bytes (32 個 hex 字元，即 Evaluation.question_id 的 max_length)，碰撞機率可忽略
+DERIVED_QUESTION_ID_LENGTH = 32
+
+T = TypeVar("T")
+
+_inflight: dict[Hashable, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def request_key(request: HttpRequest | Any) -> str | None:
+    """Return the ``Idempotency-Key`` header of ``request``, or None when absent or blank."""
+    headers = getattr(request, "headers", None)
+    key = headers.get(IDEMPOTENCY_HEADER, "").strip() if headers is not None else ""
+    return key or None
+
+
+def derive_question_id(key: str) -> str:
+    """Return the question ID used for a request that only carries an idempotency key."""
+    return hashlib.sha256(key.encode()).hexdigest()[:DERIVED_QUESTION_ID_LENGTH]
+
+
+def coalesce(key: Hashable, compute: Callable[[], T]) -> T:
+    """Run ``compute`` once for concurrent callers sharing ``key`` and give them all its result.
+
+    The first caller runs ``compute``; callers arriving while it runs wait (at most
+    ``settings.IDEMPOTENCY_WAIT_SECONDS``) and receive the same result or exception.
+
+    Raises:
+    ------
+    TimeoutError
+        If the running call does not finish in time.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        metrics.incr("idempotent_coalesced")
+        return future.result(timeout=settings.IDEMPOTENCY_WAIT_SECONDS)
+
+    try:
+        result = compute()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
@@ -0,0 +1,113 @@
+"""Streaming, chunked reading of JSON array files (uploaded evaluation batches).
+
+檔案以固定大小的區塊讀入，逐一解析陣列中的元素，每 ``settings.CSV_CHUNK_ROWS`` 個交給處理端；
+記憶體用量只與單一元素與區塊大小有關，與檔案大小無關 (與 :mod:`app.csv_ingest` 相同)。
+"""
+
+import codecs
+import json
+from collections.abc import Iterator
+from typing import IO, Any
+
+from django.conf import settings
+
+JSON_WHITESPACE = " \t\n\r"
+# 陣列元素之後可接的字元
+JSON_DELIMITERS = JSON_WHITESPACE + ",]"
+READ_SIZE = 64 * 1024
+
+
+class _ArrayReader:
+    """Block-by-block reader of one JSON array, used by :func:`iter_json_array`."""
+
+    def __init__(self, file: IO[bytes], read_size: int) -> None:
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        # utf-8-sig：接受帶 BOM 的檔案
+        self.decode = codecs.getincrementaldecoder("utf-8-sig")().decode
+        self.buffer = ""
+        self.eof = False
+
+    def fill(self) -> None:
+        block = self.file.read(self.read_size)
+        self.eof = not block
+        self.buffer += self.decode(block, final=self.eof)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end of the file)."""
+        self.buffer = self.buffer.lstrip(JSON_WHITESPACE)
+        while not self.buffer and not self.eof:
+            self.fill()
+            self.buffer = self.buffer.lstrip(JSON_WHITESPACE)
+        return self.buffer[:1]
+
+    def take(self, expected: str) -> str:
+        """Consume and return the next non-whitespace character, which must be one of ``expected``."""
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"Expected one of {expected!r} in the JSON array, got {char or 'end of file'!r}.")
+        self.buffer = self.buffer[1:]
+        return char
+
+    def item(self) -> Any:
+        """Consume and return the next array item."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # 數字可能被區塊邊界截斷 (如 "6." 之後才讀到 "5")，其後須為分隔字元才算完整
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in JSON_DELIMITERS):
+                    self.buffer = self.buffer[end:]
+                    return value
+            self.fill()
+
+
+def iter_json_array(file: IO[bytes], read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Yield the items of the JSON array in ``file`` one at a time.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        A binary file object holding one JSON array, read sequentially.
+    read_size : int
+        Bytes read per block.
+
+    Yields:
+    ------
+    Any
+        The decoded items, in file order.
+
+    Raises:
+    ------
+    ValueError
+        If the file is not a well-formed JSON array (``json.JSONDecodeError`` for malformed items).
+    """
+    reader = _ArrayReader(file, read_size)
+    reader.take("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.item()
+        if reader.take(",]") == "]":
+            return
+
+
+def iter_json_chunks(file: IO[bytes], chunk_rows: int | None = None) -> Iterator[list[Any]]:
+    """Yield the items of the JSON array in ``file`` in blocks of at most ``chunk_rows``.
+
+    ``chunk_rows`` defaults to ``settings.CSV_CHUNK_ROWS``; see :func:`iter_json_array`.
+    """
+    chunk_rows = chunk_rows or settings.CSV_CHUNK_ROWS
+    chunk: list[Any] = []
+    for value in iter_json_array(file):
+        chunk.append(value)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
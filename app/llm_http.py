@@ -0,0 +1,119 @@
+"""Pooled, keep-alive HTTP client for the scoring calls.
+
+連線池大小、keep-alive、HTTP/2 與各階段 timeout 皆由 settings 設定；
+transport 會回報進行中的請求數 (連線池飽和度) 與 pool timeout 次數。
+"""
+
+import importlib.util
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+import httpx
+from django.conf import settings
+from openai import DefaultHttpxClient
+
+from app import metrics
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """Response stream that reports when its connection is handed back to the pool."""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[], None]) -> None:
+        """Wrap ``stream`` and call ``on_close`` once it is closed."""
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield the wrapped body chunks."""
+        yield from self._stream
+
+    def close(self) -> None:
+        """Close the wrapped stream and report the released connection."""
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTP transport exposing in-flight requests and pool timeouts as metrics."""
+
+    def __init__(self, **kwargs: object) -> None:
+        """Create the transport; ``kwargs`` are passed to :class:`httpx.HTTPTransport`."""
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            in_flight = self._in_flight
+        metrics.REGISTRY.set_gauge("openai_http_in_flight", in_flight)
+        metrics.REGISTRY.max_gauge("openai_http_in_flight_max", in_flight)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send ``request`` while counting it as in flight until its body is closed."""
+        self._track(1)
+        started = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.PoolTimeout:
+            self._track(-1)
+            metrics.incr("openai_http_pool_timeouts")
+            raise
+        except Exception:
+            self._track(-1)
+            raise
+        metrics.REGISTRY.observe("http_ttfb", time.perf_counter() - started)
+        response.stream = _TrackedStream(response.stream, lambda: self._track(-1))
+        return response
+
+
+def http2_enabled() -> bool:
+    """Return True when HTTP/2 is requested and the ``h2`` package is installed."""
+    return settings.OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def attempt_timeout(deadline: float) -> httpx.Timeout:
+    """Return per-phase timeouts for one attempt, capped by the remaining total ``deadline``.
+
+    Parameters
+    ----------
+    deadline : float
+        ``time.monotonic()`` value by which the whole call (all attempts) must finish.
+
+    Returns:
+    -------
+    httpx.Timeout
+        Connect / read / write / pool timeouts, none exceeding the time left.
+    """
+    remaining = max(0.001, deadline - time.monotonic())
+    return httpx.Timeout(
+        connect=min(settings.OPENAI_CONNECT_TIMEOUT, remaining),
+        read=min(settings.OPENAI_READ_TIMEOUT, remaining),
+        write=min(settings.OPENAI_WRITE_TIMEOUT, remaining),
+        pool=min(settings.OPENAI_POOL_TIMEOUT, remaining),
+    )
+
+
+def build_http_client() -> httpx.Client:
+    """Build the pooled HTTP client shared by every scoring thread of the process."""
+    limits = httpx.Limits(
+        max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY,
+    )
+    metrics.REGISTRY.set_gauge("openai_http_pool_size", settings.OPENAI_HTTP_MAX_CONNECTIONS)
+    return DefaultHttpxClient(
+        transport=InstrumentedTransport(limits=limits, http2=http2_enabled()),
+        timeout=httpx.Timeout(
+            connect=settings.OPENAI_CONNECT_TIMEOUT,
+            read=settings.OPENAI_READ_TIMEOUT,
+            write=settings.OPENAI_WRITE_TIMEOUT,
+            pool=settings.OPENAI_POOL_TIMEOUT,
+        ),
+    )
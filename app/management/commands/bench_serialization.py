@@ -0,0 +1,76 @@
+import json
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from ninja.responses import NinjaJSONEncoder
+
+from app.api import EVALUATION_RESPONSE_FIELDS, EvaluationResponse
+from app.bulk import bulk_load
+from app.models import Evaluation
+from app.renderers import FastJSONRenderer, orjson
+
+BENCH_EXP_ID = "__bench_serialization__"
+
+
+def _evaluation(i: int) -> Evaluation:
+    return Evaluation(
+        exp_id=BENCH_EXP_ID,
+        question_id=f"b{i}",
+        test_question=f"第 {i} 題：什麼是人工智慧？",
+        bot_response="人工智慧是模擬人類思考的技術。" * 10,
+        question_source="bench",
+        standard_answer="人工智慧",
+        difficulty=3,
+        accuracy=4, relevance=4, logic=4, conciseness=4, language_quality=4, total_score=20,
+        model="gpt-4.1-nano", prompt_tokens=500, completion_tokens=80, latency_ms=900,
+    )
+
+
+class Command(BaseCommand):
+    """Compare the model + pydantic + json path with the ``.values()`` + renderer path for evaluation lists."""
+
+    help = "Measure serialization throughput of evaluation API responses (rows are inserted and rolled back)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register benchmark options."""
+        parser.add_argument("--rows", type=int, default=100_000, help="Evaluations to serialize.")
+
+    def report(self, name: str, rows: int, timings: dict[str, float]) -> None:
+        """Print the per-stage and total timings of one path."""
+        total = sum(timings.values())
+        stages = " ".join(f"{stage}={seconds:.3f}s" for stage, seconds in timings.items())
+        self.stdout.write(f"{name:<10} {stages} total={total:.3f}s throughput={rows / total:.0f} rows/s")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Insert the rows, time both paths, check they agree and roll back."""
+        rows = options["rows"]
+        with transaction.atomic():
+            bulk_load(Evaluation, (_evaluation(i) for i in range(rows)))
+            queryset = Evaluation.objects.filter(exp_id=BENCH_EXP_ID)
+
+            timings: dict[str, float] = {}
+            started = time.perf_counter()
+            evaluations = list(queryset)
+            timings["fetch"] = time.perf_counter() - started
+            started = time.perf_counter()
+            data = [EvaluationResponse(**evaluation.__dict__).model_dump() for evaluation in evaluations]
+            timings["validate"] = time.perf_counter() - started
+            started = time.perf_counter()
+            baseline = json.dumps(data, cls=NinjaJSONEncoder)
+            timings["render"] = time.perf_counter() - started
+            self.report("baseline", rows, timings)
+
+            timings = {}
+            started = time.perf_counter()
+            data = list(queryset.values(*EVALUATION_RESPONSE_FIELDS))
+            timings["fetch"] = time.perf_counter() - started
+            started = time.perf_counter()
+            fast = FastJSONRenderer().render(None, data, response_status=200)
+            timings["render"] = time.perf_counter() - started
+            self.report("orjson" if orjson else "json", rows, timings)
+
+            if json.loads(baseline) != json.loads(fast):
+                self.stderr.write("Outputs differ!")
+            transaction.set_rollback(True)
@@ -0,0 +1,103 @@
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from app.db import apply_pragmas
+
+SCHEMA = """
+CREATE TABLE evaluation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    exp_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    bot_response TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    UNIQUE (exp_id, question_id)
+)
+"""
+
+
+def _writer(path: str, writer: int, rows: int, profile: dict[str, Any], results: multiprocessing.Queue) -> None:
+    """Insert ``rows`` evaluations one transaction at a time, like the per-item ingest path."""
+    conn = sqlite3.connect(path, timeout=profile["timeout"], isolation_level=None)
+    apply_pragmas(conn, profile["pragmas"])
+    begin = f"BEGIN {profile['transaction_mode']}"
+    written = locked = 0
+    started = time.perf_counter()
+    for i in range(rows):
+        try:
+            conn.execute(begin)
+            # 與 admin 相同：先讀 (檢查重複) 再寫
+            conn.execute("SELECT COUNT(*) FROM evaluation WHERE exp_id = ?", (f"w{writer}",)).fetchone()
+            conn.execute(
+                "INSERT INTO evaluation (exp_id, question_id, bot_response, total_score) VALUES (?, ?, ?, ?)",
+                (f"w{writer}", f"q{i}", "回答" * 200, 15),
+            )
+            conn.execute("COMMIT")
+            written += 1
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            locked += 1
+    results.put((written, locked, time.perf_counter() - started))
+    conn.close()
+
+
+class Command(BaseCommand):
+    """Benchmark concurrent SQLite writers with and without the configured connection profile."""
+
+    help = "Measure concurrent-writer throughput and lock errors for the default vs the configured SQLite profile."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register benchmark options."""
+        parser.add_argument("--writers", type=int, default=8, help="Number of writer processes.")
+        parser.add_argument("--rows", type=int, default=200, help="Rows inserted by each writer.")
+
+    def run_profile(self, name: str, profile: dict[str, Any], writers: int, rows: int) -> None:
+        """Run all writers against a fresh database file and print the results."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "bench.sqlite3")
+            with sqlite3.connect(path) as conn:
+                conn.execute(SCHEMA)
+
+            results: multiprocessing.Queue = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(target=_writer, args=(path, writer, rows, profile, results))
+                for writer in range(writers)
+            ]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+
+        written = sum(outcome[0] for outcome in outcomes)
+        locked = sum(outcome[1] for outcome in outcomes)
+        self.stdout.write(
+            f"{name:<10} writers={writers} rows={written}/{writers * rows} "
+            f"lock_errors={locked} elapsed={elapsed:.2f}s throughput={written / elapsed:.0f} rows/s"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the default and the configured profile back to back."""
+        options_ = settings.DATABASES["default"].get("OPTIONS", {})
+        profiles = {
+            # Django 預設：rollback journal、synchronous=FULL、5 秒 timeout、DEFERRED 交易
+            "default": {"pragmas": {}, "timeout": 5.0, "transaction_mode": "DEFERRED"},
+            "configured": {
+                "pragmas": settings.SQLITE_PRAGMAS,
+                "timeout": options_.get("timeout", 5.0),
+                "transaction_mode": options_.get("transaction_mode", "DEFERRED"),
+            },
+        }
+        for name, profile in profiles.items():
+            self.run_profile(name, profile, options["writers"], options["rows"])
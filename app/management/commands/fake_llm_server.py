@@ -0,0 +1,53 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from app.fake_llm import LATENCY_DISTRIBUTIONS, FakeLLMConfig, FakeLLMServer
+
+
+class Command(BaseCommand):
+    """Run the deterministic fake OpenAI chat-completions server.
+
+    Point the scoring client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8010/v1``.
+    """
+
+    help = "Run a fake OpenAI-compatible chat-completions server for load and latency testing."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register the server and behaviour options."""
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8010)
+        parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed / mean latency in ms.")
+        parser.add_argument("--jitter-ms", type=float, default=0.0, help="Latency spread in ms.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+        parser.add_argument(
+            "--invalid-output-rate", type=float, default=0.0, help="Fraction of completions with truncated JSON."
+        )
+        parser.add_argument("--rps", type=float, default=0.0, help="Requests per second allowed (0 = unlimited).")
+        parser.add_argument("--burst", type=int, default=1, help="Token-bucket capacity for --rps.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Start serving until interrupted."""
+        config = FakeLLMConfig(
+            latency=options["latency"],
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            rate_limit_error_rate=options["rate_limit_rate"],
+            invalid_output_rate=options["invalid_output_rate"],
+            requests_per_second=options["rps"],
+            burst=options["burst"],
+            seed=options["seed"],
+        )
+        server = FakeLLMServer((options["host"], options["port"]), config)
+        self.stdout.write(f"Fake LLM server listening on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stats: {server.state.stats.as_dict()}")
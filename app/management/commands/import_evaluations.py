@@ -0,0 +1,77 @@
+import csv
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from app.bulk import bulk_load, bulk_upsert, copy_supported
+from app.cache import invalidate
+from app.models import Evaluation
+
+INT_COLUMNS = ("difficulty", "accuracy", "relevance", "logic", "conciseness", "language_quality", "total_score")
+TEXT_COLUMNS = ("test_paper_id", "test_question", "bot_response", "question_source", "standard_answer")
+
+
+def read_evaluations(path: Path) -> Iterator[Evaluation]:
+    """Yield unsaved Evaluations from a CSV in the ``export_csv`` layout, one row at a time."""
+    with path.open(encoding="utf-8", newline="") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                yield Evaluation(
+                    exp_id=row["exp_id"],
+                    question_id=row["question_id"],
+                    **{column: row.get(column) or "" for column in TEXT_COLUMNS},
+                    **{column: int(row[column]) for column in INT_COLUMNS},
+                )
+            except (KeyError, ValueError) as e:
+                raise CommandError(f"{path}:{line}: invalid row ({e})") from e
+
+
+class Command(BaseCommand):
+    """Bulk-import evaluations exported by ``/project/{project_id}/export_csv``."""
+
+    help = "Import evaluations from a CSV file (COPY on PostgreSQL, batched inserts elsewhere)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register command options."""
+        parser.add_argument("csv_file", type=Path, help="CSV file in the export_csv layout.")
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Overwrite evaluations that already exist for the same (exp_id, question_id).",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per INSERT statement.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Stream the CSV into the database and report the throughput."""
+        path = options["csv_file"]
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        exp_ids: set[str] = set()
+
+        def evaluations() -> Iterator[Evaluation]:
+            for evaluation in read_evaluations(path):
+                exp_ids.add(evaluation.exp_id)
+                yield evaluation
+
+        started = time.perf_counter()
+        if options["upsert"]:
+            count = bulk_upsert(
+                Evaluation,
+                evaluations(),
+                unique_fields=["exp_id", "question_id"],
+                update_fields=[*TEXT_COLUMNS, *INT_COLUMNS],
+                batch_size=options["batch_size"],
+            )
+            method = "upsert"
+        else:
+            count = bulk_load(Evaluation, evaluations(), batch_size=options["batch_size"])
+            method = "copy" if copy_supported() else "insert"
+        elapsed = time.perf_counter() - started
+        invalidate(*exp_ids)
+        self.stdout.write(
+            f"Imported {count} evaluations via {method} in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)"
+        )
@@ -0,0 +1,145 @@
+import glob
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from app.admin import write_question_chunk
+from app.cache import invalidate
+from app.csv_ingest import CSVFormatError, RowError, iter_question_chunks
+from app.db_routers import mark_written
+from app.dedup import dedup_mode, find_original, sha256_stream
+from app.models import UploadedTestPaper
+
+
+def parse_paper(path: Path, chunk_rows: int) -> dict[str, Any]:
+    """Parse and validate one test-paper CSV (runs in a worker process)."""
+    started = time.perf_counter()
+    errors: list[RowError] = []
+    try:
+        with path.open("rb") as file:
+            digest = sha256_stream(file)
+            file.seek(0)
+            chunks = list(iter_question_chunks(file, errors, chunk_rows))
+    except (CSVFormatError, UnicodeDecodeError) as e:
+        return {"path": path, "error": str(e), "parse_s": time.perf_counter() - started}
+    return {
+        "path": path,
+        "sha256": digest,
+        "chunks": chunks,
+        "errors": errors,
+        "parse_s": time.perf_counter() - started,
+    }
+
+
+def expand_paths(patterns: list[str]) -> list[Path]:
+    """Expand directories (their ``*.csv`` files), globs and plain paths into a sorted, de-duplicated list."""
+    paths: set[Path] = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.update(path.glob("*.csv"))
+        elif path.is_file():
+            paths.add(path)
+        else:
+            paths.update(Path(match) for match in glob.glob(pattern, recursive=True))  # noqa: PTH207
+    return sorted(path.resolve() for path in paths)
+
+
+class Command(BaseCommand):
+    """Import many test-paper CSVs: parallel parse / validate, one serialized bulk writer."""
+
+    help = "Import test-paper CSVs from directories or globs, parsing in a process pool and writing serially."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register command options."""
+        parser.add_argument("paths", nargs="+", help="CSV files, directories or glob patterns.")
+        parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count).")
+        parser.add_argument("--chunk-rows", type=int, default=None, help="Rows per parsed block / bulk write.")
+
+    def parsed(self, paths: list[Path], workers: int | None, chunk_rows: int) -> Iterator[dict[str, Any]]:
+        """Yield parse results as workers finish, keeping at most ``2 * workers`` files in flight."""
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            limit = 2 * workers
+            pending: set[Future] = set()
+            for path in paths:
+                pending.add(executor.submit(parse_paper, path, chunk_rows))
+                if len(pending) >= limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (future.result() for future in done)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+
+    def write(self, result: dict[str, Any]) -> tuple[int, UploadedTestPaper | None]:
+        """Create the test paper of one parsed file and bulk-write its questions in one transaction.
+
+        Returns the number of questions written and, for a duplicate upload, the original paper.
+        """
+        path = result["path"]
+        media_root = Path(settings.MEDIA_ROOT or ".").resolve()
+        paper = UploadedTestPaper(name=path.stem, content_sha256=result["sha256"])
+        original = None if dedup_mode() == "off" else find_original(paper, paper.content_sha256)
+        if original:
+            if dedup_mode() == "link":
+                paper.duplicate_of = original
+                paper.csv_file = original.csv_file.name
+                paper.save()
+            return 0, original
+
+        with transaction.atomic():
+            if path.is_relative_to(media_root):
+                paper.csv_file.name = str(path.relative_to(media_root))  # 已在 uploads/ 中，不重複複製
+            else:
+                with path.open("rb") as f:
+                    paper.csv_file.save(path.name, File(f), save=False)
+            paper.save()
+            count = sum(write_question_chunk(paper, rows) for rows in result["chunks"])
+        mark_written(paper.name)
+        invalidate(paper.name)
+        return count, None
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Parse the files in parallel and write them one at a time as they become ready."""
+        paths = expand_paths(options["paths"])
+        if not paths:
+            raise CommandError("No CSV files matched.")
+        chunk_rows = options["chunk_rows"] or settings.CSV_CHUNK_ROWS
+
+        started = time.perf_counter()
+        papers = rows = failed = duplicates = 0
+        for result in self.parsed(paths, options["workers"], chunk_rows):
+            name = result["path"].name
+            if "error" in result:
+                failed += 1
+                self.stderr.write(f"{name}: skipped ({result['error']})")
+                continue
+            write_started = time.perf_counter()
+            count, original = self.write(result)
+            if original:
+                duplicates += 1
+                action = "linked to" if dedup_mode() == "link" else "rejected, identical to"
+                self.stdout.write(f"{name}: duplicate, {action} '{original.name}'")
+                continue
+            papers += 1
+            rows += count
+            self.stdout.write(
+                f"{name}: rows={count} skipped={len(result['errors'])} "
+                f"parse={result['parse_s']:.3f}s write={time.perf_counter() - write_started:.3f}s"
+            )
+            for error in result["errors"]:
+                self.stderr.write(f"{name}:{error.line}: {error.message}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Imported {papers} papers ({rows} questions, {duplicates} duplicates, {failed} files failed) in {elapsed:.2f}s "
+            f"({rows / max(elapsed, 1e-9):.0f} rows/s)"
+        )
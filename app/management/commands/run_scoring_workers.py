@@ -0,0 +1,175 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+
+from app import metrics
+from app.admin import build_evaluation
+from app.cache import invalidate
+from app.db_routers import mark_written
+from app.models import ScoringJob
+from app.openai_eval import score_many
+from app.routing import routing_for
+from app.scoring_queue import abandon, claim, complete, heartbeat, reap_stale, release, require_shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+def score_claim(worker_id: str, claim_size: int) -> int:
+    """Claim one chunk of jobs, score it and write the results; return the number of jobs claimed.
+
+    An item whose scoring raises is released on its own (see :func:`~app.scoring_queue.release`);
+    any other error gives back the whole claim instead of stopping the worker.
+    """
+    token, jobs = claim(worker_id, claim_size)
+    if not jobs:
+        return 0
+    try:
+        write_claim(token, jobs)
+    except Exception as e:  # 資料庫錯誤等：整批退回 (計入嘗試次數)，worker 繼續執行
+        logger.exception("Scoring claim %s of %s failed", token, worker_id)
+        abandon(token, str(e))
+    return len(jobs)
+
+
+def write_claim(token: str, jobs: list[ScoringJob]) -> None:
+    """Score the jobs of claim ``token`` and write the evaluations of those that succeeded."""
+    by_id = {job.id: job for job in jobs}
+    routings = {exp_id: routing_for(exp_id) for exp_id in {job.exp_id for job in jobs}}
+    evaluations = {}
+    last_beat = time.monotonic()
+    scoring = (
+        (job.id, {
+            "question": job.payload["question"],
+            "response": job.payload["response"],
+            "standard_answer": job.payload["standard_answer"],
+            "source": job.payload["question_source"],
+            "difficulty": job.payload.get("difficulty", 3),
+            "routing": routings[job.exp_id],
+        })
+        for job in jobs
+    )
+    for job_id, scores in score_many(scoring, return_exceptions=True):
+        if isinstance(scores, Exception):
+            # 只退回失敗的這一題 (如重試後仍逾時)，其餘照常評分
+            release(token, job_id, str(scores))
+            metrics.incr("score_errors")
+            continue
+        job = by_id[job_id]
+        evaluations[job_id] = build_evaluation({
+            "exp_id": job.exp_id,
+            "test_paper_id": job.batch_id,
+            **job.payload,
+            "scores": scores,
+        })
+        if time.monotonic() - last_beat >= settings.SCORING_HEARTBEAT_SECONDS:
+            heartbeat(token)
+            last_beat = time.monotonic()
+
+    with metrics.span("persist"):
+        written = complete(token, evaluations)
+    metrics.incr("jobs_done", written)
+    exp_ids = {by_id[job_id].exp_id for job_id in evaluations}
+    for exp_id in exp_ids:
+        mark_written(exp_id)
+    if exp_ids:
+        invalidate(*exp_ids)
+
+
+def run_worker(worker_id: str, claim_size: int, poll_seconds: float, drain: bool, stop: Any) -> int:
+    """Claim and score jobs until ``stop`` is set (or, with ``drain``, until the queue is empty).
+
+    Returns the number of jobs processed.
+    """
+    processed = 0
+    while not stop.is_set():
+        reap_stale()
+        claimed = score_claim(worker_id, claim_size)
+        processed += claimed
+        if claimed:
+            continue
+        if drain and not ScoringJob.objects.filter(status__in=[ScoringJob.PENDING, ScoringJob.CLAIMED]).exists():
+            break
+        stop.wait(poll_seconds)
+    return processed
+
+
+def _worker_process(index: int, claim_size: int, poll_seconds: float, drain: bool, stop: Any) -> None:
+    """Entry point of a forked worker process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # 由主行程統一處理 Ctrl+C
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    try:
+        run_worker(worker_id, claim_size, poll_seconds, drain, stop)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """Run N scoring worker processes that claim queued ScoringJobs."""
+
+    help = "Score queued evaluation items (SCORING_MODE=queue) with one or more worker processes."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Register command options."""
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes (1 runs in this process).")
+        parser.add_argument("--claim-size", type=int, default=None, help="Jobs claimed at a time per worker.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--drain", action="store_true", help="Exit once no pending or claimed jobs remain.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Start the workers and wait for them; SIGINT / SIGTERM finish the current chunk and stop."""
+        try:
+            require_shared_cache()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e)) from e
+        claim_size = options["claim_size"] or settings.SCORING_CLAIM_SIZE
+        workers = max(1, options["workers"])
+        started = time.perf_counter()
+
+        if workers == 1:
+            stop = threading.Event()
+            previous = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            try:
+                worker_id = f"{socket.gethostname()}:{os.getpid()}:0"
+                processed = run_worker(worker_id, claim_size, options["poll"], options["drain"], stop)
+            except KeyboardInterrupt:
+                processed = 0
+            finally:
+                signal.signal(signal.SIGTERM, previous)
+            self.stdout.write(f"Scored {processed} jobs in {time.perf_counter() - started:.2f}s")
+            return
+
+        # fork 前關閉資料庫連線，避免子行程共用父行程的連線
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        processes = [
+            context.Process(
+                target=_worker_process,
+                args=(index, claim_size, options["poll"], options["drain"], stop),
+                name=f"scoring-worker-{index}",
+            )
+            for index in range(workers)
+        ]
+        previous = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in processes:
+                process.join()
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        self.stdout.write(f"{workers} workers stopped after {time.perf_counter() - started:.2f}s")
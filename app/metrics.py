@@ -0,0 +1,162 @@
+"""Per-stage timing spans and counters for the evaluation pipeline.
+
+每個 span / counter 同時記錄到：
+- 目前的 :class:`BatchMetrics` (以 :func:`collect` 綁定，儲存在批次紀錄上)
+- 全域的 :data:`REGISTRY` (以 Prometheus 文字格式輸出)
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+
+class BatchMetrics:
+    """Thread-safe aggregation of stage timings and counters.
+
+    Attributes:
+    ----------
+    stages : dict[str, dict[str, float]]
+        ``count`` / ``total_s`` / ``max_s`` per stage name.
+    counters : dict[str, float]
+        Monotonic counters such as ``tokens_in`` or ``retries``.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty metrics set."""
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record one ``stage`` duration of ``seconds``."""
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            entry["count"] += 1
+            entry["total_s"] += seconds
+            entry["max_s"] = max(entry["max_s"], seconds)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increase counter ``name`` by ``value``."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary (durations in milliseconds)."""
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "count": int(entry["count"]),
+                        "total_ms": round(entry["total_s"] * 1000, 3),
+                        "avg_ms": round(entry["total_s"] * 1000 / entry["count"], 3),
+                        "max_ms": round(entry["max_s"] * 1000, 3),
+                    }
+                    for stage, entry in self.stages.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+
+class MetricsRegistry(BatchMetrics):
+    """Process-wide metrics rendered in the Prometheus text exposition format.
+
+    Besides stages and counters the registry holds gauges, e.g. the number of
+    scoring requests currently in flight on the shared HTTP pool.
+    """
+
+    prefix = "benchmark"
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        super().__init__()
+        self.gauges: dict[str, float] = {}
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set gauge ``name`` to ``value``."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def max_gauge(self, name: str, value: float) -> None:
+        """Raise gauge ``name`` to ``value`` if it is higher (a high-water mark)."""
+        with self._lock:
+            self.gauges[name] = max(self.gauges.get(name, value), value)
+
+    def render_prometheus(self) -> str:
+        """Render all stages, counters and gauges as Prometheus text (version 0.0.4)."""
+        with self._lock:
+            stages = {stage: dict(entry) for stage, entry in self.stages.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        lines = [
+            f"# HELP {self.prefix}_stage_seconds Time spent per evaluation pipeline stage.",
+            f"# TYPE {self.prefix}_stage_seconds summary",
+        ]
+        for stage, entry in sorted(stages.items()):
+            lines.append(f'{self.prefix}_stage_seconds_count{{stage="{stage}"}} {int(entry["count"])}')
+            lines.append(f'{self.prefix}_stage_seconds_sum{{stage="{stage}"}} {entry["total_s"]:.6f}')
+        lines.extend([
+            f"# HELP {self.prefix}_stage_seconds_max Slowest observation per pipeline stage.",
+            f"# TYPE {self.prefix}_stage_seconds_max gauge",
+        ])
+        lines.extend(
+            f'{self.prefix}_stage_seconds_max{{stage="{stage}"}} {entry["max_s"]:.6f}'
+            for stage, entry in sorted(stages.items())
+        )
+        for name, value in sorted(counters.items()):
+            lines.extend([
+                f"# TYPE {self.prefix}_{name}_total counter",
+                f"{self.prefix}_{name}_total {value:g}",
+            ])
+        for name, value in sorted(gauges.items()):
+            lines.extend([
+                f"# TYPE {self.prefix}_{name} gauge",
+                f"{self.prefix}_{name} {value:g}",
+            ])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+_current: ContextVar[BatchMetrics | None] = ContextVar("batch_metrics", default=None)
+
+
+def current() -> BatchMetrics | None:
+    """Return the batch metrics bound by the innermost :func:`collect`, if any."""
+    return _current.get()
+
+
+@contextmanager
+def collect(metrics: BatchMetrics | None = None) -> Iterator[BatchMetrics]:
+    """Bind ``metrics`` (or a new :class:`BatchMetrics`) as the current batch collector."""
+    metrics = metrics or BatchMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe(stage, elapsed)
+        batch = _current.get()
+        if batch is not None:
+            batch.observe(stage, elapsed)
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Increase counter ``name`` on the registry and the current batch."""
+    REGISTRY.incr(name, value)
+    batch = _current.get()
+    if batch is not None:
+        batch.incr(name, value)
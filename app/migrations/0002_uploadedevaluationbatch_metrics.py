@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadedevaluationbatch",
+            name="metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="evaluation",
+            name="question_source",
+            field=models.TextField(),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0002_uploadedevaluationbatch_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="completion_tokens",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="evaluation",
+            name="cost_usd",
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="evaluation",
+            name="latency_ms",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="evaluation",
+            name="model",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name="evaluation",
+            name="prompt_tokens",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0003_evaluation_usage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="exampaperquestion",
+            name="question_id",
+            field=models.CharField(blank=True, db_index=True, max_length=10),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0004_exampaperquestion_question_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadedevaluationbatch",
+            name="content_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="uploadedevaluationbatch",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="app.uploadedevaluationbatch",
+            ),
+        ),
+        migrations.AddField(
+            model_name="uploadedtestpaper",
+            name="content_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="uploadedtestpaper",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="app.uploadedtestpaper",
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2 on 2026-10-19 08:04
+
+import hashlib
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 既有評分皆以 rubric 版本 "1" 產生
+RUBRIC_VERSION = "1"
+
+
+def normalize(text):
+    # app.reuse.normalize 於此遷移當時的版本 (凍結，不隨程式碼變動)
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def response_fingerprint(question_id, bot_response, standard_answer):
+    # app.reuse.response_fingerprint 於此遷移當時的版本 (凍結，不隨程式碼變動)
+    parts = (RUBRIC_VERSION, normalize(question_id), normalize(bot_response), normalize(standard_answer))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Evaluation = apps.get_model("app", "Evaluation")
+    batch = []
+    for evaluation in Evaluation.objects.only("id", "question_id", "bot_response", "standard_answer").iterator():
+        evaluation.response_fingerprint = response_fingerprint(
+            evaluation.question_id, evaluation.bot_response, evaluation.standard_answer
+        )
+        batch.append(evaluation)
+        if len(batch) >= 1000:
+            Evaluation.objects.bulk_update(batch, ["response_fingerprint"])
+            batch = []
+    Evaluation.objects.bulk_update(batch, ["response_fingerprint"])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0005_upload_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="response_fingerprint",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="evaluation",
+            name="reused_from",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reuses",
+                to="app.evaluation",
+            ),
+        ),
+        migrations.AddField(
+            model_name="uploadedevaluationbatch",
+            name="reuse_results",
+            field=models.BooleanField(
+                default=False,
+                help_text="Copy the scores of identical earlier answers instead of re-scoring them.",
+            ),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# 以下 SQL 為 app.search 於此遷移當時的版本 (凍結，不隨程式碼變動)；
+# search_terms() 由每個 SQLite 連線建立時註冊 (見 app/db.py)。trigger 呼叫此 Python 函式，
+# 因此 Django 以外的工具 (sqlite3 shell、dbshell 等) 寫入 app_evaluation 會失敗 (no such function)。
+# PostgreSQL 的 trigram 索引由 0013 改建在 icontains 實際使用的 UPPER() 運算式上。
+FTS_TABLE = "app_evaluation_fts"
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(test_question, bot_response, tokenize='unicode61')"
+)
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON app_evaluation BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+        VALUES (new.id, search_terms(new.test_question), search_terms(new.bot_response));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF test_question, bot_response ON app_evaluation
+    BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+        VALUES (new.id, search_terms(new.test_question), search_terms(new.bot_response));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON app_evaluation BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+REBUILD_FTS = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+    SELECT id, search_terms(test_question), search_terms(bot_response) FROM app_evaluation
+    """,
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_question_trgm ON app_evaluation USING gin (test_question gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_response_trgm ON app_evaluation USING gin (bot_response gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS app_evaluation_question_trgm",
+    "DROP INDEX IF EXISTS app_evaluation_response_trgm",
+]
+
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        _ = apps
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0006_evaluation_reuse"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": [CREATE_FTS_TABLE, *FTS_TRIGGERS, *REBUILD_FTS], "postgresql": POSTGRES_FORWARD}),
+            run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
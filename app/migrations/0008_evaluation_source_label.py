@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 08:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0007_evaluation_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="source_label",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=django.db.models.functions.text.Left("question_source", 64),
+                output_field=models.CharField(max_length=64),
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-19 08:30
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0009_scoringjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExperimentPolicy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("exp_id", models.CharField(max_length=100, unique=True)),
+                ("priority", models.IntegerField(default=0)),
+                (
+                    "weight",
+                    models.PositiveIntegerField(
+                        default=1,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "max_concurrency",
+                    models.PositiveIntegerField(default=0, help_text="0 = unlimited"),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Experiment policies",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="scoringjob",
+            index=models.Index(
+                fields=["status", "exp_id", "id"], name="scoringjob_status_exp_id"
+            ),
+        ),
+    ]
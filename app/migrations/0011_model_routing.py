@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 08:35
+
+import app.routing
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0010_experimentpolicy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="routing_reason",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="experimentpolicy",
+            name="routing",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text='Model routing override, e.g. {"rules": [{"min_difficulty": 4, "model": "gpt-4.1-mini"}]}.',
+                validators=[app.routing.validate_routing],
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0011_model_routing"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="evaluation",
+            name="question_id",
+            field=models.CharField(max_length=32),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# icontains 在 PostgreSQL 編譯為 UPPER(col::text) LIKE UPPER(%s)，索引須建在相同的運算式上才會被使用
+POSTGRES_FORWARD = [
+    "DROP INDEX IF EXISTS app_evaluation_question_trgm",
+    "DROP INDEX IF EXISTS app_evaluation_response_trgm",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_question_upper_trgm "
+    "ON app_evaluation USING gin ((UPPER(test_question::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_response_upper_trgm "
+    "ON app_evaluation USING gin ((UPPER(bot_response::text)) gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS app_evaluation_question_upper_trgm",
+    "DROP INDEX IF EXISTS app_evaluation_response_upper_trgm",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_question_trgm ON app_evaluation USING gin (test_question gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS app_evaluation_response_trgm ON app_evaluation USING gin (bot_response gin_trgm_ops)",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        _ = apps
+        if schema_editor.connection.vendor == "postgresql":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0012_evaluation_question_id_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(POSTGRES_FORWARD), run(POSTGRES_BACKWARD)),
+    ]
@@ -1,4 +1,11 @@
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Left
+
+from app.routing import REASON_LENGTH, validate_routing
+
+# Evaluation.source_label 的長度 (question_source 的前綴)
+SOURCE_LABEL_LENGTH = 64
 
 
 class StandardAnswer(models.Model):
@@ -60,10 +67,18 @@ class UploadedTestPaper(models.Model):
         The timestamp when the test paper was uploaded.
     csv_file : File
         The CSV file associated with the test paper.
+    content_sha256 : str
+        SHA-256 of the uploaded file, used to detect duplicate uploads.
+    duplicate_of : ForeignKey
+        The earlier paper with identical content, when this upload was linked to it instead of re-imported.
     """
     name = models.CharField(max_length=100)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     csv_file = models.FileField(upload_to="uploads/")
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
 
     def __str__(self) -> str:
         """Return the name of the test paper."""
@@ -87,6 +102,9 @@ class Evaluation(models.Model):
         The response generated by the bot.
     question_source : str
         The source of the question.
+    source_label : str
+        The first 64 characters of ``question_source``, computed by the database; indexed
+        so the admin can filter on it instead of the full source text.
     standard_answer : str
         The standard answer for the question.
     difficulty : int
@@ -105,15 +123,38 @@ class Evaluation(models.Model):
         The total score of the bot's response.
     overall_comment : str
         The overall comment for the evaluation.
+    model : str
+        The LLM used to score the response (blank for non-LLM scoring).
+    routing_reason : str
+        Why ``model`` was chosen by the routing policy (see :mod:`app.routing`).
+    prompt_tokens : int
+        Prompt tokens consumed by the scoring call.
+    completion_tokens : int
+        Completion tokens consumed by the scoring call.
+    latency_ms : int
+        Wall-clock latency of the scoring call, including retries.
+    cost_usd : Decimal
+        Estimated cost of the scoring call at the configured model pricing.
+    response_fingerprint : str
+        Hash of the normalized question ID, response, standard answer and rubric version.
+    reused_from : ForeignKey
+        The evaluation whose scores were copied instead of calling the LLM, if any.
     created_at : datetime
         The timestamp when the evaluation was created.
     """
     exp_id = models.CharField(max_length=50)
     test_paper_id = models.CharField(max_length=50, blank=True)
-    question_id = models.CharField(max_length=10)
+    # 可容納由 Idempotency-Key 推得的 32 字元題號 (見 app/idempotency.py)
+    question_id = models.CharField(max_length=32)
     test_question = models.TextField()
     bot_response = models.TextField()
     question_source = models.TextField()
+    source_label = models.GeneratedField(
+        expression=Left("question_source", SOURCE_LABEL_LENGTH),
+        output_field=models.CharField(max_length=SOURCE_LABEL_LENGTH),
+        db_persist=True,
+        db_index=True,
+    )
     standard_answer = models.TextField()
     difficulty = models.IntegerField()
     accuracy = models.IntegerField()
@@ -123,6 +164,16 @@ class Evaluation(models.Model):
     language_quality = models.IntegerField()
     total_score = models.IntegerField()
     overall_comment = models.TextField(blank=True)
+    model = models.CharField(max_length=50, blank=True)
+    routing_reason = models.CharField(max_length=REASON_LENGTH, blank=True)
+    prompt_tokens = models.IntegerField(default=0)
+    completion_tokens = models.IntegerField(default=0)
+    latency_ms = models.IntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=12, decimal_places=6, default=0)
+    response_fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
+    reused_from = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="reuses"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -146,10 +197,26 @@ class UploadedEvaluationBatch(models.Model):
         The JSON file containing evaluation data.
     uploaded_at : datetime
         The timestamp when the evaluation batch was uploaded.
+    metrics : dict
+        Per-stage timings and counters collected while processing the batch.
+    content_sha256 : str
+        SHA-256 of the uploaded file, used to detect duplicate uploads.
+    duplicate_of : ForeignKey
+        The earlier batch with identical content whose evaluations were copied instead of re-scored.
+    reuse_results : bool
+        Copy the scores of identical earlier answers instead of re-scoring them.
     """
     name = models.CharField(max_length=100)
     json_file = models.FileField(upload_to="uploads/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    metrics = models.JSONField(default=dict, blank=True)
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
+    reuse_results = models.BooleanField(
+        default=False, help_text="Copy the scores of identical earlier answers instead of re-scoring them."
+    )
 
     def __str__(self) -> str:
         """Return a formatted string with the name and upload date."""
@@ -157,6 +224,104 @@ class UploadedEvaluationBatch(models.Model):
         return f"{self.name} ({uploaded_at_str})"
 
 
+class ScoringJob(models.Model):
+    """An item of an evaluation batch queued for scoring by ``run_scoring_workers``.
+
+    Attributes:
+    ----------
+    batch : ForeignKey
+        The uploaded batch the item belongs to.
+    exp_id : str
+        The experiment ID (the batch name).
+    payload : dict
+        The evaluation fields of the item (question_id, question, response, standard_answer,
+        question_source).
+    status : str
+        ``pending``, ``claimed``, ``done`` or ``failed``.
+    claim_token : str
+        Random token of the claim currently holding the job.
+    claimed_by : str
+        Worker that holds (or last held) the job.
+    claimed_at : datetime
+        When the job was claimed.
+    heartbeat_at : datetime
+        Last heartbeat of the claiming worker; stale claims are returned to the queue.
+    attempts : int
+        Number of times the job has been claimed.
+    error : str
+        Last scoring error, if any.
+    created_at : datetime
+        When the job was queued.
+    finished_at : datetime
+        When the job was done or failed.
+    """
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = ((PENDING, "Pending"), (CLAIMED, "Claimed"), (DONE, "Done"), (FAILED, "Failed"))
+
+    batch = models.ForeignKey(UploadedEvaluationBatch, on_delete=models.CASCADE, related_name="scoring_jobs")
+    exp_id = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    claim_token = models.CharField(max_length=32, blank=True, db_index=True)
+    claimed_by = models.CharField(max_length=100, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=["status", "id"], name="scoringjob_status_id"),
+            models.Index(fields=["status", "exp_id", "id"], name="scoringjob_status_exp_id"),
+        )
+
+    def __str__(self) -> str:
+        """Return the experiment, question ID and status."""
+        return f"{self.exp_id} - {self.payload.get('question_id')} ({self.status})"
+
+
+class ExperimentPolicy(models.Model):
+    """Scheduling policy of an experiment's queued scoring jobs.
+
+    Experiments without a policy use priority 0, weight 1 and no concurrency cap.
+
+    Attributes:
+    ----------
+    exp_id : str
+        The experiment ID the policy applies to.
+    priority : int
+        Experiments with pending jobs at a higher priority are always dispatched first.
+    weight : int
+        Share of the workers an experiment receives relative to others of the same priority.
+    max_concurrency : int
+        Maximum number of the experiment's jobs claimed at once (0 = unlimited).
+    routing : dict
+        Overrides of ``settings.SCORING_ROUTING`` for the experiment (see :mod:`app.routing`).
+    """
+    exp_id = models.CharField(max_length=100, unique=True)
+    priority = models.IntegerField(default=0)
+    weight = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    max_concurrency = models.PositiveIntegerField(default=0, help_text="0 = unlimited")
+    routing = models.JSONField(
+        default=dict,
+        blank=True,
+        validators=[validate_routing],
+        help_text='Model routing override, e.g. {"rules": [{"min_difficulty": 4, "model": "gpt-4.1-mini"}]}.',
+    )
+
+    class Meta:
+        verbose_name_plural = "Experiment policies"
+
+    def __str__(self) -> str:
+        """Return the experiment ID with its priority and weight."""
+        return f"{self.exp_id} (priority {self.priority}, weight {self.weight})"
+
+
 class ExamPaperQuestion(models.Model):
     """Represents a question in a test paper.
 
@@ -180,7 +345,7 @@ class ExamPaperQuestion(models.Model):
     test_paper = models.ForeignKey(
         UploadedTestPaper, on_delete=models.CASCADE, related_name="questions"
     )
-    question_id = models.CharField(max_length=10, blank=True)
+    question_id = models.CharField(max_length=10, blank=True, db_index=True)
     question = models.TextField()
     standard_answer = models.TextField()
     difficulty = models.IntegerField(default=3)
@@ -1,17 +1,203 @@
-import json
+import contextvars
+import random
+import threading
+import time
+from collections.abc import Hashable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from django.conf import settings
+from pydantic import BaseModel, ConfigDict
 
-load_dotenv()  # ✅ 載入 .env 檔案中的環境變數
+from app import metrics
+from app.context_budget import count_tokens, select_context
+from app.routing import Route, route
 
-client = OpenAI()  # 自動讀取 OPENAI_API_KEY 環境變數
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletion
 
-def score_response(question: str, response: str, standard_answer: str, source: str) -> dict[str, Any]:
+_client: "OpenAI | None" = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> "OpenAI":
+    """Return the process-shared OpenAI client, creating it on first use.
+
+    ``openai`` is imported here rather than at module level so that Django start-up
+    (manage.py commands, test collection, worker boot) does not pay for it, and does
+    not fail when ``OPENAI_API_KEY`` is missing. Every scoring thread of the process
+    shares this client and therefore one HTTP connection pool (see ``app.llm_http``).
+
+    Returns:
+    -------
+    OpenAI
+        A client pointed at ``settings.OPENAI_BASE_URL`` (or the OpenAI API). Retries
+        are handled by :func:`create_completion`, so the client itself never retries.
+    """
+    global _client  # noqa: PLW0603
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                from app.llm_http import build_http_client
+
+                # 自動讀取 OPENAI_API_KEY 環境變數；設定 OPENAI_BASE_URL 可改指向 fake_llm_server
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL or None,
+                    http_client=build_http_client(),
+                    max_retries=0,
+                )
+    return _client
+
+
+def reset_client() -> None:
+    """Close and drop the shared client so the next :func:`get_client` rebuilds it from settings."""
+    global _client  # noqa: PLW0603
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+# 評分 prompt / 模型 / 解析方式變更時須遞增，避免沿用舊 rubric 的評分結果 (見 app/reuse.py)
+RUBRIC_VERSION = "3"
+
+Score = Literal[1, 2, 3, 4, 5]
+
+
+class RubricScores(BaseModel):
+    """Validated rubric scores returned by the scoring model.
+
+    Attributes:
+    ----------
+    accuracy : int
+        Accuracy score (1-5).
+    relevance : int
+        Relevance score (1-5).
+    logic : int
+        Logic score (1-5).
+    conciseness : int
+        Conciseness score (1-5).
+    language_quality : int
+        Language quality score (1-5).
+    overall_comment : str
+        A short overall comment.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    accuracy: Score
+    relevance: Score
+    logic: Score
+    conciseness: Score
+    language_quality: Score
+    overall_comment: str
+
+    @property
+    def total_score(self) -> int:
+        """Return the sum of the five rubric scores."""
+        return self.accuracy + self.relevance + self.logic + self.conciseness + self.language_quality
+
+
+# Structured outputs：限制模型輸出符合 RubricScores 的 JSON (docstring 不送出，節省 prompt token)
+RUBRIC_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "rubric_scores",
+        "strict": True,
+        "schema": {key: value for key, value in RubricScores.model_json_schema().items() if key != "description"},
+    },
+}
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Return how long to wait before retrying, honouring the server's Retry-After."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after_ms = response.headers.get("retry-after-ms")
+        retry_after = response.headers.get("retry-after")
+        try:
+            if retry_after_ms:
+                return float(retry_after_ms) / 1000
+            if retry_after:
+                return float(retry_after)
+        except ValueError:
+            pass
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+    return delay * random.uniform(0.75, 1.0)  # noqa: S311
+
+
+def create_completion(**kwargs: Any) -> "ChatCompletion":
+    """Create a chat completion, retrying transient failures within ``OPENAI_TOTAL_TIMEOUT``.
+
+    Rate limits, connection errors / timeouts and 5xx responses are retried up to
+    ``settings.OPENAI_MAX_RETRIES`` times with exponential backoff. Each attempt gets
+    the per-phase timeouts of ``app.llm_http.attempt_timeout``, capped so that the whole
+    call never exceeds the total deadline.
+
+    Parameters
+    ----------
+    **kwargs : Any
+        Arguments for ``client.chat.completions.create``.
+
+    Returns:
+    -------
+    ChatCompletion
+        The parsed completion.
+    """
+    import openai
+
+    from app.llm_http import attempt_timeout
+
+    deadline = time.monotonic() + settings.OPENAI_TOTAL_TIMEOUT
+    attempt = 0
+    while True:
+        try:
+            return get_client().chat.completions.create(timeout=attempt_timeout(deadline), **kwargs)
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            delay = _retry_delay(e, attempt)
+            if attempt >= settings.OPENAI_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                raise
+            attempt += 1
+            metrics.incr("retries")
+            time.sleep(delay)
+
+
+def score_route(
+    question: str,
+    standard_answer: str,
+    source: str | list[dict[str, Any]],
+    difficulty: int = 3,
+    routing: dict[str, Any] | None = None,
+) -> Route:
+    """Return the route :func:`score_response` takes for these inputs, without calling the model."""
+    context = select_context(source, question, standard_answer)
+    return route(routing or settings.SCORING_ROUTING, difficulty, count_tokens(context))
+
+
+def score_response(
+    question: str,
+    response: str,
+    standard_answer: str,
+    source: str | list[dict[str, Any]],
+    difficulty: int = 3,
+    routing: dict[str, Any] | None = None,
+) -> dict[str, Any]:
     """Score a student's response based on predefined criteria, including source.
 
+    The model and ``max_tokens`` are chosen by :func:`app.routing.route` from the question's
+    difficulty and the token count of the selected source.
+
+    The model is constrained to :data:`RUBRIC_RESPONSE_FORMAT` and its output is validated
+    by :class:`RubricScores`. An invalid or refused output is re-requested for this item
+    only, up to ``settings.SCORING_PARSE_RETRIES`` times, before zero scores are returned.
+
     Parameters
     ----------
     question : str
@@ -21,13 +207,29 @@ def score_response(question: str, response: str, standard_answer: str, source: s
     standard_answer : str
         The reference answer.
     source : str
-        The source content.
+        The source content (a string or the raw ``sources`` list of an upload). Only the
+        chunks most relevant to the question within ``settings.SOURCE_TOKEN_BUDGET`` are
+        sent to the model.
+    difficulty : int
+        The question's difficulty (1-5).
+    routing : dict[str, Any] | None
+        The routing configuration; defaults to ``settings.SCORING_ROUTING``.
 
     Returns:
     -------
     Dict[str, Any]
-        A dictionary containing scores for various criteria and an overall comment.
+        A dictionary containing scores for various criteria and an overall comment,
+        plus the ``model``, ``routing_reason``, ``prompt_tokens``, ``completion_tokens``
+        and ``latency_ms`` of the scoring call (summed over parse retries). On failure the scores are 0 and
+        ``error`` / ``raw_response`` describe the last invalid output.
     """
+    with metrics.span("budget"):
+        context = select_context(source, question, standard_answer)
+    source_tokens = count_tokens(context)
+    metrics.incr("source_tokens_kept", source_tokens)
+    choice = route(routing or settings.SCORING_ROUTING, difficulty, source_tokens)
+    limits = {"max_tokens": choice.max_tokens} if choice.max_tokens else {}
+
     prompt = f"""
 你是一個教育評分專家,請針對學生的回答進行以下五個面向的評分:
 1. 準確度 accuracy
@@ -38,36 +240,53 @@ def score_response(question: str, response: str, standard_answer: str, source: s
 
 題目:{question}
 標準答案:{standard_answer}
-參考資料:{source}
+參考資料:{context}
 學生回答:{response}
 
 其中,參考資料是用來幫助學生回答問題的,但不一定要完全依賴它。但如果參考資料跟答案不一致,請對學生答案進行扣分。
-請針對每一個項目以 1 到 5 分進行打分,並給出總分(total_score),以及綜合評價的簡要說明,輸出格式如下:
-{{
-  "accuracy": x,
-  "relevance": x,
-  "logic": x,
-  "conciseness": x,
-  "language_quality": x,
-  "total_score": x,
-  "overall_comment": "簡要說明"
-}}
+請針對每一個項目以 1 到 5 分進行打分,並在 overall_comment 給出綜合評價的簡要說明。
     """.strip()
 
-    chat_response = client.chat.completions.create(
-        model="gpt-4.1-nano",
-        messages=[
-            {"role": "system", "content": "你是一個精確的教育評分助理。"},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0
-    )
-
-    # 解析回傳內容
-    content = chat_response.choices[0].message.content
-    try:
-        content_load = json.loads(content)
-    except Exception as e:
+    usage = {"model": choice.model, "routing_reason": choice.reason, "prompt_tokens": 0, "completion_tokens": 0}
+    started = time.perf_counter()
+    for attempt in range(settings.SCORING_PARSE_RETRIES + 1):
+        with metrics.span("score"):
+            chat_response = create_completion(
+                model=choice.model,
+                messages=[
+                    {"role": "system", "content": "你是一個精確的教育評分助理。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                response_format=RUBRIC_RESPONSE_FORMAT,
+                **limits,
+            )
+        if chat_response.usage:
+            usage["prompt_tokens"] += chat_response.usage.prompt_tokens
+            usage["completion_tokens"] += chat_response.usage.completion_tokens
+
+        # 解析回傳內容 (schema 驗證)；不合格時只重送這一題
+        message = chat_response.choices[0].message
+        content = message.content
+        try:
+            with metrics.span("decode"):
+                if getattr(message, "refusal", None):
+                    raise ValueError(f"Model refused: {message.refusal}")
+                scores = RubricScores.model_validate_json(content or "")
+            break
+        except ValueError as e:  # pydantic.ValidationError 亦為 ValueError
+            error = e
+            if attempt < settings.SCORING_PARSE_RETRIES:
+                metrics.incr("parse_retries")
+    else:
+        scores = None
+
+    usage["latency_ms"] = round((time.perf_counter() - started) * 1000)
+    metrics.incr("tokens_in", usage["prompt_tokens"])
+    metrics.incr("tokens_out", usage["completion_tokens"])
+
+    if scores is None:
+        metrics.incr("score_errors")
         return {
             "accuracy": 0,
             "relevance": 0,
@@ -76,17 +295,55 @@ def score_response(question: str, response: str, standard_answer: str, source: s
             "language_quality": 0,
             "total_score": 0,
             "overall_comment": "",
-            "error": str(e),
-            "raw_response": content
+            "error": str(error),
+            "raw_response": content,
+            **usage,
         }
-    content_load['total_score'] = sum([
-        content_load["accuracy"],
-        content_load["relevance"],
-        content_load["logic"],
-        content_load["conciseness"],
-        content_load["language_quality"]
-    ])
-    return content_load
+    return {**scores.model_dump(), "total_score": scores.total_score, **usage}
+
+
+def score_many(
+    jobs: Iterable[tuple[Hashable, dict[str, Any]]],
+    max_workers: int | None = None,
+    return_exceptions: bool = False,
+) -> Iterator[tuple[Hashable, dict[str, Any] | Exception]]:
+    """Score many responses concurrently over the shared client.
+
+    Parameters
+    ----------
+    jobs : Iterable[tuple[Hashable, dict[str, Any]]]
+        ``(key, kwargs)`` pairs; ``kwargs`` are passed to :func:`score_response`.
+    max_workers : int | None
+        Size of the thread pool; defaults to ``settings.SCORING_CONCURRENCY``.
+    return_exceptions : bool
+        Yield ``(key, exception)`` for a job that raised instead of propagating the exception.
+
+    Yields:
+    ------
+    tuple[Hashable, dict[str, Any] | Exception]
+        ``(key, scores)`` in completion order. At most ``2 * max_workers`` jobs are
+        pending at any time, so ``jobs`` may be a lazy stream.
+    """
+    def result(future: Future) -> dict[str, Any] | Exception:
+        if return_exceptions and future.exception() is not None:
+            return future.exception()
+        return future.result()
+
+    max_workers = max_workers or settings.SCORING_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="score") as executor:
+        pending = {}
+        for key, kwargs in jobs:
+            # 每個工作複製一份 context，讓 metrics.collect() 的批次收集器也能在執行緒中使用
+            future = executor.submit(contextvars.copy_context().run, score_response, **kwargs)
+            pending[future] = key
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), result(future)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), result(future)
 
 
 # def score_response(question: str, response: str, reference: str) -> dict[str, Any]:
@@ -0,0 +1,114 @@
+"""Admin pagination for very large tables.
+
+百萬筆等級的 changelist 不做完整的 ``COUNT(*)``：
+
+- 未篩選時以資料庫統計估計總筆數 (PostgreSQL ``pg_class.reltuples``、SQLite ``MAX(rowid)``，刪除後會高估)，
+  顯示為「about 估計值」
+- 有篩選 / 搜尋時最多只數到 ``settings.ADMIN_EXACT_COUNT_LIMIT`` 筆，超過時顯示「more than 上限」，
+  頁數不受上限限制：目前頁已滿就可往下一頁，直到取到不滿的一頁為止
+- 兩種非精確的總數在取到不滿的一頁 (最後一頁) 時改為精確值，頁數也不再超過該頁
+- 取頁時先以索引取出該頁的主鍵 (deferred join)，再依主鍵讀取整列，深頁的 OFFSET 只掃描索引
+"""
+
+from typing import Any, Self
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.utils.functional import cached_property
+
+
+class MoreThan(int):
+    """A count known only to exceed ``limit``; its value is ``limit + 1`` and it displays as "more than limit"."""
+
+    limit: int
+
+    def __new__(cls, limit: int) -> Self:
+        """Return the count of a list known to hold more than ``limit`` objects."""
+        obj = super().__new__(cls, limit + 1)
+        obj.limit = limit
+        return obj
+
+    def __str__(self) -> str:
+        """Return the count as shown in the changelist."""
+        return f"more than {self.limit}"
+
+
+class About(int):
+    """A count estimated from database statistics, displayed as "about N"."""
+
+    def __str__(self) -> str:
+        """Return the count as shown in the changelist."""
+        return f"about {int(self)}"
+
+
+# 非精確的總數：頁數以實際取到的頁為準
+APPROXIMATE_COUNTS = (About, MoreThan)
+
+
+def estimated_row_count(model: type[Model], using: str) -> int | None:
+    """Return the planner's estimate of ``model``'s row count, or None when unavailable."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            # 從未 ANALYZE 的表為 -1
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")  # noqa: S608
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator with an estimated / capped ``count`` and primary-key-first page fetches.
+
+    Counts below ``settings.ADMIN_EXACT_COUNT_LIMIT`` are exact. Above it, the count of an
+    unfiltered list is the database estimate (:class:`About`); that of a filtered list is reported
+    as :class:`MoreThan` the limit. With either, a page stays reachable as long as the previous
+    page was full, and the first short page fixes the count and the number of pages.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        """Return the (possibly estimated) number of objects."""
+        queryset: QuerySet = self.object_list
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return About(estimate)
+        count = queryset.order_by()[:limit + 1].count()
+        return MoreThan(limit) if count > limit else count
+
+    def validate_number(self, number: Any) -> int:
+        """Validate ``number``; with an approximate count, :meth:`page` checks whether the page exists."""
+        if not isinstance(self.count, APPROXIMATE_COUNTS):
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError) as e:
+            raise PageNotAnInteger("That page number is not an integer") from e
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number: Any) -> Page:
+        """Return the page ``number``, fetching its primary keys first and then only those rows."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        ids = list(self.object_list.values_list("pk", flat=True)[bottom:bottom + self.per_page])
+        if isinstance(self.count, APPROXIMATE_COUNTS):
+            if not ids and number > 1:
+                raise EmptyPage("That page contains no results")
+            # 滿頁時至少還有下一頁；不滿時即為最後一頁，總數也因此確定
+            if len(ids) == self.per_page:
+                self.__dict__["num_pages"] = max(self.num_pages, number + 1)
+            else:
+                self.__dict__["num_pages"] = number
+                self.__dict__["count"] = bottom + len(ids)
+        objects = {obj.pk: obj for obj in self.object_list.order_by().filter(pk__in=ids)}
+        return self._get_page([objects[pk] for pk in ids if pk in objects], number, self)
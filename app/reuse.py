@@ -0,0 +1,84 @@
+"""Reuse of earlier scores for identical answers.
+
+同一題 (question_id) 以相同標準答案、相同 rubric 版本、且由這次路由會選用的同一模型評過
+完全相同的回答時，直接複製既有評分並記錄來源 (``reused_from``)，不再呼叫 LLM。
+"""
+
+import hashlib
+import unicodedata
+from collections.abc import Iterable
+
+from app.models import Evaluation
+from app.openai_eval import RUBRIC_VERSION
+
+SCORE_FIELDS = (
+    "accuracy", "relevance", "logic", "conciseness", "language_quality", "total_score", "overall_comment", "model",
+)
+
+
+def normalize(text: str | None) -> str:
+    """Normalize text for fingerprinting: NFKC, trimmed, internal whitespace collapsed to one space."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def response_fingerprint(
+    question_id: str, bot_response: str, standard_answer: str, rubric_version: str = RUBRIC_VERSION
+) -> str:
+    """Return the SHA-256 fingerprint identifying a scoring input.
+
+    Parameters
+    ----------
+    question_id : str
+        The question ID.
+    bot_response : str
+        The response being scored.
+    standard_answer : str
+        The reference answer it is scored against.
+    rubric_version : str
+        Version of the scoring rubric; results of other versions never match.
+
+    Returns:
+    -------
+    str
+        64 hex characters.
+    """
+    parts = (rubric_version, normalize(question_id), normalize(bot_response), normalize(standard_answer))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def find_reusable(keys: Iterable[tuple[str, str]]) -> dict[tuple[str, str], Evaluation]:
+    """Return one LLM-scored evaluation per ``(fingerprint, model)``, looked up with a single query.
+
+    Scores of another model than the one the item routes to are not reused, so routing an
+    item to a stronger model rescores it. Failed calls and placeholders (``total_score`` 0;
+    every rubric field is at least 1) and heuristic API scores (blank ``model``) are never reused.
+    """
+    keys = set(keys)
+    evaluations = (
+        Evaluation.objects.filter(
+            response_fingerprint__in={fingerprint for fingerprint, _ in keys},
+            model__in={model for _, model in keys},
+            total_score__gt=0,
+        )
+        .only("id", "response_fingerprint", "reused_from_id", *SCORE_FIELDS)
+        .order_by("id")
+    )
+    reusable: dict[tuple[str, str], Evaluation] = {}
+    for evaluation in evaluations:
+        key = (evaluation.response_fingerprint, evaluation.model)
+        if key in keys:
+            reusable.setdefault(key, evaluation)
+    return reusable
+
+
+def reused_scores(source: Evaluation) -> dict:
+    """Return the fields copied from ``source`` onto a new evaluation, with provenance and zero usage."""
+    return {
+        **{field: getattr(source, field) for field in SCORE_FIELDS},
+        # 指向最初實際評分的紀錄
+        "reused_from_id": source.reused_from_id or source.id,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": 0,
+        "cost_usd": 0,
+    }
@@ -0,0 +1,123 @@
+"""Difficulty- and source-length-aware choice of the scoring model.
+
+路由設定 (``settings.SCORING_ROUTING``，或 :class:`~app.models.ExperimentPolicy` 的 ``routing`` 覆寫) 格式::
+
+    {
+        "default": {"model": "gpt-4.1-nano", "max_tokens": 400},
+        "rules": [
+            {"min_difficulty": 4, "model": "gpt-4.1-mini", "max_tokens": 500},
+            {"min_source_tokens": 1000, "model": "gpt-4.1-mini", "name": "long source"},
+        ],
+    }
+
+rules 依序比對，規則內的條件 (``min_difficulty`` / ``max_difficulty`` / ``min_source_tokens`` /
+``max_source_tokens``) 須全部成立；第一條符合的規則決定模型，都不符合時用 default。
+``source_tokens`` 是預算裁切後實際送出的參考資料 token 數。實驗的覆寫只取代其提供的鍵
+(例如只給 ``rules`` 時沿用全域的 default)。
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+# 規則條件 -> (比對的數值, 比較方式, 顯示符號)
+CONDITIONS = {
+    "min_difficulty": ("difficulty", operator.ge, ">="),
+    "max_difficulty": ("difficulty", operator.le, "<="),
+    "min_source_tokens": ("source_tokens", operator.ge, ">="),
+    "max_source_tokens": ("source_tokens", operator.le, "<="),
+}
+TARGET_KEYS = {"model", "max_tokens"}
+RULE_KEYS = set(CONDITIONS) | TARGET_KEYS | {"name"}
+
+# Evaluation.routing_reason 的長度
+REASON_LENGTH = 100
+
+
+@dataclass
+class Route:
+    """The model chosen for one scoring call.
+
+    Attributes:
+    ----------
+    model : str
+        The model to call.
+    max_tokens : int | None
+        Completion token limit (None = the provider default).
+    reason : str
+        Why the model was chosen: the rule's name or conditions, or ``default``.
+    """
+    model: str
+    max_tokens: int | None
+    reason: str
+
+
+def _check_target(target: Any, where: str) -> None:
+    if not isinstance(target, dict) or not isinstance(target.get("model"), str) or not target["model"]:
+        raise ValidationError(f"{where} must set a model name.")
+    max_tokens = target.get("max_tokens")
+    if max_tokens is not None and (not isinstance(max_tokens, int) or max_tokens <= 0):
+        raise ValidationError(f"{where}: max_tokens must be a positive integer.")
+
+
+def validate_routing(value: Any) -> None:
+    """Validate a routing override; an empty dict means the global routing is used unchanged.
+
+    Raises:
+    ------
+    ValidationError
+        If the value is not a routing configuration.
+    """
+    if not isinstance(value, dict):
+        raise ValidationError("Routing must be an object with 'default' and / or 'rules'.")
+    unknown = set(value) - {"default", "rules"}
+    if unknown:
+        raise ValidationError(f"Unknown routing keys: {', '.join(sorted(unknown))}.")
+    if "default" in value:
+        _check_target(value["default"], "default")
+    rules = value.get("rules", [])
+    if not isinstance(rules, list):
+        raise ValidationError("rules must be a list.")
+    for number, rule in enumerate(rules, start=1):
+        _check_target(rule, f"Rule {number}")
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ValidationError(f"Rule {number}: unknown keys {', '.join(sorted(unknown))}.")
+        if not set(rule) & set(CONDITIONS):
+            raise ValidationError(f"Rule {number} needs at least one of {', '.join(CONDITIONS)}.")
+        if not all(isinstance(rule[key], int) for key in set(rule) & set(CONDITIONS)):
+            raise ValidationError(f"Rule {number}: conditions must be integers.")
+
+
+def routing_for(exp_id: str | None) -> dict[str, Any]:
+    """Return the routing of ``exp_id``: ``settings.SCORING_ROUTING`` updated with its policy's override."""
+    from app.models import ExperimentPolicy
+
+    routing = settings.SCORING_ROUTING
+    if exp_id:
+        override = ExperimentPolicy.objects.filter(exp_id=exp_id).values_list("routing", flat=True).first()
+        if override:
+            routing = {**routing, **override}
+    return routing
+
+
+def describe(rule: dict[str, Any]) -> str:
+    """Return the routing reason recorded for ``rule``."""
+    if rule.get("name"):
+        return rule["name"][:REASON_LENGTH]
+    return ",".join(
+        f"{field}{symbol}{rule[key]}" for key, (field, _, symbol) in CONDITIONS.items() if key in rule
+    )[:REASON_LENGTH]
+
+
+def route(routing: dict[str, Any], difficulty: int, source_tokens: int) -> Route:
+    """Pick the model for an item of ``difficulty`` whose selected source is ``source_tokens`` long."""
+    values = {"difficulty": difficulty, "source_tokens": source_tokens}
+    for rule in routing.get("rules", []):
+        if all(compare(values[field], rule[key]) for key, (field, compare, _) in CONDITIONS.items() if key in rule):
+            return Route(rule["model"], rule.get("max_tokens"), describe(rule))
+    default = routing["default"]
+    return Route(default["model"], default.get("max_tokens"), "default")
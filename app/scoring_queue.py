@@ -0,0 +1,257 @@
+"""Database-backed queue of evaluation items scored by ``run_scoring_workers``.
+
+``settings.SCORING_MODE = "queue"`` 時，上傳的批次只寫入 :class:`~app.models.ScoringJob`，
+由多個 worker 行程領取、評分並寫入 Evaluation：
+
+- 領取：PostgreSQL 以 ``SELECT ... FOR UPDATE SKIP LOCKED``；SQLite 以 ``UPDATE ... WHERE id IN
+  (SELECT ... LIMIT n)`` (SQLite 同時只有一個寫入者，IMMEDIATE 交易即為原子操作)。每次領取帶一個隨機
+  ``claim_token``，之後的心跳與完成都以 token 比對。
+- 心跳：worker 定期更新 ``heartbeat_at``；超過 ``SCORING_STALE_SECONDS`` 未更新的領取 (worker 當掉)
+  會被 :func:`reap_stale` 退回佇列。被退回的工作即使原 worker 之後完成，也因 token 不符而不會重複寫入。
+- 排程：每次領取依 :class:`~app.models.ExperimentPolicy` 分配給各實驗 (見 :func:`allocate`)：
+  priority 高者先派；同 priority 的實驗依 ``weight`` 加權公平分配 (權重相同即輪流)，且已領取數
+  不超過 ``max_concurrency``。大批次執行中，新上傳的小批次仍能立即分到 worker。
+"""
+
+import heapq
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.db.models import Count, F, Min, QuerySet
+from django.utils import timezone
+
+from app import cache
+from app.bulk import bulk_load, bulk_upsert
+from app.models import Evaluation, ExperimentPolicy, ScoringJob, UploadedEvaluationBatch
+
+# 同一 (exp_id, question_id) 已有評分時 (同名批次重複上傳、檔案內重複題號) 以新評分覆寫的欄位
+RESCORED_FIELDS = [
+    field.name for field in Evaluation._meta.concrete_fields
+    if not field.primary_key and not field.generated and field.name not in ("exp_id", "question_id", "created_at")
+]
+
+# PostgreSQL advisory lock，讓領取的分配與更新依序進行，max_concurrency 才不會被同時領取超過
+CLAIM_LOCK_ID = 4_702_048
+
+SCORING_MODES = ("inline", "queue")
+
+
+def require_shared_cache() -> None:
+    """Raise ImproperlyConfigured unless the default cache is shared between processes.
+
+    Workers invalidate cached API responses and open read-your-writes windows through the
+    cache; with a per-process cache the web process would keep serving stale results.
+    """
+    cache.require_shared_cache("SCORING_MODE=queue")
+
+
+def scoring_mode() -> str:
+    """Return the configured ``SCORING_MODE``; ``queue`` also requires :func:`require_shared_cache`."""
+    mode = settings.SCORING_MODE
+    if mode not in SCORING_MODES:
+        raise ImproperlyConfigured(f"SCORING_MODE must be one of {', '.join(SCORING_MODES)}, got {mode!r}")
+    if mode == "queue":
+        require_shared_cache()
+    return mode
+
+
+def enqueue(batch: UploadedEvaluationBatch, rows: Iterable[dict[str, Any]]) -> int:
+    """Queue one scoring job per evaluation row of ``batch``; return the number queued."""
+    return bulk_load(ScoringJob, (ScoringJob(batch=batch, exp_id=batch.name, payload=row) for row in rows))
+
+
+@dataclass
+class ExperimentLoad:
+    """Queue state and policy of one experiment, as seen by :func:`allocate`.
+
+    Attributes:
+    ----------
+    exp_id : str
+        The experiment ID.
+    pending : int
+        Number of pending jobs.
+    claimed : int
+        Number of jobs currently claimed by workers.
+    first_pending : int
+        ID of the oldest pending job, used to break ties in queue order.
+    priority : int
+        Dispatch priority (higher first).
+    weight : int
+        Fair-share weight within the priority.
+    max_concurrency : int
+        Cap on claimed jobs (0 = unlimited).
+    """
+    exp_id: str
+    pending: int
+    claimed: int
+    first_pending: int
+    priority: int = 0
+    weight: int = 1
+    max_concurrency: int = 0
+
+    def room(self) -> int:
+        """Return how many more jobs may be claimed now."""
+        if not self.max_concurrency:
+            return self.pending
+        return max(0, min(self.pending, self.max_concurrency - self.claimed))
+
+
+def experiment_loads() -> list[ExperimentLoad]:
+    """Return the load and policy of every experiment with pending jobs."""
+    loads: dict[str, ExperimentLoad] = {}
+    claimed: dict[str, int] = {}
+    rows = (
+        ScoringJob.objects.filter(status__in=[ScoringJob.PENDING, ScoringJob.CLAIMED])
+        .values("exp_id", "status")
+        .annotate(count=Count("id"), first=Min("id"))
+        .order_by()
+    )
+    for row in rows:
+        if row["status"] == ScoringJob.PENDING:
+            loads[row["exp_id"]] = ExperimentLoad(row["exp_id"], row["count"], 0, row["first"])
+        else:
+            claimed[row["exp_id"]] = row["count"]
+    for policy in ExperimentPolicy.objects.filter(exp_id__in=list(loads)):
+        load = loads[policy.exp_id]
+        load.priority, load.weight, load.max_concurrency = policy.priority, policy.weight, policy.max_concurrency
+    for exp_id, load in loads.items():
+        load.claimed = claimed.get(exp_id, 0)
+    return list(loads.values())
+
+
+def allocate(loads: list[ExperimentLoad], limit: int) -> dict[str, int]:
+    """Split ``limit`` claim slots among experiments.
+
+    Priorities are served from highest to lowest; slots are only passed to a lower priority
+    when the higher ones run out of pending jobs or hit their concurrency cap. Within a
+    priority, each slot goes to the experiment with the fewest claimed jobs per unit of
+    weight, ties going to the experiment whose oldest pending job was queued first.
+
+    Returns:
+    -------
+    dict[str, int]
+        Number of jobs to claim per experiment ID.
+    """
+    plan: dict[str, int] = {}
+    for priority in sorted({load.priority for load in loads}, reverse=True):
+        heap = [
+            (load.claimed / load.weight, load.first_pending, load.room(), load)
+            for load in loads
+            if load.priority == priority and load.room() > 0
+        ]
+        heapq.heapify(heap)
+        while heap and limit > 0:
+            _, first_pending, room, load = heapq.heappop(heap)
+            plan[load.exp_id] = plan.get(load.exp_id, 0) + 1
+            limit -= 1
+            if room > 1:
+                share = (load.claimed + plan[load.exp_id]) / load.weight
+                heapq.heappush(heap, (share, first_pending, room - 1, load))
+    return plan
+
+
+def claim(worker_id: str, limit: int) -> tuple[str, list[ScoringJob]]:
+    """Atomically claim up to ``limit`` pending jobs for ``worker_id``, shared out by :func:`allocate`.
+
+    Returns:
+    -------
+    tuple[str, list[ScoringJob]]
+        The claim token and the claimed jobs (oldest first).
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    claimed = {
+        "status": ScoringJob.CLAIMED,
+        "claim_token": token,
+        "claimed_by": worker_id,
+        "claimed_at": now,
+        "heartbeat_at": now,
+        "attempts": F("attempts") + 1,
+    }
+    connection = connections[ScoringJob.objects.db]
+    # SQLite 的交易以 IMMEDIATE 開始，本身即取得寫鎖
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_ID])
+        for exp_id, count in allocate(experiment_loads(), limit).items():
+            pending = ScoringJob.objects.filter(status=ScoringJob.PENDING, exp_id=exp_id).order_by("id")
+            if connection.vendor == "postgresql":
+                ids = list(pending.select_for_update(skip_locked=True).values_list("id", flat=True)[:count])
+                ScoringJob.objects.filter(id__in=ids).update(**claimed)
+            else:
+                ScoringJob.objects.filter(id__in=pending.values("id")[:count]).update(**claimed)
+    return token, list(ScoringJob.objects.filter(claim_token=token, status=ScoringJob.CLAIMED).order_by("id"))
+
+
+def heartbeat(token: str) -> int:
+    """Refresh the heartbeat of the jobs still held by claim ``token``."""
+    return ScoringJob.objects.filter(claim_token=token, status=ScoringJob.CLAIMED).update(heartbeat_at=timezone.now())
+
+
+def complete(token: str, evaluations: dict[int, Evaluation]) -> int:
+    """Write the evaluations of jobs still held by ``token`` and mark those jobs done.
+
+    Parameters
+    ----------
+    token : str
+        The claim token.
+    evaluations : dict[int, Evaluation]
+        Unsaved evaluations keyed by job id.
+
+    Returns:
+    -------
+    int
+        The number of evaluations written; jobs reclaimed by another worker are skipped. An
+        evaluation whose ``(exp_id, question_id)`` already exists overwrites it.
+    """
+    with transaction.atomic():
+        held = ScoringJob.objects.filter(id__in=evaluations, claim_token=token, status=ScoringJob.CLAIMED)
+        if connections[ScoringJob.objects.db].vendor == "postgresql":
+            held = held.select_for_update()
+        ids = list(held.values_list("id", flat=True))
+        # 同一次寫入內重複的題號只保留最後一筆 (ON CONFLICT 不能在同一陳述式更新同一列兩次)
+        latest = {}
+        for job_id in sorted(ids):
+            evaluation = evaluations[job_id]
+            latest[evaluation.exp_id, evaluation.question_id] = evaluation
+        bulk_upsert(Evaluation, latest.values(), ["exp_id", "question_id"], RESCORED_FIELDS)
+        ScoringJob.objects.filter(id__in=ids).update(status=ScoringJob.DONE, finished_at=timezone.now(), error="")
+    return len(ids)
+
+
+def _give_back(jobs: QuerySet, error: str | None = None) -> int:
+    """Return the claimed ``jobs`` to the queue, marking those that reached ``SCORING_MAX_ATTEMPTS`` failed."""
+    errors = {} if error is None else {"error": error}
+    failed = jobs.filter(attempts__gte=settings.SCORING_MAX_ATTEMPTS).update(
+        status=ScoringJob.FAILED, finished_at=timezone.now(), **errors
+    )
+    return failed + jobs.update(status=ScoringJob.PENDING, claim_token="", **errors)
+
+
+def release(token: str, job_id: int, error: str) -> None:
+    """Return a job that failed to score to the queue, or mark it failed after ``SCORING_MAX_ATTEMPTS``."""
+    _give_back(ScoringJob.objects.filter(id=job_id, claim_token=token, status=ScoringJob.CLAIMED), error)
+
+
+def abandon(token: str, error: str) -> int:
+    """Give back every job still held by ``token`` after the claim failed as a whole (see :func:`release`)."""
+    return _give_back(ScoringJob.objects.filter(claim_token=token, status=ScoringJob.CLAIMED), error)
+
+
+def reap_stale(stale_seconds: float | None = None) -> int:
+    """Give back claims whose worker stopped heartbeating; return how many were reaped.
+
+    A crash counts as an attempt, so a job that keeps killing its worker is eventually marked failed.
+    """
+    stale_seconds = settings.SCORING_STALE_SECONDS if stale_seconds is None else stale_seconds
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds)
+    return _give_back(
+        ScoringJob.objects.filter(status=ScoringJob.CLAIMED, heartbeat_at__lt=cutoff), "Worker stopped heartbeating."
+    )
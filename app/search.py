@@ -0,0 +1,174 @@
+"""Full-text search over evaluation questions and bot responses.
+
+SQLite：``app_evaluation_fts`` 為 FTS5 索引表 (rowid = Evaluation.id)，內容為
+:func:`app.context_budget.terms` 切出的詞 (英文單字 + 中文二字詞)，以空白串接後交給
+``unicode61`` tokenizer。索引由 ``app_evaluation`` 上的 trigger 維護 (trigger 呼叫每個連線上
+註冊的 ``search_terms()`` SQL 函式)，因此 ORM 儲存、``bulk_load`` / ``bulk_upsert`` 與
+upsert 都會同步更新索引。SQLite 的部分 ALTER 會重建資料表並遺失 trigger，所以每次 migrate
+後都會以 :func:`ensure_triggers` 補建。該函式只存在於 Django 的連線上，從 sqlite3 shell 或
+其他工具寫入 ``app_evaluation`` 會因 ``no such function: search_terms`` 失敗。
+
+PostgreSQL：以 ``pg_trgm`` 的 GIN 索引 (建在 ``UPPER(col::text)`` 上，與 ``icontains`` 編譯出的
+運算式相同) 支援 ``icontains`` 查詢。
+"""
+
+from typing import Any
+
+from django.db import connections, router
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from app.context_budget import terms
+from app.models import Evaluation
+
+FTS_TABLE = "app_evaluation_fts"
+SEARCH_FUNCTION = "search_terms"
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(test_question, bot_response, tokenize='unicode61')"
+)
+# 一般 (非 contentless) FTS5 表：更新 / 刪除時可直接以 rowid 刪除舊索引
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON app_evaluation BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+        VALUES (new.id, {SEARCH_FUNCTION}(new.test_question), {SEARCH_FUNCTION}(new.bot_response));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF test_question, bot_response ON app_evaluation
+    BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+        VALUES (new.id, {SEARCH_FUNCTION}(new.test_question), {SEARCH_FUNCTION}(new.bot_response));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON app_evaluation BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+REBUILD_FTS = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, test_question, bot_response)
+    SELECT id, {SEARCH_FUNCTION}(test_question), {SEARCH_FUNCTION}(bot_response) FROM app_evaluation
+    """,
+]
+
+
+def index_text(text: str | None) -> str:
+    """Return ``text`` as the space-separated terms stored in the FTS index."""
+    return " ".join(terms(text or ""))
+
+
+def register_functions(dbapi_connection: Any) -> None:
+    """Register the ``search_terms()`` SQL function used by the FTS triggers on a sqlite3 connection."""
+    dbapi_connection.create_function(SEARCH_FUNCTION, 1, index_text, deterministic=True)
+
+
+def ensure_triggers(sender: Any, using: str = "default", **kwargs: Any) -> None:
+    """``post_migrate`` handler (re)creating the FTS triggers on a SQLite database that has the index."""
+    _ = sender, kwargs
+    connection = connections[using]
+    if connection.vendor != "sqlite" or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in FTS_TRIGGERS:
+            cursor.execute(statement)
+
+
+def match_expression(query: str) -> str:
+    """Build an FTS5 ``MATCH`` expression: every word of ``query`` must occur as a phrase.
+
+    A lone CJK character is matched as a prefix of the stored bigrams.
+    """
+    phrases = []
+    for word in query.split():
+        word_terms = terms(word)
+        if not word_terms:
+            continue
+        phrase = '"' + " ".join(term.replace('"', '""') for term in word_terms) + '"'
+        if len(word_terms) == 1 and len(word_terms[0]) == 1:
+            phrase += "*"
+        phrases.append(phrase)
+    return " AND ".join(phrases)
+
+
+def uses_fts(using: str) -> bool:
+    """Return True when the ``using`` database has the FTS5 index."""
+    return connections[using].vendor == "sqlite"
+
+
+def filter_matching(queryset: QuerySet, query: str) -> QuerySet:
+    """Restrict an Evaluation ``queryset`` to rows whose question or response matches ``query``."""
+    if uses_fts(queryset.db):
+        expression = match_expression(query)
+        if not expression:
+            return queryset.none()
+        ids = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression])  # noqa: S608, S611
+        return queryset.filter(id__in=ids)
+    condition = Q()
+    for word in query.split():
+        condition &= Q(test_question__icontains=word) | Q(bot_response__icontains=word)
+    return queryset.filter(condition)
+
+
+def search_ids(query: str, exp_id: str | None = None, limit: int = 50, using: str = "default") -> list[int]:
+    """Return the IDs of the evaluations matching ``query`` on database ``using``, best matches (BM25) first.
+
+    Parameters
+    ----------
+    query : str
+        Words to look for; each must appear in the question or the bot response.
+    exp_id : str | None
+        Only search this experiment.
+    limit : int
+        Maximum number of results.
+    using : str
+        The database alias to search.
+
+    Returns:
+    -------
+    list[int]
+        The matching evaluation IDs (newest first on databases without FTS5).
+    """
+    if not uses_fts(using):
+        queryset = Evaluation.objects.using(using).filter(**({"exp_id": exp_id} if exp_id else {}))
+        return list(filter_matching(queryset, query).order_by("-id").values_list("id", flat=True)[:limit])
+
+    expression = match_expression(query)
+    if not expression:
+        return []
+    sql = (
+        f"SELECT f.rowid FROM {FTS_TABLE} f JOIN {Evaluation._meta.db_table} e ON e.id = f.rowid "  # noqa: S608
+        f"WHERE {FTS_TABLE} MATCH %s" + (" AND e.exp_id = %s" if exp_id else "") + " ORDER BY f.rank LIMIT %s"
+    )
+    params = [expression, *([exp_id] if exp_id else []), limit]
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_evaluations(query: str, exp_id: str | None = None, limit: int = 50) -> list[Evaluation]:
+    """Return the evaluations matching ``query``, in the order of :func:`search_ids`.
+
+    Parameters
+    ----------
+    query : str
+        Words to look for; each must appear in the question or the bot response.
+    exp_id : str | None
+        Only search this experiment.
+    limit : int
+        Maximum number of results.
+
+    Returns:
+    -------
+    list[Evaluation]
+        The matching evaluations (newest first on databases without FTS5).
+    """
+    using = router.db_for_read(Evaluation)
+    ids = search_ids(query, exp_id, limit, using)
+    found = Evaluation.objects.using(using).in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
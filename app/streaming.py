@@ -0,0 +1,179 @@
+"""Incremental event responses (Server-Sent Events or NDJSON).
+
+批次評分時每完成一題就送出一個事件，用戶端不必等整批完成：
+
+- ``Accept: text/event-stream``：SSE，每個事件為 ``event: <name>`` / ``data: <json>``
+- 其他：NDJSON，每行一個 ``{"event": <name>, "data": <json>}``
+
+NDJSON 請求本文則以 :func:`iter_ndjson_batches` 逐行讀取，經有界佇列交給處理端。
+"""
+
+import json
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, StreamingHttpResponse
+
+SSE_CONTENT_TYPE = "text/event-stream"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+Event = tuple[str, dict[str, Any]]
+
+_DONE = object()
+
+
+def wants_sse(request: HttpRequest) -> bool:
+    """Return True when the client asked for Server-Sent Events."""
+    return SSE_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+def encode_sse(event: str, data: dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+
+def encode_ndjson(event: str, data: dict[str, Any]) -> bytes:
+    """Encode one NDJSON line."""
+    return json.dumps({"event": event, "data": data}, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b"\n"
+
+
+def event_stream(request: HttpRequest, events: Iterable[Event]) -> StreamingHttpResponse:
+    """Stream ``(event, data)`` pairs as SSE or NDJSON, negotiated from the ``Accept`` header.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The HTTP request object.
+    events : Iterable[tuple[str, dict[str, Any]]]
+        Lazily produced events; each one is flushed to the client as soon as it is yielded.
+
+    Returns:
+    -------
+    StreamingHttpResponse
+        The streaming response.
+    """
+    sse = wants_sse(request)
+    encode = encode_sse if sse else encode_ndjson
+
+    def body() -> Iterator[bytes]:
+        for event, data in events:
+            yield encode(event, data)
+
+    response = StreamingHttpResponse(body(), content_type=SSE_CONTENT_TYPE if sse else NDJSON_CONTENT_TYPE)
+    # 避免代理伺服器 (如 nginx) 緩衝整個回應
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def request_stream(request: HttpRequest) -> IO[bytes]:
+    """Return a stream of ``request``'s body that also covers chunked bodies without a Content-Length.
+
+    Django caps the WSGI input at ``CONTENT_LENGTH`` (0 when absent). A server that sets
+    ``wsgi.input_terminated`` (e.g. gunicorn for ``Transfer-Encoding: chunked``) ends its input
+    with the body, so that input is read directly.
+    """
+    meta = request.META
+    if meta.get("wsgi.input_terminated") and not meta.get("CONTENT_LENGTH"):
+        return meta["wsgi.input"]
+    return request
+
+
+def _put(pending: queue.Queue, stop: threading.Event, item: Any) -> bool:
+    """Put ``item`` into ``pending``, waiting while it is full; give up once ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            pending.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _read_ndjson(stream: IO[bytes], pending: queue.Queue, stop: threading.Event) -> None:
+    """Decode the lines of ``stream`` into ``pending``, followed by ``_DONE`` or the read error."""
+    try:
+        for line_num, raw in enumerate(iter(stream.readline, b""), start=1):
+            if not raw.strip():
+                continue
+            try:
+                value = json.loads(raw)
+            except ValueError as e:
+                value = e
+            # 消費端提早結束 (例如用戶端斷線) 時停止讀取
+            if not _put(pending, stop, (line_num, value)):
+                return
+    except Exception as e:  # 讀取失敗交由消費端拋出
+        _put(pending, stop, e)
+        return
+    _put(pending, stop, _DONE)
+
+
+def _take_batch(pending: queue.Queue, batch_size: int) -> tuple[list[tuple[int, Any]], bool]:
+    """Wait for the next line in ``pending``, then take those already queued, up to ``batch_size``.
+
+    Returns:
+    -------
+    tuple[list[tuple[int, Any]], bool]
+        The batch and whether the stream has ended.
+
+    Raises:
+    ------
+    Exception
+        The error that stopped the reader.
+    """
+    batch = []
+    item = pending.get()
+    while item is not _DONE:
+        if isinstance(item, Exception):
+            raise item
+        batch.append(item)
+        if len(batch) >= batch_size:
+            return batch, False
+        try:
+            item = pending.get_nowait()
+        except queue.Empty:
+            return batch, False
+    return batch, True
+
+
+def iter_ndjson_batches(
+    stream: IO[bytes], max_pending: int, batch_size: int
+) -> Iterator[list[tuple[int, Any]]]:
+    """Read an NDJSON stream in a background thread and yield its lines in batches.
+
+    The reader hands lines over through a queue holding at most ``max_pending`` of them; when
+    the consumer falls behind, the reader blocks and stops pulling from ``stream``. A batch is
+    yielded as soon as the queue runs dry or ``batch_size`` lines are collected, so a slow
+    producer still gets prompt acknowledgements.
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        A binary stream with ``readline``, such as :func:`request_stream` of a request.
+    max_pending : int
+        Maximum number of lines read but not yet consumed.
+    batch_size : int
+        Maximum number of lines per yielded batch.
+
+    Yields:
+    ------
+    list[tuple[int, Any]]
+        ``(line_number, value)`` pairs, where ``value`` is the decoded JSON or the
+        ``ValueError`` raised while decoding that line. Blank lines are skipped.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    threading.Thread(target=_read_ndjson, args=(stream, pending, stop), name="ndjson-reader", daemon=True).start()
+    try:
+        done = False
+        while not done:
+            batch, done = _take_batch(pending, batch_size)
+            if batch:
+                yield batch
+    finally:
+        stop.set()
@@ -0,0 +1,95 @@
+"""Token, latency and cost accounting for LLM scoring calls."""
+
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Sum
+
+from app.models import Evaluation
+
+MILLION = Decimal(1_000_000)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Decimal:
+    """Estimate the USD cost of one call from ``settings.OPENAI_MODEL_PRICING``.
+
+    Parameters
+    ----------
+    model : str
+        The model name; unknown models are priced at zero.
+    prompt_tokens : int
+        Prompt tokens consumed.
+    completion_tokens : int
+        Completion tokens consumed.
+
+    Returns:
+    -------
+    Decimal
+        The estimated cost, rounded to six decimal places.
+    """
+    pricing = settings.OPENAI_MODEL_PRICING.get(model)
+    if not pricing:
+        return Decimal(0)
+    cost = (
+        Decimal(str(pricing["prompt"])) * prompt_tokens
+        + Decimal(str(pricing["completion"])) * completion_tokens
+    ) / MILLION
+    return cost.quantize(Decimal("0.000001"))
+
+
+def usage_fields(scores: dict[str, Any]) -> dict[str, Any]:
+    """Extract the usage columns of :class:`Evaluation` from a ``score_response`` result."""
+    model = scores.get("model") or ""
+    prompt_tokens = scores.get("prompt_tokens") or 0
+    completion_tokens = scores.get("completion_tokens") or 0
+    return {
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_ms": scores.get("latency_ms") or 0,
+        "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+    }
+
+
+USAGE_AGGREGATES = {
+    "evaluations": Count("id"),
+    "prompt_tokens": Sum("prompt_tokens", default=0),
+    "completion_tokens": Sum("completion_tokens", default=0),
+    "cost_usd": Sum("cost_usd", default=Decimal(0)),
+    "avg_latency_ms": Avg("latency_ms", default=0),
+    "max_latency_ms": Max("latency_ms", default=0),
+}
+
+
+def experiment_usage(exp_id: str, top: int = 10) -> dict[str, Any]:
+    """Roll up token usage, latency and cost for one experiment.
+
+    Parameters
+    ----------
+    exp_id : str
+        The experiment ID.
+    top : int
+        How many of the most prompt-heavy questions to include.
+
+    Returns:
+    -------
+    dict[str, Any]
+        The aggregated usage, plus ``top_prompt_questions`` sorted by prompt tokens and
+        ``routes``, the usage per model and routing reason.
+    """
+    evaluations = Evaluation.objects.filter(exp_id=exp_id)
+    usage = evaluations.aggregate(**USAGE_AGGREGATES)
+    usage["exp_id"] = exp_id
+    usage["top_prompt_questions"] = list(
+        evaluations.order_by("-prompt_tokens").values("question_id", "prompt_tokens", "completion_tokens")[:top]
+    )
+    usage["routes"] = list(
+        evaluations.values("model", "routing_reason").annotate(**USAGE_AGGREGATES).order_by("-evaluations")
+    )
+    return usage
+
+
+def usage_by_experiment() -> list[dict[str, Any]]:
+    """Roll up token usage, latency and cost per ``exp_id``."""
+    return list(Evaluation.objects.values("exp_id").annotate(**USAGE_AGGREGATES).order_by("exp_id"))
@@ -16,6 +16,63 @@ load_dotenv()
 # Security settings
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+# OpenAI client settings
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # 設為 fake_llm_server 的網址 (e.g. http://127.0.0.1:8010/v1) 可離線壓測
+
+# 評分用 HTTP 連線池 (所有評分執行緒共用同一個 client)
+OPENAI_HTTP_MAX_CONNECTIONS = int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "100"))
+OPENAI_HTTP_MAX_KEEPALIVE = int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "100"))
+OPENAI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY", "30"))
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true"  # 需安裝 h2 套件才會啟用
+
+# 評分請求 timeout (秒)：各階段上限，以及含重試在內的總時限
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_WRITE_TIMEOUT = float(os.getenv("OPENAI_WRITE_TIMEOUT", "10"))
+OPENAI_POOL_TIMEOUT = float(os.getenv("OPENAI_POOL_TIMEOUT", "10"))
+OPENAI_TOTAL_TIMEOUT = float(os.getenv("OPENAI_TOTAL_TIMEOUT", "120"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+# 同時進行的評分請求數
+SCORING_CONCURRENCY = int(os.getenv("SCORING_CONCURRENCY", "8"))
+# 模型輸出未通過 schema 驗證時，單題重新評分的次數
+SCORING_PARSE_RETRIES = int(os.getenv("SCORING_PARSE_RETRIES", "1"))
+# 評分模式：inline = 上傳時直接評分；queue = 寫入 ScoringJob，由 run_scoring_workers 處理
+SCORING_MODE = os.getenv("SCORING_MODE", "inline")
+# 每個 worker 一次領取的工作數
+SCORING_CLAIM_SIZE = int(os.getenv("SCORING_CLAIM_SIZE", "32"))
+# worker 心跳間隔 / 超過此秒數未心跳的領取視為失效並退回佇列
+SCORING_HEARTBEAT_SECONDS = float(os.getenv("SCORING_HEARTBEAT_SECONDS", "30"))
+SCORING_STALE_SECONDS = float(os.getenv("SCORING_STALE_SECONDS", "300"))
+# 單一工作最多嘗試次數，之後標記為 failed
+SCORING_MAX_ATTEMPTS = int(os.getenv("SCORING_MAX_ATTEMPTS", "3"))
+# 相同 (exp_id, question_id) 的並行 /evaluate 請求等待進行中評分的最長秒數
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+
+# 模型價格 (USD / 1M tokens)，用於估算每筆評分與每個實驗的成本
+OPENAI_MODEL_PRICING = {
+    "gpt-4.1-nano": {"prompt": 0.10, "completion": 0.40},
+    "gpt-4.1-mini": {"prompt": 0.40, "completion": 1.60},
+    "gpt-4.1": {"prompt": 2.00, "completion": 8.00},
+}
+
+# 評分模型路由 (見 app/routing.py)：rules 依序比對，第一條符合的規則決定模型與 max_tokens，
+# 都不符合時使用 default。可在 admin 的 Experiment policy 為個別實驗覆寫
+SCORING_ROUTING = {
+    "default": {"model": "gpt-4.1-nano", "max_tokens": 400},
+    "rules": [
+        {"min_difficulty": 5, "model": "gpt-4.1", "max_tokens": 600},
+        {"min_difficulty": 4, "model": "gpt-4.1-mini", "max_tokens": 500},
+        {"min_source_tokens": 1000, "model": "gpt-4.1-mini", "max_tokens": 500},
+    ],
+}
+
+# 參考資料 token 預算：只保留與題目最相關的段落 (0 = 不裁切)
+SOURCE_TOKEN_BUDGET = int(os.getenv("SOURCE_TOKEN_BUDGET", "1500"))
+# 參考資料切段大小 (0 = 不切段，每份文件為一段)
+SOURCE_CHUNK_TOKENS = int(os.getenv("SOURCE_CHUNK_TOKENS", "200"))
+
 # Installed applications
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -60,11 +117,98 @@ MIDDLEWARE = [
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Database configuration
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / "db.sqlite3",
+# 資料庫：預設 SQLite；設 DB_ENGINE=postgres 改用 PostgreSQL (需安裝 psycopg)
+if os.getenv("DB_ENGINE", "sqlite") == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("POSTGRES_DB", "benchmark"),
+            'USER': os.getenv("POSTGRES_USER", "benchmark"),
+            'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+            'HOST': os.getenv("POSTGRES_HOST", "127.0.0.1"),
+            'PORT': os.getenv("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "600")),
+            'CONN_HEALTH_CHECKS': True,  # 長連線在使用前先檢查，避免重用已被伺服器關閉的連線
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "600")),  # 重複使用連線，避免每個請求重新連線與套用 PRAGMA
+            'OPTIONS': {
+                'timeout': 20,
+                # 寫入交易一開始就取得寫鎖，避免 WAL 下讀鎖升級寫鎖時直接回傳 "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# 串流讀取上傳 CSV / JSON 時每塊的列數
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "1000"))
+# NDJSON 串流匯入時，已讀取但尚未寫入的行數上限 (超過即停止讀取請求，形成背壓)
+NDJSON_MAX_PENDING_LINES = int(os.getenv("NDJSON_MAX_PENDING_LINES", "2000"))
+
+# 重複上傳 (內容 SHA-256 相同) 的處理方式：link (連結原紀錄、不重新匯入 / 評分)、reject (拒絕)、off
+UPLOAD_DEDUP_MODE = os.getenv("UPLOAD_DEDUP_MODE", "link")
+
+# 唯讀 replica：列表 / 匯出等讀取流量改走 replica (見 app/db_routers.py)
+# SQLite 以 DB_REPLICA_PATH 指定第二個檔案；PostgreSQL 以 POSTGRES_REPLICA_HOST 指定
+DB_REPLICA_ALIAS = "replica"
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and os.getenv("POSTGRES_REPLICA_HOST"):
+    DATABASES[DB_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.getenv("POSTGRES_REPLICA_HOST"),
+        'PORT': os.getenv("POSTGRES_REPLICA_PORT", DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and os.getenv("DB_REPLICA_PATH"):
+    DATABASES[DB_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.getenv("DB_REPLICA_PATH"),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ["app.db_routers.ReplicaRouter"]
+
+# 批次寫入後多少秒內，該實驗的讀取仍走 primary (read-your-writes)；0 表示停用。視窗記在快取中，須共用快取 (CACHE_BACKEND=file)
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "0"))
+
+# 快取：預設 locmem (單一程序)；多程序部署可設 CACHE_BACKEND=file 共用磁碟快取
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+if CACHE_BACKEND == "file":
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        }
+    }
+
+# 評估結果回應快取秒數 (寫入時以版本號失效，見 app/cache.py)；0 表示停用
+# 版本號須由所有程序共用，因此只在共用快取 (CACHE_BACKEND=file) 時預設啟用
+EVALUATION_CACHE_TIMEOUT = int(os.getenv("EVALUATION_CACHE_TIMEOUT", "3600" if CACHE_BACKEND == "file" else "0"))
+
+# 大量寫入時每批 bulk_create 的筆數 (PostgreSQL 改走 COPY，不受此限制)
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+# Admin 列表在此筆數以下精確計數；超過時改用估計值 (未篩選) 或以此為上限 (已篩選)
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", "10000"))
+
+# SQLite 連線 profile：每個新連線都會套用 (見 app/db.py)；設 SQLITE_PROFILE=off 可停用
+SQLITE_PRAGMAS = {} if os.getenv("SQLITE_PROFILE", "production") == "off" else {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "20000")),
+    'mmap_size': int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    'cache_size': -int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024))),  # 負值代表 KiB
+    'temp_store': 'MEMORY',
 }
 
 # Debug settings
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+
+from app import openai_eval
+from app.fake_llm import FakeLLMConfig, FakeLLMServer
+from app.models import Evaluation
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache; test databases are rolled back but the locmem cache is not."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Use a file cache shared between processes, as queue mode and response caching require."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+    }
+
+
+@pytest.fixture
+def make_evaluation():
+    """Return a factory of unsaved Evaluations of ``test_exp`` with fixed scores; keyword arguments override fields."""
+
+    def build(question_id: str, **fields) -> Evaluation:
+        return Evaluation(**{
+            "exp_id": "test_exp",
+            "question_id": question_id,
+            "test_question": "What is AI?",
+            "bot_response": "AI.",
+            "question_source": "src",
+            "standard_answer": "Artificial Intelligence",
+            "difficulty": 3,
+            "accuracy": 3,
+            "relevance": 3,
+            "logic": 3,
+            "conciseness": 3,
+            "language_quality": 3,
+            "total_score": 15,
+            **fields,
+        })
+
+    return build
+
+
+@pytest.fixture
+def fake_llm():
+    """Start a fake chat-completions server on a free port and stop it afterwards."""
+    servers = []
+
+    def start(**config) -> FakeLLMServer:
+        server = FakeLLMServer(("127.0.0.1", 0), FakeLLMConfig(**config))
+        server.start_in_thread()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_openai_client(fake_llm, settings) -> FakeLLMServer:
+    """Point the shared scoring client at a default fake server and return that server."""
+    server = fake_llm()
+    settings.OPENAI_API_KEY = "fake"
+    settings.OPENAI_BASE_URL = server.base_url
+    openai_eval.reset_client()
+    yield server
+    openai_eval.reset_client()
@@ -2,9 +2,10 @@ import json
 
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.paginator import EmptyPage
 from django.urls import reverse
 
-from app.models import Evaluation, ExamPaperQuestion, UploadedEvaluationBatch, UploadedTestPaper
+from app.models import Evaluation, ExamPaperQuestion, ExperimentPolicy, UploadedEvaluationBatch, UploadedTestPaper
 
 
 @pytest.mark.django_db
@@ -67,4 +68,151 @@ def test_exam_paper_question(client):
     assert response.status_code == 200
     assert response["Content-Type"] == "text/csv"
     assert "exam_paper_question_template.csv" in response["Content-Disposition"]
-    assert b"question,standard_answer,difficulty,source,tags" in response.content
\ No newline at end of file
+    assert b"question,standard_answer,difficulty,source,tags" in response.content
+
+@pytest.mark.django_db
+def test_uploaded_evaluation_batch_records_stage_metrics(client, fake_openai_client):
+    """Test that processing a batch stores per-stage timings and token counters on the batch record."""
+    paper = UploadedTestPaper.objects.create(name="metrics_paper", csv_file="uploads/paper.csv")
+    ExamPaperQuestion.objects.create(
+        test_paper=paper, question_id="m1", question="What is AI?", standard_answer="Artificial Intelligence"
+    )
+    json_data = json.dumps([{"question_id": "m1", "question": "What is AI?", "response": "AI.", "sources": []}])
+    json_file = SimpleUploadedFile("batch.json", json_data.encode("utf-8"), content_type="application/json")
+    batch = UploadedEvaluationBatch.objects.create(name="exp_metrics", json_file=json_file)
+
+    from django.contrib.admin.sites import AdminSite
+
+    from app.admin import UploadedEvaluationBatchAdmin
+    admin_instance = UploadedEvaluationBatchAdmin(UploadedEvaluationBatch, AdminSite())
+    admin_instance.save_model(client.request().wsgi_request, batch, None, change=False)
+
+    batch.refresh_from_db()
+    assert set(batch.metrics["stages"]) >= {"parse", "lookup", "score", "decode", "persist"}
+    assert batch.metrics["counters"]["items"] == 1
+    assert batch.metrics["counters"]["tokens_in"] > 0
+    evaluation = Evaluation.objects.get(exp_id="exp_metrics")
+    assert evaluation.model == "gpt-4.1-nano"
+    assert evaluation.prompt_tokens == batch.metrics["counters"]["tokens_in"]
+    assert evaluation.cost_usd > 0
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert 'benchmark_stage_seconds_count{stage="score"}' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_uploaded_evaluation_batch_routes_models_by_difficulty(client, fake_openai_client):
+    """Test that items are scored by the model their difficulty routes to and the route is recorded."""
+    paper = UploadedTestPaper.objects.create(name="routing_paper", csv_file="uploads/paper.csv")
+    items = []
+    for difficulty in (1, 4, 5):
+        ExamPaperQuestion.objects.create(
+            test_paper=paper, question_id=f"d{difficulty}", question="Q?", standard_answer="A", difficulty=difficulty
+        )
+        items.append({"question_id": f"d{difficulty}", "question": "Q?", "response": "A", "sources": []})
+    # 此實驗只覆寫 rules：難度 5 不升級到 gpt-4.1，其餘沿用全域 default
+    ExperimentPolicy.objects.create(
+        exp_id="exp_routing", routing={"rules": [{"min_difficulty": 4, "model": "gpt-4.1-mini", "name": "hard"}]}
+    )
+    batch = UploadedEvaluationBatch(
+        name="exp_routing", json_file=SimpleUploadedFile("batch.json", json.dumps(items).encode())
+    )
+
+    from django.contrib.admin.sites import AdminSite
+
+    from app.admin import UploadedEvaluationBatchAdmin
+    UploadedEvaluationBatchAdmin(UploadedEvaluationBatch, AdminSite()).save_model(
+        client.request().wsgi_request, batch, None, change=False
+    )
+
+    routed = {
+        evaluation.question_id: (evaluation.difficulty, evaluation.model, evaluation.routing_reason)
+        for evaluation in Evaluation.objects.filter(exp_id="exp_routing")
+    }
+    assert routed == {
+        "d1": (1, "gpt-4.1-nano", "default"),
+        "d4": (4, "gpt-4.1-mini", "hard"),
+        "d5": (5, "gpt-4.1-mini", "hard"),
+    }
+    assert fake_openai_client.state.stats.models == {"gpt-4.1-nano": 1, "gpt-4.1-mini": 2}
+
+    routes = client.get("/api/project/exp_routing/usage").json()["routes"]
+    assert [(route["model"], route["routing_reason"], route["evaluations"]) for route in routes] == [
+        ("gpt-4.1-mini", "hard", 2), ("gpt-4.1-nano", "default", 1),
+    ]
+
+
+@pytest.mark.django_db
+def test_evaluation_changelist_estimates_count_and_defers_text(
+    admin_client, settings, monkeypatch, django_assert_max_num_queries
+):
+    """Test the changelist with an estimated count, a source_label filter and deferred text columns."""
+    from app.admin import EvaluationAdmin
+    from app.bulk import bulk_load
+    from app.pagination import EstimatedCountPaginator, MoreThan
+
+    long_source = "來源" * 100
+    bulk_load(Evaluation, [
+        Evaluation(
+            exp_id="exp_big", question_id=f"b{i}", test_question=f"Question {i}", bot_response="x" * 5000,
+            question_source=long_source if i % 2 else "short", standard_answer="A", difficulty=3,
+            accuracy=3, relevance=3, logic=3, conciseness=3, language_quality=3, total_score=15,
+        )
+        for i in range(30)
+    ])
+    Evaluation.objects.filter(question_id="b0").delete()
+    settings.ADMIN_EXACT_COUNT_LIMIT = 12
+    monkeypatch.setattr(EvaluationAdmin, "list_per_page", 10)
+
+    queryset = Evaluation.objects.order_by("-pk")
+    paginator = EstimatedCountPaginator(queryset, 10)
+    assert paginator.count == 30  # MAX(rowid) 估計值，不做 COUNT(*)
+    assert str(paginator.count) == "about 30"
+    assert [e.question_id for e in paginator.page(3).object_list] == [f"b{i}" for i in range(9, 0, -1)]
+    # 不滿的一頁為最後一頁：刪除造成的高估在此修正
+    assert (paginator.count, paginator.num_pages) == (29, 3)
+
+    # 篩選後超過上限只報「more than 上限」，但上限之後的頁仍可取得 (15 筆，每頁 2 筆)
+    filtered = EstimatedCountPaginator(queryset.filter(source_label=long_source[:64]), 2)
+    assert isinstance(filtered.count, MoreThan)
+    assert str(filtered.count) == "more than 12"
+    assert filtered.page(7).has_next()
+    last = filtered.page(8)
+    assert [e.question_id for e in last.object_list] == ["b1"]
+    assert not last.has_next()
+    assert filtered.count == 15
+    with pytest.raises(EmptyPage):
+        filtered.page(9)
+
+    url = reverse("admin:app_evaluation_changelist")
+    with django_assert_max_num_queries(12):
+        response = admin_client.get(url, {"source_label": long_source[:64], "p": 2})
+    assert response.status_code == 200
+    assert b"more than 12" in response.content
+    results = response.context["cl"].result_list
+    assert len(results) == 5
+    assert all("bot_response" in e.get_deferred_fields() for e in results)
+    assert results[0].question_preview.startswith("Question")
+
+
+@pytest.mark.django_db
+def test_exam_paper_question_inline_is_paginated(admin_client):
+    """Test that a large paper's change page builds forms for one page of questions only."""
+    paper = UploadedTestPaper.objects.create(name="large_paper", csv_file="uploads/paper.csv")
+    ExamPaperQuestion.objects.bulk_create(
+        ExamPaperQuestion(test_paper=paper, question_id=f"L{i}", question=f"Q{i}", standard_answer="A")
+        for i in range(120)
+    )
+
+    url = reverse("admin:app_uploadedtestpaper_change", args=[paper.pk])
+    response = admin_client.get(url, {"questions_page": 3})
+    assert response.status_code == 200
+    formset = response.context["inline_admin_formsets"][0].formset
+    assert len(formset.forms) == 20
+    assert formset.page.number == 3
+    assert f"test_paper__id__exact={paper.pk}" in response.content.decode()
+
+    response = admin_client.get(reverse("admin:app_exampaperquestion_changelist"), {"test_paper__id__exact": paper.pk})
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 120
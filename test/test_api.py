@@ -1,9 +1,11 @@
 import json
+
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
-from app.models import Evaluation, StandardAnswer
 from django.test import Client
 
+from app.models import Evaluation, StandardAnswer
+
 
 @pytest.fixture
 def client():
@@ -161,4 +163,308 @@ def test_upload_json(client) -> None:
         format="multipart",
     )
     assert response.status_code == 200
-    assert Evaluation.objects.filter(exp_id="upload001", question_id="up001").exists()
\ No newline at end of file
+    assert Evaluation.objects.filter(exp_id="upload001", question_id="up001").exists()
+
+@pytest.mark.django_db
+def test_get_project_usage(client) -> None:
+    """
+    Test the per-experiment token, latency and cost rollup.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    """
+    for question_id, prompt_tokens in (("u1", 1000), ("u2", 3000)):
+        Evaluation.objects.create(
+            exp_id="proj_usage",
+            question_id=question_id,
+            test_question="Test?",
+            bot_response="Answer.",
+            question_source="src",
+            standard_answer="Answer",
+            difficulty=1,
+            accuracy=3,
+            relevance=3,
+            logic=3,
+            conciseness=3,
+            language_quality=3,
+            total_score=15,
+            model="gpt-4.1-nano",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=100,
+            latency_ms=200,
+            cost_usd="0.000140",
+        )
+
+    response = client.get("/api/project/proj_usage/usage")
+    assert response.status_code == 200
+    usage = response.json()
+    assert usage["evaluations"] == 2
+    assert usage["prompt_tokens"] == 4000
+    assert usage["completion_tokens"] == 200
+    assert usage["cost_usd"] == pytest.approx(0.00028)
+    assert usage["top_prompt_questions"][0]["question_id"] == "u2"
+
+    response = client.get("/api/usage")
+    assert [row["exp_id"] for row in response.json()] == ["proj_usage"]
+
+
+@pytest.mark.django_db
+def test_batch_evaluate_stream(client) -> None:
+    """
+    Test that the streaming batch API emits one event per item and a final summary.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    """
+    StandardAnswer.objects.create(source="source1", content="Artificial Intelligence")
+    batch_data = [
+        {"exp_id": "proj_stream", "question_id": "s1", "test_question": "What is AI?",
+         "question_source": "source1", "bot_response": "Artificial Intelligence"},
+        {"exp_id": "proj_stream", "question_id": "s2", "test_question": "What is AI?",
+         "question_source": "missing", "bot_response": "No idea"},
+    ]
+
+    response = client.post("/api/evaluate/batch/stream", data=json.dumps(batch_data), content_type="application/json")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert [event["event"] for event in events] == ["result", "error", "summary"]
+    assert events[0]["data"]["question_id"] == "s1"
+    assert events[2]["data"]["scored"] == events[2]["data"]["failed"] == 1
+    assert Evaluation.objects.filter(exp_id="proj_stream").count() == 1
+
+    batch_data[0]["question_id"] = "s3"
+    response = client.post(
+        "/api/evaluate/batch/stream", data=json.dumps(batch_data[:1]), content_type="application/json",
+        HTTP_ACCEPT="text/event-stream",
+    )
+    body = b"".join(response.streaming_content).decode()
+    assert response["Content-Type"] == "text/event-stream"
+    assert body.startswith("event: result\ndata: {")
+    assert "event: summary\n" in body
+
+
+@pytest.mark.django_db
+def test_evaluate_stream_ingests_ndjson(client, settings) -> None:
+    """
+    Test that NDJSON lines are scored in batches and acknowledged, with bad lines rejected.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    settings : Any
+        The pytest-django settings fixture.
+    """
+    settings.BULK_BATCH_SIZE = 2
+    settings.NDJSON_MAX_PENDING_LINES = 2
+    StandardAnswer.objects.create(source="source1", content="Artificial Intelligence")
+    line = {"exp_id": "proj_ndjson", "test_question": "What is AI?", "question_source": "source1",
+            "bot_response": "Artificial Intelligence"}
+    body = "\n".join(
+        [json.dumps({**line, "question_id": f"n{i}"}) for i in range(5)]
+        + ["{not json", json.dumps({**line, "question_source": "missing"}), "", json.dumps({"exp_id": "x"})]
+    )
+
+    response = client.post("/api/evaluate/stream", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    events = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    acks = [event["data"] for event in events if event["event"] == "ack"]
+    assert all(len(ack["accepted"]) + len(ack["rejected"]) <= 2 for ack in acks)
+    assert sorted(result["question_id"] for ack in acks for result in ack["accepted"]) == [f"n{i}" for i in range(5)]
+    assert sorted(error["line"] for ack in acks for error in ack["rejected"]) == [6, 7, 9]
+    assert events[-1] == {"event": "summary", "data": {**events[-1]["data"], "lines": 8, "accepted": 5, "rejected": 3}}
+    assert Evaluation.objects.filter(exp_id="proj_ndjson").count() == 5
+
+
+@pytest.mark.django_db
+def test_evaluate_stream_reads_chunked_body(client) -> None:
+    """
+    Test that a chunked body without a Content-Length is read from the terminated WSGI input.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    """
+    StandardAnswer.objects.create(source="source1", content="Artificial Intelligence")
+    body = "\n".join(
+        json.dumps({"exp_id": "proj_chunked", "question_id": f"c{i}", "test_question": "What is AI?",
+                    "question_source": "source1", "bot_response": "Artificial Intelligence"})
+        for i in range(3)
+    )
+
+    response = client.post(
+        "/api/evaluate/stream", data=body, content_type="application/x-ndjson",
+        CONTENT_LENGTH="", HTTP_TRANSFER_ENCODING="chunked", **{"wsgi.input_terminated": True},
+    )
+    events = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    assert events[-1]["data"]["lines"] == 3
+    assert events[-1]["data"]["accepted"] == 3
+    assert Evaluation.objects.filter(exp_id="proj_chunked").count() == 3
+
+
+@pytest.mark.django_db
+def test_evaluate_stream_replays_and_rejects_conflicts(client) -> None:
+    """
+    Test that stream lines are idempotent like /evaluate and never overwrite a stored evaluation.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    """
+    StandardAnswer.objects.create(source="source1", content="Artificial Intelligence")
+    line = {"exp_id": "proj_replay", "test_question": "What is AI?", "question_source": "source1",
+            "bot_response": "Artificial Intelligence"}
+    first = client.post("/api/evaluate", data={**line, "question_id": "r1"}, content_type="application/json")
+    body = "\n".join([
+        json.dumps({**line, "question_id": "r1"}),
+        json.dumps({**line, "question_id": "r1", "bot_response": "Something else"}),
+        json.dumps(line),
+        json.dumps(line),
+    ])
+
+    def post() -> tuple[list[dict], list[dict]]:
+        response = client.post(
+            "/api/evaluate/stream", data=body, content_type="application/x-ndjson", HTTP_IDEMPOTENCY_KEY="k1"
+        )
+        acks = [json.loads(line)["data"] for line in b"".join(response.streaming_content).splitlines()][:-1]
+        accepted = [result for ack in acks for result in ack["accepted"]]
+        return accepted, [error for ack in acks for error in ack["rejected"]]
+
+    accepted, rejected = post()
+    assert accepted[0] == {"line": 1, "question_id": "r1", "total_score": first.json()["total_score"]}
+    assert [error["line"] for error in rejected] == [2]
+    assert "already exists with a different request" in rejected[0]["error"]
+    # 無 question_id 的行以 Idempotency-Key 與行號推得題號，重送時得到同一題號且不重複寫入
+    assert accepted[1]["question_id"] != accepted[2]["question_id"]
+    assert post() == (accepted, rejected)
+    assert Evaluation.objects.get(exp_id="proj_replay", question_id="r1").bot_response == "Artificial Intelligence"
+    assert Evaluation.objects.filter(exp_id="proj_replay").count() == 3
+
+
+@pytest.mark.django_db
+def test_read_endpoints_render_values_rows(client, monkeypatch) -> None:
+    """
+    Test that the .values() fast path returns every EvaluationResponse field with or without orjson.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    monkeypatch : Any
+        The pytest monkeypatch fixture.
+    """
+    from decimal import Decimal
+
+    from app import renderers
+    from app.api import EvaluationResponse
+
+    Evaluation.objects.create(
+        exp_id="proj_fast", question_id="f1", test_question="什麼是 AI?", bot_response="人工智慧",
+        question_source="src", standard_answer="AI", difficulty=3, accuracy=5, relevance=4, logic=4,
+        conciseness=4, language_quality=4, total_score=21, model="gpt-4.1-nano", prompt_tokens=10,
+    )
+    expected = [EvaluationResponse(**Evaluation.objects.get(question_id="f1").__dict__).model_dump()]
+
+    assert client.get("/api/project/proj_fast/evaluations").json() == expected
+    assert client.get("/api/search", {"q": "人工智慧"}).json() == expected
+    monkeypatch.setattr(renderers, "orjson", None)
+    response = client.get("/api/evaluation/f1")
+    assert response.json() == expected[0]
+    assert renderers.FastJSONRenderer().render(None, {"cost": Decimal("0.5")}, response_status=200) == '{"cost": "0.5"}'
+
+
+@pytest.mark.django_db
+def test_evaluate_retries_are_idempotent(client, monkeypatch) -> None:
+    """
+    Test that retried evaluations return the stored result without rescoring.
+
+    Parameters
+    ----------
+    client : Any
+        The Django test client.
+    monkeypatch : pytest.MonkeyPatch
+        Counts the scoring calls.
+    """
+    from app import api
+
+    calls = []
+    score = api.evaluate_response
+    monkeypatch.setattr(api, "evaluate_response", lambda *args: calls.append(args) or score(*args))
+    StandardAnswer.objects.create(source="source1", content="Artificial Intelligence")
+    payload = {
+        "exp_id": "proj_retry",
+        "question_id": "q1",
+        "test_question": "What is AI?",
+        "question_source": "source1",
+        "bot_response": "Artificial Intelligence.",
+    }
+
+    first = client.post("/api/evaluate", data=json.dumps(payload), content_type="application/json")
+    retry = client.post("/api/evaluate", data=json.dumps(payload), content_type="application/json")
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert len(calls) == 1
+
+    changed = {**payload, "bot_response": "Something else."}
+    response = client.post("/api/evaluate", data=json.dumps(changed), content_type="application/json")
+    assert response.status_code == 409
+
+    # 未帶 question_id 時以 Idempotency-Key 識別
+    keyed = [{**payload, "question_id": None, "test_question": f"Q{i}"} for i in range(2)]
+    responses = [
+        client.post("/api/evaluate/batch", data=json.dumps(keyed), content_type="application/json",
+                    headers={"Idempotency-Key": "retry-1"})
+        for _ in range(2)
+    ]
+    assert responses[0].json() == responses[1].json()
+    assert len({item["question_id"] for item in responses[0].json()}) == 2
+    assert all(len(item["question_id"]) == 32 for item in responses[0].json())
+    assert Evaluation.objects.filter(exp_id="proj_retry").count() == 3
+    assert len(calls) == 3
+
+
+def test_coalesce_shares_one_call_between_concurrent_requests(monkeypatch) -> None:
+    """
+    Test that concurrent calls with the same key run the computation once.
+
+    Parameters
+    ----------
+    monkeypatch : pytest.MonkeyPatch
+        Signals when the second call starts waiting.
+    """
+    import threading
+
+    from app import idempotency
+    from app.idempotency import coalesce
+
+    started, waiting, release = threading.Event(), threading.Event(), threading.Event()
+    monkeypatch.setattr(idempotency.metrics, "incr", lambda name, *args: waiting.set())
+    calls = []
+
+    def compute() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(coalesce("key", compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(coalesce("key", compute)))
+    follower.start()
+    assert waiting.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert results == [42, 42]
+    assert len(calls) == 1
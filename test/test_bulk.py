@@ -0,0 +1,68 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from app import metrics
+from app.bulk import bulk_load, bulk_upsert
+from app.models import Evaluation, ExamPaperQuestion, UploadedTestPaper
+
+
+@pytest.mark.django_db
+def test_bulk_load_inserts_in_batches(make_evaluation):
+    """Test that bulk_load consumes a generator in batches and counts the written rows."""
+    with metrics.collect() as batch_metrics:
+        count = bulk_load(Evaluation, (make_evaluation(f"b{i}") for i in range(25)), batch_size=10)
+
+    assert count == 25
+    assert Evaluation.objects.filter(exp_id="test_exp").count() == 25
+    assert batch_metrics.counters["rows_written"] == 25
+    assert Evaluation.objects.get(question_id="b0").created_at is not None
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_updates_existing_rows(make_evaluation):
+    """Test that bulk_upsert overwrites rows colliding on (exp_id, question_id) and inserts the rest."""
+    make_evaluation("u1", total_score=5).save()
+
+    bulk_upsert(
+        Evaluation,
+        [make_evaluation("u1", total_score=20), make_evaluation("u2", total_score=10)],
+        unique_fields=["exp_id", "question_id"],
+        update_fields=["total_score"],
+    )
+
+    assert dict(Evaluation.objects.values_list("question_id", "total_score")) == {"u1": 20, "u2": 10}
+
+
+@pytest.mark.django_db
+def test_import_evaluations_round_trips_export_csv(client, tmp_path, make_evaluation):
+    """Test that import_evaluations reloads a project exported by export_csv, with and without --upsert."""
+    bulk_load(Evaluation, [make_evaluation(f"r{i}", exp_id="export_exp") for i in range(3)])
+    response = client.get("/api/project/export_exp/export_csv")
+    path = tmp_path / "export.csv"
+    path.write_bytes(b"".join(response.streaming_content))
+
+    Evaluation.objects.all().delete()
+    call_command("import_evaluations", str(path))
+    assert Evaluation.objects.filter(exp_id="export_exp").count() == 3
+
+    Evaluation.objects.filter(question_id="r0").update(total_score=0)
+    call_command("import_evaluations", str(path), "--upsert")
+    assert Evaluation.objects.get(question_id="r0").total_score == 15
+    assert Evaluation.objects.count() == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="COPY FROM STDIN requires PostgreSQL")
+def test_bulk_load_uses_copy_on_postgres():
+    """Test the COPY path, including foreign keys and auto_now_add columns."""
+    paper = UploadedTestPaper.objects.create(name="copy_paper", csv_file="uploads/paper.csv")
+    questions = [
+        ExamPaperQuestion(test_paper=paper, question_id=f"c{i}", question="題目\t含\\特殊字元\n", standard_answer="答案")
+        for i in range(1000)
+    ]
+
+    assert bulk_load(ExamPaperQuestion, questions) == 1000
+    assert paper.questions.count() == 1000
+    assert paper.questions.get(question_id="c0").question == "題目\t含\\特殊字元\n"
+    assert paper.uploaded_at is not None
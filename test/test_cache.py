@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from app.bulk import bulk_load
+from app.models import Evaluation
+
+
+@pytest.fixture
+def response_cache(shared_cache, settings):
+    """Enable response caching on a shared cache."""
+    settings.EVALUATION_CACHE_TIMEOUT = 60
+
+
+@pytest.mark.django_db
+def test_project_evaluations_are_cached_with_etag(
+    client, django_assert_num_queries, response_cache, make_evaluation
+):
+    """Test that repeated reads hit the cache and If-None-Match gets a 304, both without any query."""
+    make_evaluation("c1").save()
+
+    first = client.get("/api/project/test_exp/evaluations")
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    with django_assert_num_queries(0):
+        second = client.get("/api/project/test_exp/evaluations")
+        not_modified = client.get("/api/project/test_exp/evaluations", HTTP_IF_NONE_MATCH=etag)
+
+    assert second.json() == first.json()
+    assert second["ETag"] == etag
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_cached_responses(client, response_cache, make_evaluation):
+    """Test that ORM saves (signals) and bulk uploads both change the ETag and the cached content."""
+    make_evaluation("c1").save()
+    etag = client.get("/api/project/test_exp/evaluations")["ETag"]
+
+    make_evaluation("c2").save()
+    response = client.get("/api/project/test_exp/evaluations", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    data = [{"question_id": "c3", "question": "Q?", "response": "A.", "sources": [{"title": "t", "content": "A."}]}]
+    client.post(
+        "/api/upload_json?project_id=test_exp",
+        data={"file": SimpleUploadedFile("data.json", json.dumps(data).encode(), content_type="application/json")},
+    )
+    assert len(client.get("/api/project/test_exp/evaluations").json()) == 3
+
+
+@pytest.mark.django_db
+def test_single_evaluation_is_cached_and_export_is_streamed(
+    client, django_assert_num_queries, response_cache, make_evaluation
+):
+    """Test caching of the per-question endpoint; the CSV export is streamed and not cached."""
+    bulk_load(Evaluation, [make_evaluation("e1", exp_id="cache_export")])
+
+    single = client.get("/api/evaluation/e1")
+    with django_assert_num_queries(0):
+        cached_single = client.get("/api/evaluation/e1")
+    assert cached_single.json() == single.json()
+
+    export = client.get("/api/project/cache_export/export_csv")
+    assert export.streaming
+    assert export["Content-Disposition"] == 'attachment; filename="project_cache_export_evaluations.csv"'
+    header, row = b"".join(export.streaming_content).decode().splitlines()
+    assert header.startswith("question_id,exp_id,")
+    assert row.startswith("e1,cache_export,")
+    assert client.get("/api/project/missing/export_csv").status_code == 404
+
+
+@pytest.mark.django_db
+def test_response_cache_requires_shared_cache(client, settings, make_evaluation):
+    """Test that caching is off by default on locmem and refused when enabled on it."""
+    from django.core.exceptions import ImproperlyConfigured
+
+    make_evaluation("c1").save()
+    assert "ETag" not in client.get("/api/project/test_exp/evaluations")
+
+    settings.EVALUATION_CACHE_TIMEOUT = 60
+    with pytest.raises(ImproperlyConfigured):
+        client.get("/api/project/test_exp/evaluations")
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from app.context_budget import count_tokens, select_context, split_chunks
+
+SOURCES = [
+    {"title": "geo.pdf", "content": "法國的首都是巴黎。\n巴黎位於塞納河畔。"},
+    {"title": "food.pdf", "content": "台灣的小吃以夜市聞名。\n珍珠奶茶源自台中。"},
+    {"title": "ai.pdf", "content": "Artificial intelligence is the simulation of human intelligence."},
+]
+
+
+def test_select_context_keeps_most_relevant_chunk() -> None:
+    """Only the chunk matching the question should survive a tight budget."""
+    context = select_context(SOURCES, "法國的首都是哪裡?", "巴黎", budget=25)
+
+    assert "巴黎" in context
+    assert "夜市" not in context
+    assert count_tokens(context) <= 25
+
+
+def test_select_context_without_budget_keeps_everything() -> None:
+    """A budget of 0 disables truncation but still flattens the sources to text."""
+    context = select_context(SOURCES, "法國的首都是哪裡?", "巴黎", budget=0)
+
+    assert "夜市" in context
+    assert "[ai.pdf]" in context
+
+
+def test_select_context_shrinks_uploaded_sources() -> None:
+    """Multi-KB upload sources are cut down to the configured budget."""
+    item = json.loads(Path(__file__).with_name("response.json").read_text(encoding="utf-8"))[0]
+    full = count_tokens("\n\n".join(split_chunks(item["sources"], 200)))
+
+    context = select_context(item["sources"], item["question"], item["response"], budget=300)
+
+    assert full > 300
+    assert 0 < count_tokens(context) <= 300
+
+
+def test_split_chunks_without_chunk_size_keeps_whole_documents() -> None:
+    """A chunk size of 0 disables splitting: each document becomes one chunk."""
+    chunks = split_chunks(SOURCES, 0)
+
+    assert chunks == [
+        "[geo.pdf] 法國的首都是巴黎。 巴黎位於塞納河畔。",
+        "[food.pdf] 台灣的小吃以夜市聞名。 珍珠奶茶源自台中。",
+        "[ai.pdf] Artificial intelligence is the simulation of human intelligence.",
+    ]
@@ -0,0 +1,61 @@
+from io import BytesIO
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from app.admin import UploadedTestPaperAdmin
+from app.csv_ingest import CSVFormatError, coerce_difficulty, iter_chunks, iter_question_chunks
+from app.models import Evaluation, ExamPaperQuestion, UploadedTestPaper
+
+HEADER = "question,standard_answer,difficulty,source,tags\n"
+
+
+def test_iter_chunks_streams_fixed_size_blocks():
+    """Test that rows come back in blocks of the requested size with their line numbers."""
+    content = HEADER + "".join(f"Q{i},A{i},3,src,tag\n" for i in range(5))
+    chunks = list(iter_chunks(BytesIO(content.encode()), chunk_rows=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[0][0] == (2, {"question": "Q0", "standard_answer": "A0", "difficulty": "3", "source": "src", "tags": "tag"})
+
+
+def test_question_rows_are_validated_and_coerced():
+    """Test difficulty coercion, optional columns, BOM handling and rejected rows."""
+    content = "﻿question,standard_answer,difficulty\n Q1 ,A1,\nQ2,A2,4.0\nQ3,,2\nQ4,A4,hard\n"
+    errors = []
+    rows = [row for chunk in iter_question_chunks(BytesIO(content.encode()), errors) for row in chunk]
+
+    assert rows == [
+        {"question": "Q1", "standard_answer": "A1", "source": "", "tags": "", "difficulty": 3},
+        {"question": "Q2", "standard_answer": "A2", "source": "", "tags": "", "difficulty": 4},
+    ]
+    assert [error.line for error in errors] == [4, 5]
+    assert coerce_difficulty(" 5 ") == 5
+    with pytest.raises(ValueError, match="whole number"):
+        coerce_difficulty("2.5")
+
+
+def test_missing_required_column_is_rejected():
+    """Test that a CSV without the required header columns is refused up front."""
+    with pytest.raises(CSVFormatError, match="standard_answer"):
+        list(iter_question_chunks(BytesIO(b"question\nQ1\n"), []))
+
+
+@pytest.mark.django_db
+def test_test_paper_upload_ingests_in_chunks(rf, settings):
+    """Test that the admin imports valid rows across several blocks and reports skipped ones."""
+    settings.CSV_CHUNK_ROWS = 2
+    content = HEADER + "".join(f"Q{i},A{i},,src,tag\n" for i in range(5)) + "bad,,3,src,tag\n"
+    csv_file = SimpleUploadedFile("chunked.csv", content.encode(), content_type="text/csv")
+    paper = UploadedTestPaper.objects.create(name="chunked_paper", csv_file=csv_file)
+
+    request = rf.post("/")
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    UploadedTestPaperAdmin(UploadedTestPaper, AdminSite()).save_model(request, paper, None, change=False)
+
+    assert ExamPaperQuestion.objects.filter(test_paper=paper, difficulty=3).count() == 5
+    assert Evaluation.objects.filter(exp_id="chunked_paper", total_score=0).count() == 5
+    assert [str(message) for message in request._messages][0] == "Skipping line 7: empty standard_answer"
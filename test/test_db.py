@@ -0,0 +1,15 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_sqlite_profile_applied_on_connection() -> None:
+    """New SQLite connections get the configured PRAGMAs."""
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1  # NORMAL
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS["busy_timeout"]
+        cursor.execute("PRAGMA cache_size")
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS["cache_size"]
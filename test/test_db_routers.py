@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import db_routers
+from app.db_routers import ReplicaRouter, mark_written, use_replica
+from app.models import Evaluation
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Pretend a replica alias is configured."""
+    monkeypatch.setattr(db_routers, "replica_alias", lambda: "replica")
+
+
+def test_router_reads_from_replica_only_inside_use_replica(replica):
+    """Test that reads go to the replica inside use_replica and writes always go to the primary."""
+    router = ReplicaRouter()
+    assert router.db_for_read(Evaluation) == "default"
+    with use_replica():
+        assert router.db_for_read(Evaluation) == "replica"
+        assert router.db_for_write(Evaluation) == "default"
+    assert router.db_for_read(Evaluation) == "default"
+
+
+def test_router_without_replica_stays_on_primary():
+    """Test that use_replica is a no-op when no replica database is configured."""
+    with use_replica():
+        assert ReplicaRouter().db_for_read(Evaluation) == "default"
+
+
+def test_read_your_writes_window_keeps_experiment_on_primary(replica, settings, shared_cache):
+    """Test that an experiment written recently is read from the primary until its window expires."""
+    settings.READ_YOUR_WRITES_SECONDS = 60
+    mark_written("ryw_exp")
+
+    router = ReplicaRouter()
+    with use_replica("ryw_exp"):
+        assert router.db_for_read(Evaluation) == "default"
+    with use_replica("other_exp"):
+        assert router.db_for_read(Evaluation) == "replica"
+
+
+def test_read_your_writes_requires_shared_cache(replica, settings):
+    """Test that the windows are refused on a per-process cache, where other workers would not see them."""
+    from django.core.exceptions import ImproperlyConfigured
+
+    settings.READ_YOUR_WRITES_SECONDS = 60
+    with pytest.raises(ImproperlyConfigured):
+        mark_written("ryw_exp")
+
+
+SCRIPT = """
+import json, django
+from django.core.management import call_command
+django.setup()
+from app.db_routers import mark_written, use_replica
+from app.models import Evaluation
+
+call_command("migrate", verbosity=0)
+call_command("migrate", database="replica", verbosity=0)
+Evaluation.objects.create(
+    exp_id="exp", question_id="q1", test_question="Q", bot_response="A", question_source="s",
+    standard_answer="A", difficulty=3, accuracy=3, relevance=3, logic=3, conciseness=3,
+    language_quality=3, total_score=15,
+)
+counts = {"primary": Evaluation.objects.count()}
+with use_replica("exp"):
+    counts["replica"] = Evaluation.objects.count()
+mark_written("exp")
+with use_replica("exp"):
+    counts["read_your_writes"] = Evaluation.objects.count()
+print(json.dumps(counts))
+"""
+
+
+def test_two_sqlite_files(tmp_path: Path):
+    """Test routing end to end with a primary and an (unsynchronized) replica SQLite file."""
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "config.settings",
+        "SQLITE_PATH": str(tmp_path / "primary.sqlite3"),
+        "DB_REPLICA_PATH": str(tmp_path / "replica.sqlite3"),
+        "READ_YOUR_WRITES_SECONDS": "60",
+        "CACHE_BACKEND": "file",
+        "CACHE_LOCATION": str(tmp_path / "cache"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    # replica 檔案未同步，讀不到剛寫入 primary 的資料；read-your-writes 視窗內改讀 primary
+    assert json.loads(result.stdout.splitlines()[-1]) == {"primary": 1, "replica": 0, "read_your_writes": 1}
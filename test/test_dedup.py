@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from app.admin import UploadedEvaluationBatchAdmin, UploadedTestPaperAdmin
+from app.models import Evaluation, ExamPaperQuestion, UploadedEvaluationBatch, UploadedTestPaper
+
+PAPER_CSV = b"question,standard_answer,difficulty,source,tags\nWhat is AI?,Artificial Intelligence,3,Mock,AI\n"
+
+
+def upload_paper(client, name: str) -> UploadedTestPaper:
+    """Save a new paper through the admin, the way the add form does (file not yet stored)."""
+    paper = UploadedTestPaper(name=name, csv_file=SimpleUploadedFile("paper.csv", PAPER_CSV))
+    UploadedTestPaperAdmin(UploadedTestPaper, AdminSite()).save_model(
+        client.request().wsgi_request, paper, None, change=False
+    )
+    return paper
+
+
+@pytest.mark.django_db
+def test_identical_paper_is_linked_instead_of_reimported(client):
+    """Test that a second identical paper points at the first and shares its file and questions."""
+    original = upload_paper(client, "paper_a")
+    duplicate = upload_paper(client, "paper_b")
+
+    assert duplicate.duplicate_of == original
+    assert duplicate.content_sha256 == original.content_sha256
+    assert duplicate.csv_file.name == original.csv_file.name
+    assert ExamPaperQuestion.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_identical_paper_is_rejected_in_reject_mode(client, settings):
+    """Test that reject mode refuses the duplicate without saving it."""
+    settings.UPLOAD_DEDUP_MODE = "reject"
+    upload_paper(client, "paper_a")
+    duplicate = upload_paper(client, "paper_b")
+
+    assert duplicate.pk is None
+    assert UploadedTestPaper.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_identical_batch_copies_evaluations_without_scoring(client, fake_openai_client):
+    """Test that a duplicate evaluation batch reuses the original scores and makes no LLM call."""
+    paper = UploadedTestPaper.objects.create(name="dedup_paper", csv_file="uploads/paper.csv")
+    ExamPaperQuestion.objects.create(
+        test_paper=paper, question_id="d1", question="What is AI?", standard_answer="Artificial Intelligence"
+    )
+    content = json.dumps([{"question_id": "d1", "question": "What is AI?", "response": "AI.", "sources": []}])
+    admin_instance = UploadedEvaluationBatchAdmin(UploadedEvaluationBatch, AdminSite())
+    batches = []
+    for name in ("exp_first", "exp_second"):
+        batch = UploadedEvaluationBatch(name=name, json_file=SimpleUploadedFile("batch.json", content.encode()))
+        admin_instance.save_model(client.request().wsgi_request, batch, None, change=False)
+        batches.append(batch)
+
+    assert fake_openai_client.state.stats.requests == 1
+    assert batches[1].duplicate_of == batches[0]
+    first, second = Evaluation.objects.get(exp_id="exp_first"), Evaluation.objects.get(exp_id="exp_second")
+    assert second.total_score == first.total_score
+    assert second.test_paper_id == str(batches[1].id)
+    assert (second.prompt_tokens, second.cost_usd) == (0, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_papers_links_duplicate_files(tmp_path, capsys):
+    """Test that import_papers links identical files to the first one it writes."""
+    for name in ("a.csv", "b.csv", "c.csv"):
+        (tmp_path / name).write_bytes(PAPER_CSV)
+
+    call_command("import_papers", str(tmp_path), "--workers", "1")
+
+    assert "Imported 1 papers (1 questions, 2 duplicates, 0 files failed)" in capsys.readouterr().out
+    assert UploadedTestPaper.objects.filter(duplicate_of__isnull=False).count() == 2
+    assert ExamPaperQuestion.objects.count() == 1
@@ -0,0 +1,45 @@
+import openai
+import pytest
+from openai import OpenAI
+
+from app import openai_eval
+from app.fake_llm import FakeLLMConfig, FakeLLMState
+
+
+def test_score_response_against_fake_llm(fake_openai_client) -> None:
+    """score_response should parse the rubric JSON served by the fake server."""
+    server = fake_openai_client
+
+    first = openai_eval.score_response("What is AI?", "AI is AI.", "Artificial Intelligence", "src")
+    second = openai_eval.score_response("What is AI?", "AI is AI.", "Artificial Intelligence", "src")
+
+    assert first.pop("latency_ms") >= 0
+    second.pop("latency_ms")
+    assert first == second
+    assert first["prompt_tokens"] > 0
+    assert "error" not in first
+    assert first["total_score"] == sum(
+        first[name] for name in ("accuracy", "relevance", "logic", "conciseness", "language_quality")
+    )
+    assert server.state.stats.completions == 2
+
+
+def test_fake_llm_rate_limit_injection(fake_llm) -> None:
+    """A 429 is surfaced to the client once retries are exhausted."""
+    server = fake_llm(rate_limit_error_rate=1.0)
+    client = OpenAI(api_key="fake", base_url=server.base_url, max_retries=1)
+
+    with pytest.raises(openai.RateLimitError):
+        client.chat.completions.create(model="gpt-4.1-nano", messages=[{"role": "user", "content": "hi"}])
+
+    assert server.state.stats.rate_limited == 2
+
+
+def test_injected_rate_limit_does_not_take_a_token() -> None:
+    """Injected 429s leave the token bucket untouched."""
+    state = FakeLLMState(FakeLLMConfig(rate_limit_error_rate=1.0, requests_per_second=0.001, burst=1))
+    assert [state.decide()[0] for _ in range(3)] == [429, 429, 429]
+
+    state.config.rate_limit_error_rate = 0.0
+    assert state.decide()[0] == 200
+    assert state.decide()[0] == 429
@@ -0,0 +1,24 @@
+import pytest
+from django.core.management import call_command
+
+from app.models import Evaluation, ExamPaperQuestion, UploadedTestPaper
+
+HEADER = "question,standard_answer,difficulty,source,tags\n"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_papers_imports_a_directory_in_parallel(tmp_path, capsys):
+    """Test that every CSV of a directory becomes a paper, with per-file counts and bad files reported."""
+    for i in range(3):
+        (tmp_path / f"paper{i}.csv").write_text(HEADER + "".join(f"Q{j},A{j},3,src,tag\n" for j in range(i + 1)))
+    (tmp_path / "broken.csv").write_text("question\nQ1\n")
+
+    call_command("import_papers", str(tmp_path), "--workers", "2", "--chunk-rows", "1")
+
+    out, err = capsys.readouterr()
+    assert UploadedTestPaper.objects.count() == 3
+    assert ExamPaperQuestion.objects.filter(test_paper__name="paper2").count() == 3
+    assert Evaluation.objects.filter(exp_id="paper1").count() == 2
+    assert "paper2.csv: rows=3 skipped=0" in out
+    assert "Imported 3 papers (6 questions, 0 duplicates, 1 files failed)" in out
+    assert "broken.csv: skipped" in err
@@ -0,0 +1,30 @@
+import json
+from io import BytesIO
+
+import pytest
+
+from app.json_ingest import iter_json_array, iter_json_chunks
+
+
+def test_iter_json_array_reads_items_across_block_boundaries():
+    """Test that items split by tiny reads (numbers, strings, nested values, BOM) decode intact."""
+    items = [12345, "人工智慧", {"question_id": "q1", "sources": [{"title": "t", "content": "a, b]"}]}, [], None, 6.5]
+    content = "﻿ [ " + " ,\n".join(json.dumps(item, ensure_ascii=False) for item in items) + " ]\n"
+
+    for read_size in (1, 3, 64):
+        assert list(iter_json_array(BytesIO(content.encode()), read_size=read_size)) == items
+
+
+def test_iter_json_chunks_streams_fixed_size_blocks():
+    """Test that items come back in blocks of the requested size and that an empty array yields nothing."""
+    content = json.dumps([{"question_id": f"q{i}"} for i in range(5)]).encode()
+
+    assert [len(chunk) for chunk in iter_json_chunks(BytesIO(content), chunk_rows=2)] == [2, 2, 1]
+    assert list(iter_json_chunks(BytesIO(b" [ ] "))) == []
+
+
+@pytest.mark.parametrize("content", [b'{"question_id": "q1"}', b'[{"question_id": "q1"} {"a": 1}]', b'[1, 2', b'[1, {"a": ]'])
+def test_iter_json_array_rejects_malformed_files(content):
+    """Test that a non-array, a missing comma, a truncated file and a broken item raise ValueError."""
+    with pytest.raises(ValueError):
+        list(iter_json_array(BytesIO(content), read_size=4))
@@ -0,0 +1,163 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import openai
+import pytest
+
+from app import metrics, openai_eval
+
+SETUP_SCRIPT = """
+import sys
+import django
+django.setup()
+import app.admin
+print("openai" in sys.modules)
+"""
+
+
+def test_django_setup_does_not_import_openai() -> None:
+    """Django start-up must neither import openai nor require an API key."""
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    env["DJANGO_SETTINGS_MODULE"] = "config.settings"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SETUP_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_get_client_is_shared(monkeypatch) -> None:
+    """get_client builds the client once and reuses it until reset_client."""
+    monkeypatch.setattr(openai_eval, "_client", None)
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+
+    client = openai_eval.get_client()
+    assert openai_eval.get_client() is client
+
+    openai_eval.reset_client()
+    assert openai_eval.get_client() is not client
+
+
+@pytest.fixture
+def scoring_server(fake_llm, settings):
+    """Start a fake server with the given config and point the shared client at it."""
+
+    def start(**config):
+        server = fake_llm(**config)
+        settings.OPENAI_API_KEY = "fake"
+        settings.OPENAI_BASE_URL = server.base_url
+        openai_eval.reset_client()
+        return server
+
+    yield start
+    openai_eval.reset_client()
+
+
+def test_score_many_shares_one_pool_concurrently(scoring_server) -> None:
+    """Concurrent scoring overlaps the LLM latency and reports in-flight requests."""
+    scoring_server(latency_ms=200)
+    jobs = [
+        (i, {"question": f"Q{i}", "response": "A", "standard_answer": "A", "source": ""})
+        for i in range(10)
+    ]
+
+    started = time.perf_counter()
+    results = dict(openai_eval.score_many(jobs, max_workers=10))
+    elapsed = time.perf_counter() - started
+
+    assert sorted(results) == list(range(10))
+    assert elapsed < 1.0
+    assert metrics.REGISTRY.gauges["openai_http_in_flight_max"] >= 2
+    assert metrics.REGISTRY.gauges["openai_http_in_flight"] == 0
+
+
+def test_create_completion_retries_rate_limits(scoring_server) -> None:
+    """429s from the rate limiter are retried after Retry-After and counted."""
+    server = scoring_server(requests_per_second=20, burst=1)
+
+    with metrics.collect() as batch:
+        for _ in range(3):
+            openai_eval.score_response("Q", "A", "A", "")
+
+    assert server.state.stats.completions == 3
+    assert batch.counters["retries"] == server.state.stats.rate_limited > 0
+
+
+def test_create_completion_respects_total_timeout(scoring_server, settings) -> None:
+    """The total deadline bounds the call even when the server is slower than the read timeout."""
+    scoring_server(latency_ms=2000)
+    settings.OPENAI_TOTAL_TIMEOUT = 0.3
+
+    started = time.perf_counter()
+    with pytest.raises(openai.APITimeoutError):
+        openai_eval.create_completion(model="gpt-4.1-nano", messages=[{"role": "user", "content": "hi"}])
+
+    assert time.perf_counter() - started < 1.5
+
+
+def test_score_response_retries_invalid_output(scoring_server, settings) -> None:
+    """Only the invalid item is re-requested; exhausted retries give zero scores and the error."""
+    server = scoring_server(invalid_output_rate=1.0)
+    settings.SCORING_PARSE_RETRIES = 2
+
+    with metrics.collect() as batch:
+        result = openai_eval.score_response("Q", "A", "A", "")
+
+    assert server.state.stats.completions == server.state.stats.invalid_outputs == 3
+    assert batch.counters["parse_retries"] == 2
+    assert batch.counters["score_errors"] == 1
+    assert result["total_score"] == 0
+    assert result["error"]
+    assert result["prompt_tokens"] > 0
+
+
+def test_score_response_recovers_after_invalid_output(scoring_server) -> None:
+    """A truncated completion followed by a valid one is scored normally."""
+    # seed 9: 第一次回應被截斷、第二次正常
+    server = scoring_server(invalid_output_rate=0.5, seed=9)
+
+    with metrics.collect() as batch:
+        result = openai_eval.score_response("Q", "A", "A", "")
+
+    assert server.state.stats.completions == 2
+    assert batch.counters["parse_retries"] == 1
+    assert "error" not in result
+    assert result["total_score"] > 0
+
+
+def test_route_picks_model_by_difficulty_and_source_length(settings) -> None:
+    """Rules are matched in order; unmatched items use the default model."""
+    from django.core.exceptions import ValidationError
+
+    from app.routing import Route, route, validate_routing
+
+    routing = settings.SCORING_ROUTING
+    assert route(routing, 2, 100) == Route("gpt-4.1-nano", 400, "default")
+    assert route(routing, 4, 100) == Route("gpt-4.1-mini", 500, "difficulty>=4")
+    assert route(routing, 5, 5000) == Route("gpt-4.1", 600, "difficulty>=5")
+    assert route(routing, 1, 1000) == Route("gpt-4.1-mini", 500, "source_tokens>=1000")
+
+    named = {**routing, "rules": [{"max_difficulty": 2, "max_source_tokens": 200, "model": "tiny", "name": "easy"}]}
+    assert route(named, 2, 100) == Route("tiny", None, "easy")
+    assert route(named, 2, 300).reason == "default"
+
+    validate_routing(routing)
+    validate_routing({})
+    for invalid in (
+        [],
+        {"rules": [{"model": "gpt-4.1"}]},
+        {"rules": [{"min_difficulty": "4", "model": "gpt-4.1"}]},
+        {"rules": [{"min_difficulty": 4, "model": "gpt-4.1", "temperature": 1}]},
+        {"default": {"model": "gpt-4.1", "max_tokens": 0}},
+        {"fallback": {}},
+    ):
+        with pytest.raises(ValidationError):
+            validate_routing(invalid)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from app.admin import UploadedEvaluationBatchAdmin
+from app.models import Evaluation, ExamPaperQuestion, UploadedEvaluationBatch, UploadedTestPaper
+from app.reuse import response_fingerprint
+
+
+def test_fingerprint_normalizes_whitespace_and_width():
+    """Test that formatting-only differences match while content and rubric version changes do not."""
+    base = response_fingerprint("q1", "AI 是人工智慧。", "人工智慧")
+    assert response_fingerprint(" q1", "  AI   是人工智慧。\n", "人工智慧") == base
+    assert response_fingerprint("q1", "ＡＩ 是人工智慧。", "人工智慧") == base  # 全形 → 半形
+    assert response_fingerprint("q1", "AI 是人工智慧!", "人工智慧") != base
+    assert response_fingerprint("q1", "AI 是人工智慧。", "人工智慧", rubric_version="1") != base
+
+
+def upload_batch(client, name: str, answers: dict[str, str], reuse: bool) -> UploadedEvaluationBatch:
+    items = [
+        {"question_id": question_id, "question": "Q?", "response": response, "sources": []}
+        for question_id, response in answers.items()
+    ]
+    batch = UploadedEvaluationBatch(
+        name=name,
+        json_file=SimpleUploadedFile("batch.json", json.dumps(items).encode()),
+        reuse_results=reuse,
+    )
+    UploadedEvaluationBatchAdmin(UploadedEvaluationBatch, AdminSite()).save_model(
+        client.request().wsgi_request, batch, None, change=False
+    )
+    return batch
+
+
+@pytest.mark.django_db
+def test_batch_reuses_scores_of_unchanged_answers(client, fake_openai_client):
+    """Test that only changed answers are sent to the LLM when reuse is enabled."""
+    paper = UploadedTestPaper.objects.create(name="reuse_paper", csv_file="uploads/paper.csv")
+    for question_id in ("r1", "r2"):
+        ExamPaperQuestion.objects.create(test_paper=paper, question_id=question_id, question="Q?", standard_answer="A")
+
+    upload_batch(client, "exp_v1", {"r1": "same answer", "r2": "old answer"}, reuse=False)
+    batch = upload_batch(client, "exp_v2", {"r1": "same  answer ", "r2": "new answer"}, reuse=True)
+
+    assert fake_openai_client.state.stats.requests == 3
+    assert batch.metrics["counters"]["reused"] == 1
+    original = Evaluation.objects.get(exp_id="exp_v1", question_id="r1")
+    reused = Evaluation.objects.get(exp_id="exp_v2", question_id="r1")
+    assert reused.reused_from == original
+    assert (reused.total_score, reused.model, reused.cost_usd) == (original.total_score, original.model, 0)
+    assert reused.bot_response == "same  answer "
+    assert Evaluation.objects.get(exp_id="exp_v2", question_id="r2").reused_from is None
+
+
+@pytest.mark.django_db
+def test_batch_does_not_reuse_scores_of_another_model(client, fake_openai_client):
+    """Test that an item now routed to a stronger model is rescored instead of copied."""
+    paper = UploadedTestPaper.objects.create(name="reuse_route_paper", csv_file="uploads/paper.csv")
+    for question_id in ("e1", "h1"):
+        ExamPaperQuestion.objects.create(test_paper=paper, question_id=question_id, question="Q?", standard_answer="A")
+
+    upload_batch(client, "exp_route_v1", {"e1": "answer", "h1": "answer"}, reuse=False)
+    ExamPaperQuestion.objects.filter(question_id="h1").update(difficulty=5)
+    batch = upload_batch(client, "exp_route_v2", {"e1": "answer ", "h1": "answer "}, reuse=True)
+
+    assert batch.metrics["counters"]["reused"] == 1
+    assert fake_openai_client.state.stats.models == {"gpt-4.1-nano": 2, "gpt-4.1": 1}
+    rescored = Evaluation.objects.get(exp_id="exp_route_v2", question_id="h1")
+    assert (rescored.model, rescored.routing_reason, rescored.reused_from) == ("gpt-4.1", "difficulty>=5", None)
+    assert Evaluation.objects.get(exp_id="exp_route_v2", question_id="e1").routing_reason == "default"
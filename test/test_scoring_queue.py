@@ -0,0 +1,183 @@
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from app.admin import UploadedEvaluationBatchAdmin, build_evaluation
+from app.management.commands.run_scoring_workers import run_worker
+from app.models import (
+    Evaluation,
+    ExamPaperQuestion,
+    ExperimentPolicy,
+    ScoringJob,
+    UploadedEvaluationBatch,
+    UploadedTestPaper,
+)
+from app.scoring_queue import ExperimentLoad, allocate, claim, complete, enqueue, heartbeat, reap_stale, release
+
+
+def make_batch(name: str = "exp_queue") -> UploadedEvaluationBatch:
+    return UploadedEvaluationBatch.objects.create(name=name, json_file="uploads/batch.json")
+
+
+def payload(question_id: str) -> dict:
+    return {
+        "question_id": question_id, "question": "What is AI?", "response": "AI.",
+        "standard_answer": "Artificial Intelligence", "question_source": "",
+    }
+
+
+@pytest.mark.django_db
+def test_claims_do_not_overlap_and_stale_claims_are_reaped(settings):
+    """Test atomic claiming, heartbeats, stale-claim reaping and that a reaped claim cannot complete."""
+    settings.SCORING_MAX_ATTEMPTS = 2
+    batch = make_batch()
+    enqueue(batch, [payload(f"c{i}") for i in range(5)])
+
+    token_a, jobs_a = claim("a", 3)
+    token_b, jobs_b = claim("b", 3)
+    assert [len(jobs_a), len(jobs_b)] == [3, 2]
+    assert not {job.id for job in jobs_a} & {job.id for job in jobs_b}
+    assert claim("c", 3)[1] == []
+
+    # worker a 當掉：心跳過期後退回佇列
+    ScoringJob.objects.filter(claim_token=token_a).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+    assert heartbeat(token_b) == 2
+    assert reap_stale() == 3
+    evaluation = build_evaluation({"exp_id": batch.name, "test_paper_id": batch.id, **payload("c0"), "scores": {}})
+    assert complete(token_a, {jobs_a[0].id: evaluation}) == 0
+    assert not Evaluation.objects.exists()
+
+    token_c, jobs_c = claim("c", 1)
+    assert jobs_c[0].attempts == 2
+    release(token_c, jobs_c[0].id, "boom")
+    assert ScoringJob.objects.get(id=jobs_c[0].id).status == ScoringJob.FAILED
+
+
+@pytest.mark.django_db
+def test_queue_mode_upload_is_scored_by_worker(client, settings, fake_openai_client, shared_cache):
+    """Test that a queued upload is scored and persisted by a worker."""
+    settings.SCORING_MODE = "queue"
+    settings.SCORING_CLAIM_SIZE = 2
+    paper = UploadedTestPaper.objects.create(name="queue_paper", csv_file="uploads/paper.csv")
+    items = []
+    for i in range(5):
+        ExamPaperQuestion.objects.create(test_paper=paper, question_id=f"w{i}", question="Q?", standard_answer="A")
+        items.append({"question_id": f"w{i}", "question": "Q?", "response": f"answer {i}", "sources": []})
+    batch = UploadedEvaluationBatch(
+        name="exp_queued", json_file=SimpleUploadedFile("batch.json", json.dumps(items).encode())
+    )
+    UploadedEvaluationBatchAdmin(UploadedEvaluationBatch, AdminSite()).save_model(
+        client.request().wsgi_request, batch, None, change=False
+    )
+
+    assert batch.metrics["counters"]["queued"] == 5
+    assert not Evaluation.objects.filter(exp_id="exp_queued").exists()
+
+    assert run_worker("test", 2, 0.01, drain=True, stop=threading.Event()) == 5
+    assert fake_openai_client.state.stats.completions == 5
+    assert Evaluation.objects.filter(exp_id="exp_queued", total_score__gt=0).count() == 5
+    assert set(ScoringJob.objects.values_list("status", flat=True)) == {ScoringJob.DONE}
+
+    call_command("run_scoring_workers", "--drain")
+
+
+def test_allocate_fair_share_priority_and_caps():
+    """Test that slots follow priority first, then claimed-per-weight, within concurrency caps."""
+    big = ExperimentLoad("big", pending=50_000, claimed=32, first_pending=1)
+    smoke = ExperimentLoad("smoke", pending=50, claimed=0, first_pending=60_000)
+    assert allocate([big, smoke], 32) == {"smoke": 32}
+    assert allocate([big, smoke], 40) == {"smoke": 36, "big": 4}
+
+    heavy = ExperimentLoad("heavy", pending=100, claimed=0, first_pending=1, weight=3)
+    light = ExperimentLoad("light", pending=100, claimed=0, first_pending=2)
+    assert allocate([heavy, light], 8) == {"heavy": 6, "light": 2}
+
+    urgent = ExperimentLoad("urgent", pending=100, claimed=2, first_pending=3, priority=1, max_concurrency=5)
+    assert allocate([heavy, light, urgent], 8) == {"urgent": 3, "heavy": 4, "light": 1}
+
+
+@pytest.mark.django_db
+def test_claim_shares_workers_between_experiments():
+    """Test that a small experiment queued behind a large one is claimed right away."""
+    enqueue(make_batch("regression"), [payload(f"r{i}") for i in range(100)])
+    _, first = claim("w1", 8)
+    assert {job.exp_id for job in first} == {"regression"}
+
+    enqueue(make_batch("smoke"), [payload(f"s{i}") for i in range(4)])
+    ExperimentPolicy.objects.create(exp_id="regression", max_concurrency=10)
+    _, second = claim("w2", 8)
+    assert [job.exp_id for job in second].count("smoke") == 4
+    assert [job.exp_id for job in second].count("regression") == 2
+    assert claim("w3", 8)[1] == []
+
+
+@pytest.mark.django_db
+def test_experiment_policy_changelist_shows_queue(admin_client):
+    """Test that the policy changelist lists pending and claimed job counts."""
+    enqueue(make_batch("exp_policy"), [payload(f"p{i}") for i in range(3)])
+    claim("w", 1)
+    ExperimentPolicy.objects.create(exp_id="exp_policy", priority=2)
+
+    response = admin_client.get("/admin/app/experimentpolicy/")
+    assert response.status_code == 200
+    row = response.context["cl"].result_list[0]
+    assert (row.pending_jobs, row.claimed_jobs) == (2, 1)
+
+
+@pytest.mark.django_db
+def test_worker_survives_duplicates_and_releases_only_failed_items(settings, fake_openai_client, monkeypatch):
+    """Test that duplicate keys are upserted and a failing item does not charge its chunk-mates."""
+    from app import openai_eval
+
+    settings.SCORING_MAX_ATTEMPTS = 1
+    # 同名批次上傳兩次，第二次含重複題號
+    enqueue(make_batch("exp_dup"), [payload("d1"), payload("d2")])
+    enqueue(make_batch("exp_dup"), [payload("d1"), {**payload("d2"), "response": "bad"}, payload("d3")])
+    score = openai_eval.score_response
+
+    def flaky(**kwargs):
+        if kwargs["response"] == "bad":
+            raise TimeoutError("scoring timed out")
+        return score(**kwargs)
+
+    monkeypatch.setattr(openai_eval, "score_response", flaky)
+    assert run_worker("test", 5, 0.01, drain=True, stop=threading.Event()) == 5
+
+    assert sorted(Evaluation.objects.filter(exp_id="exp_dup").values_list("question_id", flat=True)) == [
+        "d1", "d2", "d3",
+    ]
+    statuses = dict(ScoringJob.objects.values_list("payload__response", "status").filter(status=ScoringJob.FAILED))
+    assert statuses == {"bad": ScoringJob.FAILED}
+    assert ScoringJob.objects.get(status=ScoringJob.FAILED).error == "scoring timed out"
+    assert ScoringJob.objects.filter(status=ScoringJob.DONE).count() == 4
+
+
+@pytest.mark.django_db
+def test_reap_stale_fails_jobs_after_max_attempts(settings):
+    """Test that a job whose worker keeps dying is eventually marked failed."""
+    settings.SCORING_MAX_ATTEMPTS = 2
+    enqueue(make_batch(), [payload("s1")])
+    for expected in (ScoringJob.PENDING, ScoringJob.FAILED):
+        claim("dying", 1)
+        assert reap_stale(0) == 1
+        assert ScoringJob.objects.get().status == expected
+
+
+def test_queue_mode_requires_shared_cache(settings):
+    """Test that queue mode and the workers refuse a per-process cache."""
+    from django.core.exceptions import ImproperlyConfigured
+    from django.core.management.base import CommandError
+
+    from app.scoring_queue import scoring_mode
+
+    settings.SCORING_MODE = "queue"
+    with pytest.raises(ImproperlyConfigured):
+        scoring_mode()
+    with pytest.raises(CommandError):
+        call_command("run_scoring_workers", "--drain")
@@ -0,0 +1,68 @@
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.db import connection
+
+from app.admin import EvaluationAdmin
+from app.bulk import bulk_load
+from app.models import Evaluation
+from app.search import filter_matching, match_expression, search_evaluations
+
+
+def test_match_expression_uses_bigram_phrases():
+    """Test that Chinese words become bigram phrases and a single character a prefix query."""
+    assert match_expression("人工智慧 Python") == '"人工 工智 智慧" AND "python"'
+    assert match_expression("人") == '"人"*'
+    assert match_expression(" ?! ") == ""
+
+
+@pytest.mark.django_db
+def test_index_follows_inserts_updates_and_deletes(make_evaluation):
+    """Test that ORM saves, bulk loads and deletes keep the full-text index in sync."""
+    saved = make_evaluation("f1", bot_response="人工智慧是模擬人類思考的技術")
+    saved.save()
+    bulk_load(Evaluation, [
+        make_evaluation("f2", bot_response="機器學習是人工智慧的分支"), make_evaluation("f3", bot_response="深度學習"),
+    ])
+
+    assert {e.question_id for e in search_evaluations("人工智慧")} == {"f1", "f2"}
+    assert [e.question_id for e in search_evaluations("學習 分支")] == ["f2"]
+    assert search_evaluations("智人") == []  # 非連續的字不算命中
+
+    saved.bot_response = "自然語言處理"
+    saved.save()
+    Evaluation.objects.filter(question_id="f2").delete()
+    assert search_evaluations("人工智慧") == []
+    assert [e.question_id for e in search_evaluations("語言", exp_id="test_exp")] == ["f1"]
+    assert search_evaluations("語言", exp_id="other") == []
+
+
+@pytest.mark.django_db
+def test_search_api_and_admin(client, rf, make_evaluation):
+    """Test the /search endpoint and that admin search adds full-text matches to the id search."""
+    bulk_load(Evaluation, [
+        make_evaluation("g1", bot_response="大型語言模型"), make_evaluation("g2", bot_response="向量資料庫"),
+    ])
+
+    response = client.get("/api/search", {"q": "語言模型"})
+    assert response.status_code == 200
+    assert [item["question_id"] for item in response.json()] == ["g1"]
+
+    model_admin = EvaluationAdmin(Evaluation, AdminSite())
+    queryset, _ = model_admin.get_search_results(rf.get("/"), Evaluation.objects.all(), "資料庫")
+    assert [e.question_id for e in queryset] == ["g2"]
+    queryset, _ = model_admin.get_search_results(rf.get("/"), Evaluation.objects.all(), "g1")
+    assert [e.question_id for e in queryset] == ["g1"]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="pg_trgm indexes exist on PostgreSQL only")
+def test_postgres_search_uses_trigram_indexes(make_evaluation):
+    """Test that icontains search is planned on the UPPER() trigram indexes instead of a sequential scan."""
+    bulk_load(Evaluation, [make_evaluation(f"p{i}", bot_response=f"大型語言模型 {i}") for i in range(50)])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE app_evaluation")
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    plan = filter_matching(Evaluation.objects.all(), "語言模型").explain()
+    assert "app_evaluation_question_upper_trgm" in plan
+    assert "app_evaluation_response_upper_trgm" in plan